@@ -0,0 +1,60 @@
+"""
+run_training's fit and 5-fold CV, re-sketching per fit against binned=True
+
+    python -m benchmarks.binned_cv [--n-projects N]
+
+Runs run_training twice on the same projects with stage instrumentation on.
+The baseline is the production path: XGBClassifier fit with early stopping
+plus cross_validate_model, each building its own hist sketch. With
+binned=True the features are binned once and the fit and every fold train
+from row subsets of the codes. The fit and cross_validation stage times,
+test accuracy and CV scores of both runs are compared.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+
+def run(data, binned, directory):
+    from finergycloud_xgboost.instrumentation import enable_instrumentation, finish_run
+    from finergycloud_xgboost.train import run_training
+
+    enable_instrumentation(os.path.join(directory, 'pipeline-metrics.jsonl'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = run_training(data=data.copy(), output_dir=directory, binned=binned)
+    stages = {s['name']: s['responseTime'] / 1e3 for s in finish_run('training')['stages']}
+    return stages, results['accuracy'], results['cv_scores']
+
+
+def main(argv=None):
+    import warnings
+
+    from finergycloud_xgboost.data import generate_synthetic_projects
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n-projects', type=int, default=2847)
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore')
+    data = generate_synthetic_projects(args.n_projects)
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = run(data, False, tmp)
+        binned = run(data, True, tmp)
+
+    print(f"Projects: {len(data):,}")
+    print(f"{'path':10s} {'fit s':>8s} {'CV s':>8s} {'test acc':>9s} {'CV mean':>8s} "
+          f"{'CV std':>8s}")
+    for name, (stages, accuracy, cv_scores) in (('baseline', baseline), ('binned', binned)):
+        print(f"{name:10s} {stages['fit']:8.2f} {stages['cross_validation']:8.2f} "
+              f"{accuracy:9.3f} {cv_scores.mean():8.3f} {cv_scores.std():8.3f}")
+    baseline_s = baseline[0]['fit'] + baseline[0]['cross_validation']
+    binned_s = binned[0]['fit'] + binned[0]['cross_validation']
+    print(f"Fit + CV speed-up: {baseline_s / binned_s:.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Checkpoint overhead, time-budget stops and resume after a killed fit
+
+    python -m benchmarks.checkpoint_training [--n-projects 200000] [--every-rounds 25]
+
+Fits the production model as fit_model does, then with fit_checkpointed
+saving every N rounds, to show the cost of checkpointing and the rounds/s
+and rows/s it reports. A fit in a child process is then killed (SIGKILL)
+halfway through and resumed from its last checkpoint, and a fit with a time
+budget of 40% of the plain fit is stopped and resumed. The rounds redone
+and the final accuracy are compared with the uninterrupted fit. Finally,
+with sampling turned off, a budget-stopped and resumed fit is checked to
+give exactly the uninterrupted model.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+
+def _fit_until_killed(directory, every_rounds, data):
+    from finergycloud_xgboost.checkpoint import fit_checkpointed
+    from finergycloud_xgboost.train import build_model
+
+    fit_checkpointed(build_model(), *data, directory, every_rounds=every_rounds, log=None)
+
+
+def scores(model, X_test, y_test):
+    from sklearn.metrics import accuracy_score, log_loss
+
+    proba = model.predict_proba(X_test)
+    return accuracy_score(y_test, proba.argmax(axis=1)), log_loss(y_test, proba)
+
+
+def main(argv=None):
+    from finergycloud_xgboost.checkpoint import fit_checkpointed, read_checkpoint
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.features import engineer_features
+    from finergycloud_xgboost.train import build_model, fit_model, split_dataset
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n-projects', type=int, default=200000)
+    parser.add_argument('--every-rounds', type=int, default=25)
+    args = parser.parse_args(argv)
+
+    _, _, X_train, X_test, y_train, y_test = split_dataset(
+        engineer_features(generate_synthetic_projects(args.n_projects, seed=42)))
+    data = (X_train, y_train, X_test, y_test)
+
+    start = time.perf_counter()
+    plain = fit_model(build_model(), *data)
+    plain_s = time.perf_counter() - start
+    plain_rounds = plain.get_booster().num_boosted_rounds()
+    print(f"{'fit':34s} {'seconds':>8s} {'rounds':>7s} {'best':>5s} {'accuracy':>9s} "
+          f"{'log-loss':>9s}")
+
+    def row(name, seconds, model, rounds=None):
+        accuracy, loss = scores(model, X_test, y_test)
+        rounds = model.get_booster().num_boosted_rounds() if rounds is None else rounds
+        print(f"{name:34s} {seconds:8.2f} {rounds:7d} {model.best_iteration:5d} "
+              f"{accuracy:9.4f} {loss:9.5f}")
+
+    row('fit_model', plain_s, plain)
+    with tempfile.TemporaryDirectory() as tmp:
+        result = fit_checkpointed(build_model(), *data, os.path.join(tmp, 'every'),
+                                  every_rounds=args.every_rounds, log=None)
+        row(f'checkpoint every {args.every_rounds} rounds', result['wall_time_s'],
+            result['model'])
+        print(f"  {result['checkpoints']} checkpoints took {result['checkpoint_time_s']:.2f}s "
+              f"({result['checkpoint_time_s'] / result['wall_time_s']:.1%}); "
+              f"{result['rounds_per_s']:.1f} rounds/s, {result['rows_per_s']:,.0f} rows/s")
+
+        killed_dir = os.path.join(tmp, 'killed')
+        child = multiprocessing.get_context('fork').Process(
+            target=_fit_until_killed, args=(killed_dir, args.every_rounds, data))
+        child.start()
+        time.sleep(plain_s / 2)
+        child.kill()
+        child.join()
+        found = read_checkpoint(killed_dir)
+        saved = found[1]['rounds'] if found else 0
+        resumed = fit_checkpointed(build_model(), *data, killed_dir,
+                                   every_rounds=args.every_rounds, log=None)
+        row(f'killed at {plain_s / 2:.1f}s, resumed', resumed['wall_time_s'], resumed['model'])
+        print(f"  resumed from round {resumed['resumed_from_round']} "
+              f"(checkpoint on disk: {saved}); {resumed['rounds'] - saved} rounds left to train, "
+              f"{resumed['rounds']} in all against {plain_rounds} uninterrupted")
+
+        budget = 0.4 * plain_s
+        budget_dir = os.path.join(tmp, 'budget')
+        stopped = fit_checkpointed(build_model(), *data, budget_dir, time_budget=budget,
+                                   log=None)
+        row(f'time budget {budget:.1f}s', stopped['wall_time_s'], stopped['model'])
+        within = stopped['stopped_by'] == 'time_budget' and (
+            stopped['wall_time_s'] <= budget + 1 / max(stopped['rounds_per_s'], 1e-9) + 0.5)
+        print(f"  stopped by {stopped['stopped_by']} after {stopped['rounds']} rounds, "
+              f"{stopped['wall_time_s'] - budget:+.2f}s against the budget")
+        finished = fit_checkpointed(build_model(), *data, budget_dir, log=None)
+        row('  then resumed', finished['wall_time_s'], finished['model'])
+
+        # Deterministic trees: resumed boosting must reproduce the plain fit
+        exact = dict(subsample=1.0, colsample_bytree=1.0)
+        reference = fit_model(build_model(**exact), *data)
+        exact_dir = os.path.join(tmp, 'exact')
+        fit_checkpointed(build_model(**exact), *data, exact_dir, time_budget=budget, log=None)
+        again = fit_checkpointed(build_model(**exact), *data, exact_dir, log=None)['model']
+        same = (again.best_iteration == reference.best_iteration and np.array_equal(
+            again.predict_proba(X_test), reference.predict_proba(X_test)))
+        print(f"\nWithout sampling, budget stop + resume equals the uninterrupted fit: {same}")
+    return 0 if same and within else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
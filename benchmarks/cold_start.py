@@ -0,0 +1,83 @@
+"""
+Cold import plus first prediction, measured in a fresh interpreter
+
+    python -m benchmarks.cold_start [--model PATH] [--budget SECONDS]
+
+Exits non-zero when the measured time is over budget, so it can gate CI.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+child_script = """
+import json, time
+start = time.perf_counter()
+from finergycloud_xgboost import predict_esg_risk
+imported = time.perf_counter()
+predict_esg_risk({
+    'capacity_mw': 75, 'projected_irr': 18.5, 'environmental_score': 8.2,
+    'social_score': 7.8, 'governance_score': 8.5,
+    'country': 'Ghana', 'project_type': 'Solar'
+})
+done = time.perf_counter()
+print(json.dumps({'import_s': imported - start, 'first_prediction_s': done - imported,
+                  'total_s': done - start}))
+"""
+
+
+def train_quick_model(output_dir):
+    """
+    Small stand-in model so the check runs without a full training run
+    """
+    import joblib
+
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.features import engineer_features, feature_columns
+    from finergycloud_xgboost.predict import default_model_path
+    from finergycloud_xgboost.train import build_model
+
+    data = engineer_features(generate_synthetic_projects())
+    model = build_model(n_estimators=50, early_stopping_rounds=None)
+    model.fit(data[feature_columns], data['risk_classification'])
+    path = os.path.join(output_dir, default_model_path)
+    joblib.dump(model, path)
+    return path
+
+
+def measure(model_path, repeats=3):
+    env = dict(os.environ, FINERGYCLOUD_MODEL_PATH=os.path.abspath(model_path))
+    runs = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, '-c', child_script], cwd=repo_root,
+                             env=env, capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return min(runs, key=lambda run: run['total_s'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', help='saved model (default: train a quick one)')
+    parser.add_argument('--budget', type=float, default=5.0,
+                        help='maximum seconds for import plus first prediction')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = args.model or train_quick_model(tmp)
+        result = measure(model_path)
+
+    result['budget_s'] = args.budget
+    print(json.dumps(result, indent=2))
+    if result['total_s'] > args.budget:
+        print(f"FAIL: cold start {result['total_s']:.2f}s exceeds {args.budget:.2f}s budget")
+        return 1
+    print("OK: cold start within budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
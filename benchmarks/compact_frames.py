@@ -0,0 +1,89 @@
+"""
+Bytes per project and feature engineering time, default vs compact frames
+
+    python -m benchmarks.compact_frames [--sizes 1000000 10000000]
+
+Each (mode, size) runs in a fresh interpreter so peak RSS is its own. The
+default frame has string ids and categories and float64 numbers; the compact
+frame (generate_synthetic_projects(compact=True)) has int32 ids, categorical
+codes and float32 numbers, and engineer_features derives its columns in
+place through integer-indexed lookup arrays. Parity of the engineered
+features and labels is checked on a smaller sample.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+import numpy as np
+
+from benchmarks.cold_start import repo_root
+
+child_script = """
+import json, sys, time
+from benchmarks.suite import peak_rss_mb
+from finergycloud_xgboost.data import generate_synthetic_projects
+from finergycloud_xgboost.features import engineer_features
+
+mode, n_rows = sys.argv[1], int(sys.argv[2])
+data = generate_synthetic_projects(n_rows, compact=mode == 'compact')
+raw_bytes = int(data.memory_usage(deep=True).sum())
+start = time.perf_counter()
+engineer_features(data)
+engineer_s = time.perf_counter() - start
+print(json.dumps({
+    'mode': mode, 'n_rows': n_rows,
+    'raw_bytes_per_project': raw_bytes / n_rows,
+    'engineered_bytes_per_project': int(data.memory_usage(deep=True).sum()) / n_rows,
+    'engineer_s': engineer_s, 'peak_rss_mb': peak_rss_mb()
+}))
+"""
+
+
+def check_parity(n_rows):
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.features import engineer_features, feature_columns
+
+    default = engineer_features(generate_synthetic_projects(n_rows))
+    compact = engineer_features(generate_synthetic_projects(n_rows, compact=True))
+    expected = default[feature_columns].to_numpy(dtype=np.float32)
+    actual = compact[feature_columns].to_numpy(dtype=np.float32)
+    label_agreement = float((default['risk_classification'].to_numpy()
+                             == compact['risk_classification'].to_numpy()).mean())
+    return float(np.nanmax(np.abs(actual - expected))), label_agreement
+
+
+def run_case(mode, n_rows):
+    out = subprocess.run([sys.executable, '-c', child_script, mode, str(n_rows)],
+                         cwd=repo_root, capture_output=True, text=True)
+    if out.returncode != 0:
+        return {'mode': mode, 'n_rows': n_rows, 'error': out.stderr.strip().splitlines()[-1]}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000000, 10000000])
+    parser.add_argument('--parity-rows', type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    max_error, label_agreement = check_parity(args.parity_rows)
+    print(f"Parity ({args.parity_rows:,} rows): max |f_compact - f_default| = {max_error:.2e}, "
+          f"label agreement {label_agreement:.4%}")
+
+    print(f"{'mode':8s} {'rows':>11s} {'raw B/proj':>11s} {'eng B/proj':>11s} "
+          f"{'engineer s':>11s} {'peak MB':>9s}")
+    for n_rows in args.sizes:
+        for mode in ('default', 'compact'):
+            r = run_case(mode, n_rows)
+            if 'error' in r:
+                print(f"{mode:8s} {n_rows:11,d}  failed: {r['error']}")
+                continue
+            print(f"{mode:8s} {n_rows:11,d} {r['raw_bytes_per_project']:11.1f} "
+                  f"{r['engineered_bytes_per_project']:11.1f} {r['engineer_s']:11.3f} "
+                  f"{r['peak_rss_mb']:9.1f}")
+    return 0 if label_agreement > 0.999 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Drift monitor update cost, memory and PSI/KS on shifted traffic
+
+    python -m benchmarks.drift_monitor [--n-projects 1000000] [--workers 4]
+
+Fits the model on the 2,847-project training set and builds its drift
+reference, then feeds scored traffic to a DriftMonitor. Reports the update
+cost per row for single-row calls (the predict_esg_risk path), server-sized
+micro-batches and large batch chunks, its share of a predict_esg_risk call
+with the same row, and the monitor's memory next to what keeping the rows would
+cost. The traffic is split across worker sketches that are serialized,
+merged and checked to equal one sketch over all rows. PSI/KS are reported
+for traffic from the training distribution and for traffic with lower IRRs
+and a Nigeria-heavy country mix.
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+
+def scored(model, projects):
+    from finergycloud_xgboost.features import engineer_features, feature_columns
+
+    X = engineer_features(projects)[feature_columns].to_numpy(dtype=np.float32)
+    return X, model.predict_proba(X)
+
+
+def per_row_us(monitor, X, proba, batch_size, max_rows):
+    rows = min(len(X), max_rows)
+    start = time.perf_counter()
+    for i in range(0, rows, batch_size):
+        monitor.update(X[i:i + batch_size], proba[i:i + batch_size])
+    return (time.perf_counter() - start) / rows * 1e6
+
+
+def timed_us(func, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main(argv=None):
+    from finergycloud_xgboost import predict
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.drift import DriftMonitor, DriftSketch, format_drift_report
+    from finergycloud_xgboost.features import encode_project, engineer_features
+    from finergycloud_xgboost.train import build_model, fit_model, sample_project, split_dataset
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n-projects', type=int, default=1000000)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args(argv)
+
+    _, _, X_train, X_test, y_train, y_test = split_dataset(
+        engineer_features(generate_synthetic_projects(2847, seed=42)))
+    model = build_model()
+    fit_model(model, X_train, y_train, X_test, y_test)
+    reference = DriftSketch.from_data(X_train, model.predict_proba(X_train))
+
+    traffic = generate_synthetic_projects(args.n_projects, seed=7)
+    X, proba = scored(model, traffic.copy())
+
+    monitor = DriftMonitor(reference)
+    print(f"{'update':28s} {'us/row':>8s}")
+    for name, batch_size, max_rows in (('single row', 1, 20000),
+                                       ('micro-batch of 64', 64, 200000),
+                                       ('chunk of 100,000', 100000, len(X))):
+        print(f"{name:28s} {per_row_us(monitor, X, proba, batch_size, max_rows):8.2f}")
+
+    # The predict_esg_risk call varies by more than the update costs, so the
+    # update is timed on its own with the same single row
+    predict.set_model(model)
+    project = dict(sample_project)
+    call_us = min(timed_us(lambda: predict.predict_esg_risk(project), 2000) for _ in range(5))
+    row = encode_project(project).reshape(1, -1)
+    row_proba = model.predict_proba(row)
+    update_us = min(timed_us(lambda: monitor.update(row, row_proba), 2000) for _ in range(5))
+    print(f"predict_esg_risk: {call_us:.1f} us per call; the monitor update adds "
+          f"{update_us:.1f} us ({update_us / call_us:.1%})")
+
+    state_bytes = monitor.live.counts.nbytes + sum(e.nbytes for e in monitor.live.edges)
+    print(f"Monitor state: {state_bytes / 1024:.1f} KB after {monitor.live.n_rows:,} rows "
+          f"(the rows themselves: {(X.nbytes + proba.nbytes) / 2 ** 20:,.0f} MB)")
+
+    # Worker sketches travel as JSON and merge into the whole-traffic sketch
+    whole = reference.empty().update(X, proba)
+    merged = reference.empty()
+    for part in np.array_split(np.arange(len(X)), args.workers):
+        sketch = reference.empty().update(X[part], proba[part])
+        merged.merge(DriftSketch.from_dict(json.loads(json.dumps(sketch.to_dict()))))
+    merge_ok = np.array_equal(merged.counts, whole.counts) and merged.n_rows == whole.n_rows
+    print(f"{args.workers} merged worker sketches equal one sketch over all rows: {merge_ok}")
+
+    stable = whole.compare(reference)
+    shifted_projects = traffic.copy()
+    rng = np.random.default_rng(0)
+    shifted_projects['projected_irr'] -= 3.0
+    nigeria = rng.random(len(shifted_projects)) < 0.5
+    shifted_projects.loc[nigeria, 'country'] = 'Nigeria'
+    shifted = reference.empty().update(*scored(model, shifted_projects)).compare(reference)
+    print()
+    print("Training-distribution traffic:")
+    print(format_drift_report(stable))
+    print()
+    print("Shifted traffic (IRR -3 points, half the projects moved to Nigeria):")
+    print(format_drift_report(shifted))
+    detected = not stable['drifted'] and bool(shifted['drifted'])
+    print(f"Stable traffic flagged: {stable['drifted'] or 'none'}; "
+          f"shifted traffic flagged: {shifted['drifted']}")
+    return 0 if merge_ok and detected else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Latency-accuracy trade-off of truncated, pruned and distilled ensembles
+
+    python -m benchmarks.ensemble_compaction [--max-loss-increase 0.01]
+
+Trains the production model, builds the compaction candidates (pruning on a
+fresh synthetic validation draw, reporting on the training split's test
+set) and prints the compaction report. Each candidate is then served
+through predict_esg_risk as a registry model, so the p50/p99 below include
+feature encoding and the response dict, i.e. what the API tier sees.
+"""
+import argparse
+import sys
+import time
+import warnings
+
+import numpy as np
+
+
+def serving_latency_ms(booster, n_calls=2000):
+    from finergycloud_xgboost.predict import predict_esg_risk
+    from finergycloud_xgboost.registry import RegisteredModel, feature_schema
+    from finergycloud_xgboost.train import sample_project
+
+    model = RegisteredModel(booster, None, feature_schema(), {})
+    project = dict(sample_project)
+    timings = np.empty(n_calls)
+    for i in range(n_calls):
+        project['projected_irr'] = 8 + i % 170 / 10  # defeat any caching
+        start = time.perf_counter()
+        predict_esg_risk(project, model=model)
+        timings[i] = time.perf_counter() - start
+    timings *= 1e3
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 99))
+
+
+def main(argv=None):
+    from finergycloud_xgboost.compaction import (compact_model, compaction_report,
+                                                 format_compaction_report)
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.features import engineer_features, feature_columns
+    from finergycloud_xgboost.train import build_model, fit_model, split_dataset
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n-projects', type=int, default=2847)
+    parser.add_argument('--max-loss-increase', type=float, default=0.01)
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.005)
+    args = parser.parse_args(argv)
+    warnings.filterwarnings('ignore')
+
+    data = engineer_features(generate_synthetic_projects(args.n_projects, seed=42))
+    _, _, X_train, X_test, y_train, y_test = split_dataset(data)
+    model = fit_model(build_model(), X_train, y_train, X_test, y_test)
+    valid = engineer_features(generate_synthetic_projects(args.n_projects, seed=43))
+
+    start = time.perf_counter()
+    candidates = compact_model(model, valid[feature_columns].to_numpy(dtype=np.float32),
+                               valid['risk_classification'].to_numpy(), X_train=X_train,
+                               max_loss_increase=args.max_loss_increase)
+    print(f"Compaction: {len(candidates)} candidates in {time.perf_counter() - start:.1f} s")
+    rows = compaction_report(candidates, X_test, y_test)
+    print(format_compaction_report(rows))
+
+    print(f"{'predict_esg_risk':20s} {'p50 ms':>7s} {'p99 ms':>7s}")
+    for name, booster in candidates.items():
+        p50, p99 = serving_latency_ms(booster)
+        print(f"{name:20s} {p50:7.3f} {p99:7.3f}")
+
+    reference = next(r for r in rows if r['candidate'] == 'best_iteration')
+    within = [r for r in rows
+              if r['accuracy'] >= reference['accuracy'] - args.max_accuracy_drop]
+    smallest = min(within, key=lambda r: r['model_bytes'])
+    print(f"Smallest within {args.max_accuracy_drop:.1%} accuracy: {smallest['candidate']} "
+          f"({smallest['n_trees']} trees, {smallest['model_bytes'] / 1024:.0f} KiB, "
+          f"{smallest['batch_rows_per_s'] / reference['batch_rows_per_s']:.1f}x batch throughput)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
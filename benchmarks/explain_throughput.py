@@ -0,0 +1,111 @@
+"""
+Rows explained per second with native tree contributions
+
+    python -m benchmarks.explain_throughput [--sizes 1 1000 100000]
+
+Trains the default model once, then times feature_contributions on batches
+of encoded projects against explaining the same rows one call at a time
+(the per-row pattern of a generic explainer), predict_esg_risk(explain=True)
+cold and from the prediction cache, and summarize_contributions over the
+largest batch. Exact TreeSHAP and the approximate per-path attribution are
+both timed. Contributions are checked to add up to the margins that
+predict_proba turns into probabilities.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+
+def train_model(n_projects):
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.features import engineer_features
+    from finergycloud_xgboost.train import build_model, fit_model, split_dataset
+
+    data = engineer_features(generate_synthetic_projects(n_projects, seed=42))
+    _, _, X_train, X_test, y_train, y_test = split_dataset(data)
+    return fit_model(build_model(), X_train, y_train, X_test, y_test)
+
+
+def encoded_rows(n_rows):
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.features import engineer_features, feature_columns
+
+    data = engineer_features(generate_synthetic_projects(n_rows, seed=7))
+    return data[feature_columns].to_numpy(dtype=np.float32)
+
+
+def best_time(func, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def check_additivity(model, X):
+    from finergycloud_xgboost.explain import feature_contributions
+
+    contributions, bias = feature_contributions(model, X)
+    margin = contributions.sum(axis=2) + bias
+    proba = np.exp(margin - margin.max(axis=1, keepdims=True))
+    proba /= proba.sum(axis=1, keepdims=True)
+    return float(np.abs(proba - model.predict_proba(X)).max())
+
+
+def main(argv=None):
+    from finergycloud_xgboost import predict
+    from finergycloud_xgboost.explain import feature_contributions, summarize_contributions
+    from finergycloud_xgboost.train import sample_project
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 1000, 100000])
+    parser.add_argument('--per-row', type=int, default=500,
+                        help='rows explained one call at a time for the comparison')
+    parser.add_argument('--n-projects', type=int, default=2847)
+    parser.add_argument('--repeats', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    model = train_model(args.n_projects)
+    X = encoded_rows(max(args.sizes + [args.per_row]))
+    error = check_additivity(model, X[:10000])
+    print(f"Additivity: max |softmax(sum contributions + bias) - predict_proba| = {error:.2e}")
+
+    print(f"{'mode':22s} {'rows':>9s} {'seconds':>9s} {'rows/s':>12s}")
+    per_row = X[:args.per_row]
+    elapsed = best_time(lambda: [feature_contributions(model, row) for row in per_row], 1)
+    per_row_rate = len(per_row) / elapsed
+    print(f"{'one row per call':22s} {len(per_row):9,d} {elapsed:9.3f} {per_row_rate:12,.0f}")
+    batch_rate = None
+    for n_rows in args.sizes:
+        elapsed = best_time(lambda: feature_contributions(model, X[:n_rows]), args.repeats)
+        batch_rate = n_rows / elapsed
+        print(f"{'batched':22s} {n_rows:9,d} {elapsed:9.3f} {batch_rate:12,.0f}")
+    for n_rows in args.sizes:
+        elapsed = best_time(lambda: feature_contributions(model, X[:n_rows], approximate=True),
+                            args.repeats)
+        print(f"{'batched, approximate':22s} {n_rows:9,d} {elapsed:9.3f} {n_rows / elapsed:12,.0f}")
+
+    predict.set_model(model, 'benchmark')
+    predict.enable_prediction_cache()
+    start = time.perf_counter()
+    predict.predict_esg_risk(sample_project, explain=True)
+    cold_ms = (time.perf_counter() - start) * 1e3
+    hits = 1000
+    start = time.perf_counter()
+    for _ in range(hits):
+        predict.predict_esg_risk(sample_project, explain=True)
+    cached_ms = (time.perf_counter() - start) / hits * 1e3
+    print(f"predict_esg_risk(explain=True): {cold_ms:.2f} ms cold, {cached_ms:.3f} ms cached")
+
+    contributions, _ = feature_contributions(model, X[:max(args.sizes)])
+    elapsed = best_time(lambda: summarize_contributions(contributions), args.repeats)
+    print(f"summarize_contributions over {len(contributions):,} rows: {elapsed * 1e3:.1f} ms")
+    print(f"Batched vs one row per call: {batch_rate / per_row_rate:.0f}x")
+    return 0 if error < 1e-4 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
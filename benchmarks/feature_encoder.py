@@ -0,0 +1,65 @@
+"""
+Parity and latency of encode_project against engineer_features
+
+    python -m benchmarks.feature_encoder [--n-projects N]
+
+Every synthetic project is encoded on its own and compared bit for bit with
+the float32 cast of the engineer_features output; exits non-zero on mismatch.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from finergycloud_xgboost.data import generate_synthetic_projects
+from finergycloud_xgboost.features import encode_project, engineer_features, feature_columns
+
+
+def check_parity(data):
+    expected = engineer_features(data.copy())[feature_columns].to_numpy(dtype=np.float32)
+    records = data.to_dict('records')
+    encoded = np.empty((len(records), len(feature_columns)), dtype=np.float32)
+    for i, project in enumerate(records):
+        encode_project(project, out=encoded[i])
+
+    mismatched = ~((encoded == expected) | (np.isnan(encoded) & np.isnan(expected)))
+    return records, int(mismatched.any(axis=1).sum())
+
+
+def time_per_row(func, records, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for project in records:
+            func(project)
+        best = min(best, (time.perf_counter() - start) / len(records))
+    return best
+
+
+def main(argv=None):
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n-projects', type=int, default=2847)
+    args = parser.parse_args(argv)
+
+    data = generate_synthetic_projects(args.n_projects)
+    records, mismatches = check_parity(data)
+    print(f"Parity: {len(records) - mismatches}/{len(records)} projects identical")
+
+    sample = records[:500]
+    out = np.empty(len(feature_columns), dtype=np.float32)
+    pandas_s = time_per_row(
+        lambda p: engineer_features(pd.DataFrame([p]))[feature_columns], sample
+    )
+    encoder_s = time_per_row(lambda p: encode_project(p, out=out), sample)
+    print(f"engineer_features (1 row): {pandas_s * 1e6:9.1f} us/project")
+    print(f"encode_project:            {encoder_s * 1e6:9.1f} us/project")
+    print(f"Speed-up:                  {pandas_s / encoder_s:9.1f}x")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Feature store upserts and reads against recomputing engineer_features
+
+    python -m benchmarks.feature_store [--n-projects 1000000] [--changed 0.01]
+
+Times engineer_features over the whole portfolio (what every training, CV
+and batch scoring run pays today), then the store: the initial load, a
+re-upsert with nothing changed, a re-upsert with a fraction of projects
+edited, and reading the feature matrix back. Stored features are checked to
+equal engineer_features' output, and the read is checked to be a view of
+the memory map rather than a copy.
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.feature_store import FeatureStore
+    from finergycloud_xgboost.features import engineer_features, feature_columns
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n-projects', type=int, default=1000000)
+    parser.add_argument('--changed', type=float, default=0.01,
+                        help='fraction of projects edited before the second upsert')
+    args = parser.parse_args(argv)
+
+    projects = generate_synthetic_projects(args.n_projects, seed=42)
+    _, recompute = timed(lambda: engineer_features(projects.copy()))
+
+    rng = np.random.default_rng(0)
+    edited = projects.copy()
+    rows = rng.choice(len(edited), int(len(edited) * args.changed), replace=False)
+    edited.loc[rows, 'projected_irr'] += 0.5
+
+    print(f"{'operation':34s} {'seconds':>8s} {'rows/s':>12s}  result")
+    print(f"{'engineer_features, all rows':34s} {recompute:8.2f} "
+          f"{len(projects) / recompute:12,.0f}")
+    with tempfile.TemporaryDirectory() as path:
+        store = FeatureStore(path, writable=True)
+        for name, frame in (('initial upsert', projects), ('re-upsert, unchanged', projects),
+                            (f're-upsert, {args.changed:.0%} changed', edited)):
+            counts, elapsed = timed(lambda: store.upsert(frame))
+            print(f"{name:34s} {elapsed:8.2f} {len(frame) / elapsed:12,.0f}  {counts}")
+
+        store = FeatureStore(path)
+        X, elapsed = timed(store.features)
+        zero_copy = np.shares_memory(X, store._columns['features'])
+        print(f"{'open + features()':34s} {elapsed:8.5f} {'':12s}  {X.shape}, "
+              f"{'view of the memory map' if zero_copy else 'COPIED'}")
+        _, elapsed = timed(lambda: store.lookup(edited['project_id'].to_numpy()))
+        print(f"{'lookup all project_ids':34s} {elapsed:8.2f} {len(edited) / elapsed:12,.0f}")
+
+        expected_edited = engineer_features(edited.copy())[feature_columns].to_numpy(
+            dtype=np.float32)
+        rows = store.lookup(edited['project_id'].to_numpy())
+        same = np.array_equal(X[rows], expected_edited, equal_nan=True)
+        print(f"Stored features equal engineer_features: {same}")
+    return 0 if same and zero_copy else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Incremental warm-start updates against full retrains from scratch
+
+    python -m benchmarks.incremental_training [--months 6] [--batch-size 300]
+
+Publishes a model trained on the initial dataset to a temporary registry,
+then feeds monthly batches of new projects. Each month the batch is applied
+with incremental_update (plus a reservoir of historical rows) and, for
+comparison, a full model is retrained on everything seen so far. Both are
+scored on the same fixed holdout.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+
+def main(argv=None):
+    import pandas as pd
+
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.features import engineer_features, feature_columns
+    from finergycloud_xgboost.incremental import (
+        ReservoirSample, holdout_metrics, incremental_update, reservoir_filename
+    )
+    from finergycloud_xgboost.registry import ModelRegistry
+    from finergycloud_xgboost.train import build_model, fit_model, split_dataset
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n-projects', type=int, default=2847)
+    parser.add_argument('--months', type=int, default=6)
+    parser.add_argument('--batch-size', type=int, default=300)
+    parser.add_argument('--rounds', type=int, default=30)
+    parser.add_argument('--reservoir', type=int, default=5000)
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.005)
+    args = parser.parse_args(argv)
+
+    def full_retrain(data):
+        _, _, X_train, X_test, y_train, y_test = split_dataset(engineer_features(data.copy()))
+        return fit_model(build_model(), X_train, y_train, X_test, y_test)
+
+    holdout = engineer_features(generate_synthetic_projects(2000, seed=999))
+    X_holdout = holdout[feature_columns].to_numpy(dtype=np.float32)
+    y_holdout = holdout['risk_classification'].to_numpy()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ModelRegistry(os.path.join(tmp, 'registry'))
+        history = generate_synthetic_projects(args.n_projects, seed=42)
+        start = time.perf_counter()
+        model = full_retrain(history)
+        print(f"Initial model: {args.n_projects:,} projects in {time.perf_counter() - start:.2f}s, "
+              f"holdout accuracy {holdout_metrics(model, X_holdout, y_holdout)['accuracy']:.4f}")
+        registry.publish(model, {'dataset_size': args.n_projects})
+        reservoir_path = os.path.join(registry.root, reservoir_filename)
+        initial = engineer_features(history.copy())
+        ReservoirSample(args.reservoir).update(
+            initial[feature_columns], initial['risk_classification']).save(reservoir_path)
+
+        print(f"{'month':>5s} {'rows':>7s} {'incr s':>7s} {'full s':>7s} {'acc before':>10s} "
+              f"{'acc incr':>9s} {'acc full':>9s}  promoted")
+        incremental_s, full_s = [], []
+        for month in range(1, args.months + 1):
+            batch = generate_synthetic_projects(args.batch_size, seed=100 + month)
+            history = pd.concat([history, batch], ignore_index=True)
+
+            report = incremental_update(registry, batch.copy(), X_holdout, y_holdout,
+                                        n_rounds=args.rounds, reservoir_path=reservoir_path,
+                                        max_accuracy_drop=args.max_accuracy_drop)
+            start = time.perf_counter()
+            full = holdout_metrics(full_retrain(history), X_holdout, y_holdout)
+            full_s.append(time.perf_counter() - start)
+            incremental_s.append(report['wall_time_s'])
+            print(f"{month:5d} {len(history):7,d} {incremental_s[-1]:7.2f} {full_s[-1]:7.2f} "
+                  f"{report['before']['accuracy']:10.4f} {report['after']['accuracy']:9.4f} "
+                  f"{full['accuracy']:9.4f}  {report['version'] if report['promoted'] else 'no'}")
+
+        print(f"Mean wall time: incremental {np.mean(incremental_s):.2f}s, "
+              f"full retrain {np.mean(full_s):.2f}s "
+              f"({np.mean(full_s) / np.mean(incremental_s):.1f}x); "
+              f"current version {registry.current_version()}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
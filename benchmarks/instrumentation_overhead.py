@@ -0,0 +1,115 @@
+"""
+Cost of the stage instrumentation, disabled and enabled
+
+    python -m benchmarks.instrumentation_overhead [--calls 1000000]
+
+Times an empty loop body against the same body inside stage() and through an
+@instrumented function, first with instrumentation disabled (the default) and
+then enabled, and reports the per-call overhead. Finally runs a full training
+pass plain, instrumented and instrumented with tracemalloc in fresh
+interpreters and prints the recorded stage breakdown.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.cold_start import repo_root
+
+child_script = """
+import json, os, sys, time, warnings
+warnings.filterwarnings('ignore')
+from finergycloud_xgboost import instrumentation
+from finergycloud_xgboost.train import run_training
+
+output_dir, n_projects, mode = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+if mode != 'plain':
+    instrumentation.enable_instrumentation(os.path.join(output_dir, 'pipeline-metrics.jsonl'),
+                                           trace_memory=mode == 'traced')
+start = time.perf_counter()
+sys.stdout = open(os.devnull, 'w')
+results = run_training(n_projects=n_projects, output_dir=output_dir)
+sys.stdout = sys.__stdout__
+elapsed = time.perf_counter() - start
+record = instrumentation.finish_run('training', n_projects=n_projects)
+print(json.dumps({'wall_s': elapsed, 'accuracy': results['accuracy'],
+                  'stages': record['stages'] if record else []}))
+"""
+
+
+def per_call_ns(func, calls):
+    start = time.perf_counter()
+    func(calls)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def micro_benchmarks(calls):
+    from finergycloud_xgboost.instrumentation import instrumented, stage
+
+    def plain(x):
+        return x
+
+    decorated = instrumented('decorated')(plain)
+
+    def loop_plain(n):
+        for i in range(n):
+            plain(i)
+
+    def loop_stage(n):
+        for i in range(n):
+            with stage('loop'):
+                plain(i)
+
+    def loop_decorated(n):
+        for i in range(n):
+            decorated(i)
+
+    baseline = min(per_call_ns(loop_plain, calls) for _ in range(3))
+    return {
+        'stage': min(per_call_ns(loop_stage, calls) for _ in range(3)) - baseline,
+        'instrumented': min(per_call_ns(loop_decorated, calls) for _ in range(3)) - baseline
+    }
+
+
+def run_training_case(output_dir, n_projects, mode):
+    out = subprocess.run([sys.executable, '-c', child_script, output_dir, str(n_projects), mode],
+                         cwd=repo_root, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    from finergycloud_xgboost import instrumentation
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=1000000)
+    parser.add_argument('--n-projects', type=int, default=2847)
+    args = parser.parse_args(argv)
+
+    disabled = micro_benchmarks(args.calls)
+    instrumentation.enable_instrumentation(None)
+    enabled = micro_benchmarks(args.calls // 10)
+    instrumentation.disable_instrumentation()
+    print(f"{'overhead per call':20s} {'disabled ns':>12s} {'enabled ns':>12s}")
+    for kind in ('stage', 'instrumented'):
+        print(f"{kind:20s} {disabled[kind]:12.1f} {enabled[kind]:12.1f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = run_training_case(tmp, args.n_projects, 'plain')
+        timed = run_training_case(tmp, args.n_projects, 'timed')
+        traced = run_training_case(tmp, args.n_projects, 'traced')
+    print(f"Training run: {plain['wall_s']:.2f} s plain, {timed['wall_s']:.2f} s instrumented, "
+          f"{traced['wall_s']:.2f} s with tracemalloc; accuracy {plain['accuracy']:.4f} / "
+          f"{timed['accuracy']:.4f} / {traced['accuracy']:.4f}")
+    print(f"{'stage':24s} {'wall ms':>9s} {'cpu ms':>9s} {'rss +MB':>8s} {'traced peak MB':>15s}")
+    for s in traced['stages']:
+        memory = s['memoryUsage']
+        rss = 'n/a' if memory['rssDelta'] is None else f"{memory['rssDelta'] / 2 ** 20:.1f}"
+        print(f"{'  ' * s['depth'] + s['name']:24s} {s['responseTime']:9.1f} {s['cpuTime']:9.1f} "
+              f"{rss:>8s} {memory['tracedPeak'] / 2 ** 20:15.1f}")
+    return 0 if disabled['stage'] < 1000 and plain['accuracy'] == traced['accuracy'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
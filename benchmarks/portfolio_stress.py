@@ -0,0 +1,130 @@
+"""
+Monte Carlo portfolio stress scoring: throughput and peak memory
+
+    python -m benchmarks.portfolio_stress [--n-projects 3000] [--scenarios 100000]
+
+Each case runs stress_test_portfolio in a fresh interpreter so peak RSS is
+its own: the full tensor path (dedupe=False) on a slice of the scenarios,
+the deduplicated path on all of them under two memory budgets, and the
+loop it replaces (predict_esg_risk per project per scenario) on a few
+scenarios, extrapolated. The deduplicated and full tensor results are
+checked to agree on the shared scenarios.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+from benchmarks.cold_start import repo_root
+
+shocks = [
+    {'feature': 'country_risk_score', 'country': ['Nigeria', 'Mali'],
+     'distribution': 'normal', 'mean': -0.08, 'std': 0.04},
+    {'feature': 'projected_irr', 'op': 'multiply', 'distribution': 'uniform',
+     'low': 0.7, 'high': 1.05},
+    {'feature': 'environmental_score', 'project_type': 'Biomass',
+     'distribution': 'normal', 'mean': -0.5, 'std': 0.5},
+    {'feature': 'governance_score', 'distribution': 'normal', 'mean': -0.2, 'std': 0.3}
+]
+
+child_script = """
+import json, sys, time
+import numpy as np
+from benchmarks.portfolio_stress import shocks
+from benchmarks.suite import peak_rss_mb
+from finergycloud_xgboost import predict
+from finergycloud_xgboost.data import generate_synthetic_projects
+from finergycloud_xgboost.train import build_model, fit_model, split_dataset
+from finergycloud_xgboost.features import engineer_features
+
+mode, n_projects, n_scenarios, budget = sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])
+data = engineer_features(generate_synthetic_projects(2847, seed=42))
+_, _, X_train, X_test, y_train, y_test = split_dataset(data)
+predict.set_model(fit_model(build_model(), X_train, y_train, X_test, y_test))
+portfolio = generate_synthetic_projects(n_projects, seed=11)
+before = peak_rss_mb()
+
+if mode == 'loop':
+    from finergycloud_xgboost.stress import draw_shock_values, validate_shocks
+    spec = validate_shocks(shocks)
+    values = draw_shock_values(spec, n_scenarios)
+    records = portfolio.to_dict('records')
+    start = time.perf_counter()
+    high = 0
+    for s in range(n_scenarios):
+        for project in records:
+            stressed = dict(project)
+            for shock, value in zip(spec, values[s]):
+                if shock.get('country') and project['country'] not in shock['country']:
+                    continue
+                if shock.get('project_type') and project['project_type'] not in shock['project_type']:
+                    continue
+                name = shock['feature']
+                if name not in stressed:
+                    continue  # country_risk_score is not a raw field; timing only
+                stressed[name] = stressed[name] * value if shock['op'] == 'multiply' else stressed[name] + value
+            high += predict.predict_esg_risk(stressed)['risk_classification'] == 'High Risk'
+    elapsed = time.perf_counter() - start
+    result = {}
+else:
+    from finergycloud_xgboost.stress import stress_test_portfolio
+    start = time.perf_counter()
+    result = stress_test_portfolio(portfolio, shocks, n_scenarios=n_scenarios,
+                                   memory_budget_mb=budget, dedupe=mode == 'dedupe')
+    elapsed = time.perf_counter() - start
+    result = {'rows_scored': result['rows_scored'], 'n_chunks': result['n_chunks'],
+              'high_risk_share_p99': result['class_share_tails']['High Risk']['p99'],
+              'class_share_head': result['class_share'][:200].tolist()}
+print(json.dumps(dict(result, mode=mode, n_projects=n_projects, n_scenarios=n_scenarios,
+                      budget_mb=budget, seconds=elapsed, cells_per_s=n_projects * n_scenarios / elapsed,
+                      peak_rss_mb=peak_rss_mb(), baseline_rss_mb=before)))
+"""
+
+
+def run_case(mode, n_projects, n_scenarios, budget):
+    out = subprocess.run([sys.executable, '-c', child_script, mode, str(n_projects),
+                          str(n_scenarios), str(budget)],
+                         cwd=repo_root, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1])
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n-projects', type=int, default=3000)
+    parser.add_argument('--scenarios', type=int, default=100000)
+    parser.add_argument('--full-scenarios', type=int, default=1000,
+                        help='scenarios for the full tensor (dedupe=False) case')
+    parser.add_argument('--loop-scenarios', type=int, default=2)
+    parser.add_argument('--budgets', type=int, nargs='+', default=[128, 512])
+    args = parser.parse_args(argv)
+
+    cases = [('loop', args.loop_scenarios, args.budgets[0]),
+             ('full', args.full_scenarios, args.budgets[0])]
+    cases += [('dedupe', args.scenarios, budget) for budget in args.budgets]
+    print(f"{'mode':8s} {'scenarios':>10s} {'budget MB':>10s} {'seconds':>9s} {'cells/s':>12s} "
+          f"{'rows scored':>12s} {'peak MB':>8s} {'+MB':>6s}")
+    results = []
+    for mode, n_scenarios, budget in cases:
+        r = run_case(mode, args.n_projects, n_scenarios, budget)
+        results.append(r)
+        print(f"{mode:8s} {n_scenarios:10,d} {budget:10d} {r['seconds']:9.2f} "
+              f"{r['cells_per_s']:12,.0f} {r.get('rows_scored', n_scenarios * args.n_projects):12,d} "
+              f"{r['peak_rss_mb']:8.1f} {r['peak_rss_mb'] - r['baseline_rss_mb']:6.1f}")
+
+    loop, full, dedupe = results[0], results[1], results[2]
+    n_cells = args.n_projects * args.scenarios
+    print(f"{args.scenarios:,} scenarios x {args.n_projects:,} projects: "
+          f"loop ~{n_cells / loop['cells_per_s'] / 3600:.1f} h (extrapolated), "
+          f"full tensor ~{n_cells / full['cells_per_s'] / 60:.1f} min (extrapolated), "
+          f"deduplicated {dedupe['seconds']:.1f} s")
+    shared = min(len(full['class_share_head']), len(dedupe['class_share_head']))
+    agree = full['class_share_head'][:shared] == dedupe['class_share_head'][:shared]
+    print(f"Deduplicated vs full tensor class shares on {shared} shared scenarios: "
+          f"{'identical' if agree else 'DIFFERENT'}")
+    return 0 if agree else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Prediction audit log write cost, rotation and memory-mapped replay
+
+    python -m benchmarks.prediction_log [--n-records 5000000] [--segment-mb 64]
+
+Times the pattern the platform's benchmark collector uses (keep every
+prediction in a list and rewrite a JSON file every 100 predictions) against
+PredictionLog: single-row appends as predict_esg_risk makes them, their
+share of a predict_esg_risk call, and batch appends of scored chunks. The
+batch-written log is then opened with PredictionLogReader to summarize and
+replay every record through the model that produced it, checking that the
+records read back equal those written, that segments rotated at the size
+limit and that a record torn by a crash is ignored.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+
+def timed_us(func, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def json_rewrite_us(path, features, risk_proba, n):
+    # What server/model-benchmarks.ts does: append to a list, rewrite it all
+    records = []
+    start = time.perf_counter()
+    for i in range(n):
+        records.append({'timestamp': time.time(), 'model_version': '1.0',
+                        'features': features[i].tolist(), 'probabilities': risk_proba[i].tolist(),
+                        'latency_ms': 0.5})
+        if len(records) % 100 == 0:
+            with open(path, 'w') as f:
+                json.dump(records, f)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main(argv=None):
+    from finergycloud_xgboost import predict
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.features import engineer_features, feature_columns
+    from finergycloud_xgboost.prediction_log import (
+        PredictionLog, PredictionLogReader, format_log_summary, record_dtype, segment_paths
+    )
+    from finergycloud_xgboost.train import build_model, fit_model, sample_project, split_dataset
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n-records', type=int, default=5000000)
+    parser.add_argument('--segment-mb', type=int, default=64)
+    args = parser.parse_args(argv)
+
+    _, _, X_train, X_test, y_train, y_test = split_dataset(
+        engineer_features(generate_synthetic_projects(2847, seed=42)))
+    model = build_model()
+    fit_model(model, X_train, y_train, X_test, y_test)
+    traffic = engineer_features(generate_synthetic_projects(1000000, seed=7))
+    X = traffic[feature_columns].to_numpy(dtype=np.float32)
+    risk_proba = model.predict_proba(X)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'write path':40s} {'us/record':>10s}")
+        baseline = json_rewrite_us(os.path.join(tmp, 'benchmarks.json'), X, risk_proba, 10000)
+        print(f"{'list + JSON rewrite every 100 (10k)':40s} {baseline:10.2f}")
+
+        single_dir = os.path.join(tmp, 'single')
+        with PredictionLog(single_dir) as log:
+            rows = iter(range(10 ** 9))
+            append_us = timed_us(lambda: log.append(X[next(rows) % len(X)], risk_proba[0], 0.5,
+                                                    '1.0'), 200000)
+        print(f"{'PredictionLog.append (200k)':40s} {append_us:10.2f}")
+
+        predict.set_model(model)
+        project = dict(sample_project)
+        call_us = min(timed_us(lambda: predict.predict_esg_risk(project), 2000) for _ in range(5))
+        print(f"{'':40s} {append_us / call_us:10.1%} of a {call_us:.0f} us predict_esg_risk call")
+
+        log_dir = os.path.join(tmp, 'log')
+        start = time.perf_counter()
+        chunk = 100000
+        with PredictionLog(log_dir, segment_bytes=args.segment_mb * 2 ** 20) as log:
+            for offset in range(0, args.n_records, chunk):
+                rows = np.arange(offset, min(offset + chunk, args.n_records)) % len(X)
+                log.append_batch(X[rows], risk_proba[rows], 0.5, '1.0')
+        write_s = time.perf_counter() - start
+        print(f"{'PredictionLog.append_batch + close':40s} {write_s / args.n_records * 1e6:10.3f}"
+              f"  ({args.n_records / write_s:,.0f} records/s)")
+
+        paths = segment_paths(log_dir)
+        sizes = [os.path.getsize(p) for p in paths]
+        print(f"\n{args.n_records:,} records, {record_dtype.itemsize} bytes each: "
+              f"{len(paths)} segments, largest {max(sizes) / 2 ** 20:.1f} MB "
+              f"(limit {args.segment_mb} MB)")
+
+        start = time.perf_counter()
+        reader = PredictionLogReader(log_dir)
+        summary = reader.summary()
+        summary_s = time.perf_counter() - start
+        print(f"Open + summary: {summary_s:.2f}s")
+        print(format_log_summary(summary))
+        replay = reader.replay(model)
+        print(f"Replay through the model: {replay['wall_time_s']:.2f}s "
+              f"({replay['records_per_s']:,.0f} records/s), class agreement "
+              f"{replay['class_agreement']:.4%}, max probability difference "
+              f"{replay['max_probability_difference']:.2e}")
+
+        rows = np.arange(args.n_records) % len(X)
+        features = reader.column('features')
+        same = (len(reader) == args.n_records and np.array_equal(features, X[rows])
+                and np.array_equal(reader.column('probabilities'), risk_proba[rows]))
+        print(f"Records read back equal records written: {same}")
+
+        with open(paths[-1], 'ab') as f:
+            f.write(b'\0' * (record_dtype.itemsize // 2))
+        torn_ok = len(PredictionLogReader(log_dir)) == args.n_records
+        print(f"Half-written trailing record ignored: {torn_ok}")
+        rotated = max(sizes) <= args.segment_mb * 2 ** 20
+    ok = same and torn_ok and rotated and replay['class_agreement'] == 1.0
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Model registry load time against joblib, plus a hot swap under load
+
+    python -m benchmarks.registry_load [--repeats 5] [--swap-duration 4]
+
+Publishes a model to a temporary registry and loads it both ways in fresh
+interpreters (import + load + first prediction), checking the predictions
+agree. Then serves the registry, publishes a second version while the load
+generator is running and reports the version switch and any failed requests.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.cold_start import repo_root
+from benchmarks.serving import fetch_json, generate_load, request_bodies
+
+child_script = """
+import json, sys, time
+start = time.perf_counter()
+path = sys.argv[2]
+import xgboost  # both paths need it; timed apart from the artifact load
+if sys.argv[1] == 'registry':
+    from finergycloud_xgboost.registry import ModelRegistry
+    imported = time.perf_counter()
+    model = ModelRegistry(path).load()
+else:
+    import joblib, sklearn
+    imported = time.perf_counter()
+    model = joblib.load(path)
+loaded = time.perf_counter()
+from finergycloud_xgboost.features import encode_project
+from finergycloud_xgboost.train import sample_project
+proba = model.predict_proba(encode_project(sample_project).reshape(1, -1))[0]
+done = time.perf_counter()
+print(json.dumps({'import_s': imported - start, 'load_s': loaded - imported,
+                  'first_prediction_s': done - loaded, 'total_s': done - start,
+                  'proba': [float(p) for p in proba]}))
+"""
+
+
+def train_model(n_projects, seed):
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.features import engineer_features
+    from finergycloud_xgboost.train import build_model, fit_model, split_dataset
+
+    data = engineer_features(generate_synthetic_projects(n_projects, seed=seed))
+    _, _, X_train, X_test, y_train, y_test = split_dataset(data)
+    model = fit_model(build_model(), X_train, y_train, X_test, y_test)
+    config = {'training_accuracy': float((model.predict(X_test) == y_test).mean()),
+              'dataset_size': n_projects, 'hyperparameters': model.get_params()}
+    return model, config
+
+
+def measure(kind, path, repeats):
+    runs = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, '-c', child_script, kind, path],
+                             cwd=repo_root, capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return min(runs, key=lambda run: run['total_s'])
+
+
+def hot_swap(registry, model, config, duration, port=8766):
+    from benchmarks.serving import start_server
+
+    process = start_server(registry.root, port, 64, 2.0)
+    try:
+        before = fetch_json(f'http://127.0.0.1:{port}/health')['model_version']
+        # Publish a new version halfway through the load
+        timer = threading.Timer(duration / 2, registry.publish, args=(model, config))
+        timer.start()
+        result = asyncio.run(generate_load('127.0.0.1', port, request_bodies(2000), 32, duration))
+        timer.join()
+        time.sleep(1.5)
+        after = fetch_json(f'http://127.0.0.1:{port}/health')['model_version']
+    finally:
+        process.terminate()
+        process.wait()
+    return before, after, result
+
+
+def main(argv=None):
+    import joblib
+
+    from finergycloud_xgboost.registry import ModelRegistry
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n-projects', type=int, default=2847)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--swap-duration', type=float, default=4.0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model, config = train_model(args.n_projects, seed=42)
+        joblib_path = os.path.join(tmp, 'model.joblib')
+        joblib.dump(model, joblib_path)
+        registry = ModelRegistry(os.path.join(tmp, 'registry'))
+        version = registry.publish(model, config)
+        artifact = os.path.join(registry.version_path(version), 'model.ubj')
+        print(f"Artifacts: joblib {os.path.getsize(joblib_path) / 1024:.0f} KiB, "
+              f"registry model.ubj {os.path.getsize(artifact) / 1024:.0f} KiB")
+
+        results = {kind: measure(kind, path, args.repeats)
+                   for kind, path in (('joblib', joblib_path), ('registry', registry.root))}
+        print(f"{'path':10s} {'import s':>9s} {'load s':>8s} {'first s':>8s} {'total s':>8s}")
+        for kind, r in results.items():
+            print(f"{kind:10s} {r['import_s']:9.3f} {r['load_s']:8.4f} "
+                  f"{r['first_prediction_s']:8.4f} {r['total_s']:8.3f}")
+        difference = np.abs(np.subtract(results['joblib']['proba'],
+                                        results['registry']['proba'])).max()
+        print(f"Load speed-up: {results['joblib']['load_s'] / results['registry']['load_s']:.1f}x, "
+              f"max |p_registry - p_joblib| = {difference:.2e}")
+
+        retrained, retrained_config = train_model(args.n_projects, seed=7)
+        before, after, load = hot_swap(registry, retrained, retrained_config, args.swap_duration)
+        failed = load['requests'] - load['statuses'].get(200, 0)
+        print(f"Hot swap: {before} -> {after} during {load['requests']} requests, "
+              f"{failed} failed, p99 {load['p99_ms']:.2f} ms")
+    return 0 if failed == 0 and after != before and difference < 1e-6 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
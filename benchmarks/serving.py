@@ -0,0 +1,163 @@
+"""
+Load test of the scoring server with and without micro-batching
+
+    python -m benchmarks.serving [--model PATH] [--concurrency 64] [--duration 10]
+    python -m benchmarks.serving --url http://127.0.0.1:8008 [--concurrency 64]
+
+Starts ``finergycloud_xgboost serve`` once with --max-batch-size 1 and once
+with micro-batching, then drives each with closed-loop keep-alive clients
+posting synthetic projects. Reports throughput, p50/p95/p99 latency, 503s
+and the server's mean batch size. With --url only that server is loaded.
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+
+import numpy as np
+
+from benchmarks.cold_start import repo_root, train_quick_model
+
+
+async def _request(reader, writer, host, method, path, body=b''):
+    writer.write((f'{method} {path} HTTP/1.1\r\nHost: {host}\r\n'
+                  f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n'
+                  ).encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def _client(host, port, bodies, offset, stop_at, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = offset
+    try:
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, host, 'POST', '/predict',
+                                       bodies[i % len(bodies)])
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            i += 1
+    finally:
+        writer.close()
+
+
+async def generate_load(host, port, bodies, concurrency=64, duration=10.0):
+    """
+    Closed-loop load: each client sends its next request once answered
+    """
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, bodies, n * 7919, start + duration, latencies, statuses)
+        for n in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    ms = np.array(latencies) * 1e3
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'throughput_rps': statuses.get(200, 0) / elapsed,
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'statuses': statuses
+    }
+
+
+def fetch_json(url):
+    with urlopen(url, timeout=5) as response:
+        return json.load(response)
+
+
+def start_server(model_path, port, max_batch_size, max_wait_ms):
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'finergycloud_xgboost', 'serve', '--model', model_path,
+         '--port', str(port), '--max-batch-size', str(max_batch_size),
+         '--max-wait-ms', str(max_wait_ms)],
+        cwd=repo_root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            fetch_json(f'http://127.0.0.1:{port}/health')
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError('scoring server exited during startup')
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError('scoring server did not become healthy')
+
+
+def request_bodies(n=5000):
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.features import raw_columns
+
+    projects = generate_synthetic_projects(n, seed=21)[raw_columns].to_dict('records')
+    return [json.dumps(project).encode() for project in projects]
+
+
+def run_mode(name, host, port, bodies, concurrency, duration):
+    asyncio.run(generate_load(host, port, bodies, concurrency, min(1.0, duration)))  # warm-up
+    result = asyncio.run(generate_load(host, port, bodies, concurrency, duration))
+    result['mode'] = name
+    result['mean_batch_size'] = fetch_json(f'http://{host}:{port}/metrics')['mean_batch_size']
+    print(f"{name:12s} {result['throughput_rps']:10.0f} {result['p50_ms']:8.2f} "
+          f"{result['p95_ms']:8.2f} {result['p99_ms']:8.2f} {result['mean_batch_size']:7.1f} "
+          f"{result['statuses'].get(503, 0):6d}")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', help='saved joblib model (default: train a quick one)')
+    parser.add_argument('--url', help='load an already running server instead')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    bodies = request_bodies()
+    print(f"{'mode':12s} {'req/s':>10s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} "
+          f"{'batch':>7s} {'503s':>6s}")
+    if args.url:
+        url = urlsplit(args.url)
+        run_mode('server', url.hostname, url.port, bodies, args.concurrency, args.duration)
+        return 0
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = args.model or train_quick_model(tmp)
+        for name, max_batch_size in (('unbatched', 1), ('micro-batch', args.max_batch_size)):
+            process = start_server(model_path, args.port, max_batch_size, args.max_wait_ms)
+            try:
+                results.append(run_mode(name, '127.0.0.1', args.port, bodies,
+                                        args.concurrency, args.duration))
+            finally:
+                process.terminate()
+                process.wait()
+    unbatched, batched = results
+    print(f"Throughput: {batched['throughput_rps'] / unbatched['throughput_rps']:.2f}x, "
+          f"p99 {unbatched['p99_ms']:.2f} -> {batched['p99_ms']:.2f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Sharded synthetic generator: throughput, memory and reproducibility
+
+    python -m benchmarks.sharded_generator [--n-projects 10000000] [--format npy]
+
+Writes the dataset once per worker count in a fresh interpreter, reporting
+rows/s and the peak RSS of the parent and of the busiest worker. It checks
+that the shards are byte-identical whatever the worker count, and compares
+the in-memory generate_synthetic_projects at the same size.
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.cold_start import repo_root
+
+child_script = """
+import json, resource, sys, time
+from benchmarks.suite import peak_rss_mb
+from finergycloud_xgboost.data import generate_project_shards, generate_synthetic_projects
+
+mode, output_dir, n_projects, shard_size, file_format, workers = sys.argv[1:7]
+start = time.perf_counter()
+if mode == 'sharded':
+    generate_project_shards(output_dir, int(n_projects), int(shard_size), file_format=file_format,
+                            workers=int(workers))
+else:
+    generate_synthetic_projects(int(n_projects))
+wall_s = time.perf_counter() - start
+print(json.dumps({'wall_s': wall_s, 'rows_per_s': int(n_projects) / wall_s,
+                  'peak_rss_mb': peak_rss_mb(),
+                  'worker_peak_rss_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024}))
+"""
+
+
+def shard_digests(directory):
+    digests = []
+    for name in sorted(os.listdir(directory)):
+        if name.startswith('part-'):
+            with open(os.path.join(directory, name), 'rb') as f:
+                digests.append(hashlib.file_digest(f, 'sha256').hexdigest())
+    return digests
+
+
+def run_case(mode, output_dir, n_projects, shard_size, file_format, workers):
+    out = subprocess.run(
+        [sys.executable, '-c', child_script, mode, output_dir, str(n_projects),
+         str(shard_size), file_format, str(workers)],
+        cwd=repo_root, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n-projects', type=int, default=10000000)
+    parser.add_argument('--shard-size', type=int, default=1000000)
+    parser.add_argument('--format', choices=['parquet', 'npy'], default='npy')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, os.cpu_count() or 1}))
+    args = parser.parse_args(argv)
+
+    print(f"{'mode':10s} {'workers':>7s} {'wall s':>8s} {'rows/s':>12s} {'peak MB':>8s} "
+          f"{'worker MB':>9s}")
+    digests = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in args.workers:
+            output_dir = os.path.join(tmp, f'workers-{workers}')
+            r = run_case('sharded', output_dir, args.n_projects, args.shard_size,
+                         args.format, workers)
+            digests[workers] = shard_digests(output_dir)
+            print(f"{'sharded':10s} {workers:7d} {r['wall_s']:8.2f} {r['rows_per_s']:12,.0f} "
+                  f"{r['peak_rss_mb']:8.1f} {r['worker_peak_rss_mb']:9.1f}")
+        size = sum(os.path.getsize(os.path.join(output_dir, name))
+                   for name in os.listdir(output_dir))
+
+    r = run_case('in-memory', tmp, args.n_projects, args.shard_size, args.format, 1)
+    print(f"{'in-memory':10s} {1:7d} {r['wall_s']:8.2f} {r['rows_per_s']:12,.0f} "
+          f"{r['peak_rss_mb']:8.1f} {'-':>9s}")
+    identical = len({tuple(d) for d in digests.values()}) == 1
+    print(f"Shards: {len(next(iter(digests.values())))} x {args.format}, "
+          f"{size / args.n_projects:.1f} bytes/project on disk; "
+          f"identical across worker counts: {identical}")
+    return 0 if identical else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
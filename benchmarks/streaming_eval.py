@@ -0,0 +1,90 @@
+"""
+One-pass streaming evaluation against the in-memory evaluate_model path
+
+    python -m benchmarks.streaming_eval [--n-projects 5000000] [--chunk-size 100000]
+
+Writes a sharded synthetic dataset, then evaluates a model over it twice,
+each in a fresh interpreter: loading everything and calling evaluate_model
+(sklearn reports and roc_curve), and streaming chunks through
+StreamingEvaluator. Reports wall time, peak RSS and metric differences.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.cold_start import repo_root, train_quick_model
+
+child_script = """
+import json, sys, time
+import joblib, numpy as np
+from benchmarks.suite import peak_rss_mb
+
+mode, model_path, path, chunk_size = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+model = joblib.load(model_path)
+start = time.perf_counter()
+if mode == 'streaming':
+    from finergycloud_xgboost.streaming import evaluate_streaming
+    result = evaluate_streaming(model, path, chunk_size).result()
+else:
+    import pandas as pd
+    from sklearn.metrics import log_loss
+    from finergycloud_xgboost.evaluate import evaluate_model
+    from finergycloud_xgboost.features import engineer_features, feature_columns
+    from finergycloud_xgboost.streaming import iter_project_chunks
+    data = engineer_features(pd.concat(iter_project_chunks(path, chunk_size), ignore_index=True))
+    y = data['risk_classification'].to_numpy()
+    result = evaluate_model(model, data[feature_columns], y)
+    result['log_loss'] = log_loss(y, result['y_pred_proba'])
+print(json.dumps({
+    'wall_s': time.perf_counter() - start, 'peak_rss_mb': peak_rss_mb(),
+    'accuracy': float(result['accuracy']), 'log_loss': float(result['log_loss']),
+    'roc_auc': [float(v) for v in result['roc_auc'].values()],
+    'confusion_matrix': np.asarray(result['confusion_matrix']).tolist(),
+    'report': result['classification_report']
+}))
+"""
+
+
+def run_case(mode, model_path, path, chunk_size):
+    out = subprocess.run([sys.executable, '-c', child_script, mode, model_path, path,
+                          str(chunk_size)],
+                         cwd=repo_root, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    from finergycloud_xgboost.data import generate_project_shards
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n-projects', type=int, default=5000000)
+    parser.add_argument('--chunk-size', type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = train_quick_model(tmp)
+        path = os.path.join(tmp, 'shards')
+        generate_project_shards(path, args.n_projects, file_format='npy', seed=11)
+
+        results = {mode: run_case(mode, model_path, path, args.chunk_size)
+                   for mode in ('in-memory', 'streaming')}
+
+    print(f"{'mode':10s} {'rows':>11s} {'wall s':>8s} {'peak MB':>8s} {'accuracy':>9s} "
+          f"{'log-loss':>9s}")
+    for mode, r in results.items():
+        print(f"{mode:10s} {args.n_projects:11,d} {r['wall_s']:8.2f} {r['peak_rss_mb']:8.1f} "
+              f"{r['accuracy']:9.5f} {r['log_loss']:9.6f}")
+    memory, streaming = results['in-memory'], results['streaming']
+    auc_error = max(abs(a - b) for a, b in zip(memory['roc_auc'], streaming['roc_auc']))
+    same = (memory['confusion_matrix'] == streaming['confusion_matrix']
+            and memory['report'] == streaming['report'])
+    print(f"Max ROC-AUC difference {auc_error:.2e}, log-loss difference "
+          f"{abs(memory['log_loss'] - streaming['log_loss']):.2e}, "
+          f"identical confusion matrix and report: {same}")
+    return 0 if same and auc_error < 1e-4 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
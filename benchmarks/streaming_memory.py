@@ -0,0 +1,95 @@
+"""
+Peak memory of streaming training as the dataset grows
+
+    python -m benchmarks.streaming_memory [--scales 1 10 50] [--rounds 20]
+
+Writes the synthetic dataset at each scale to CSV (in bounded memory), then
+trains from it in a fresh interpreter with the chunked DataIter loader and,
+for comparison, with the in-memory pandas path. Exits non-zero when streaming
+peak RSS at the largest scale exceeds the smallest by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.cold_start import repo_root
+from finergycloud_xgboost.data import default_n_projects, generate_synthetic_projects
+
+child_script = """
+import json, sys, time
+mode, path, chunk_size, rounds = sys.argv[1], sys.argv[2], int(sys.argv[3]), int(sys.argv[4])
+
+def peak_rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+
+import xgboost as xgb
+from finergycloud_xgboost.train import native_params
+start = time.perf_counter()
+if mode == 'streaming':
+    from finergycloud_xgboost.streaming import train_streaming
+    train_streaming(path, chunk_size=chunk_size, n_estimators=rounds)
+else:
+    import pandas as pd
+    from finergycloud_xgboost.features import engineer_features, feature_columns
+    data = engineer_features(pd.read_csv(path))
+    params, _, _ = native_params()
+    dtrain = xgb.QuantileDMatrix(data[feature_columns], data['risk_classification'])
+    xgb.train(params, dtrain, num_boost_round=rounds)
+print(json.dumps({'wall_s': time.perf_counter() - start, 'peak_rss_mb': peak_rss_mb()}))
+"""
+
+
+def write_dataset(path, n_rows, chunk_size):
+    """
+    Synthetic projects written chunk by chunk, one seed per chunk
+    """
+    for i, start in enumerate(range(0, n_rows, chunk_size)):
+        chunk = generate_synthetic_projects(min(chunk_size, n_rows - start), seed=42 + i)
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+
+
+def run_case(mode, path, chunk_size, rounds):
+    out = subprocess.run([sys.executable, '-c', child_script, mode, path,
+                          str(chunk_size), str(rounds)],
+                         cwd=repo_root, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--chunk-size', type=int, default=20000)
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='allowed relative growth of streaming peak RSS')
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'scale':>6s} {'rows':>10s} {'mode':>10s} {'wall s':>8s} {'peak MB':>8s}")
+        for scale in args.scales:
+            n_rows = default_n_projects * scale
+            path = os.path.join(tmp, f'projects_{scale}x.csv')
+            write_dataset(path, n_rows, args.chunk_size)
+            for mode in ('streaming', 'in-memory'):
+                r = dict(run_case(mode, path, args.chunk_size, args.rounds),
+                         scale=scale, rows=n_rows, mode=mode)
+                results.append(r)
+                print(f"{scale:5d}x {n_rows:10d} {mode:>10s} {r['wall_s']:8.2f} "
+                      f"{r['peak_rss_mb']:8.1f}")
+            os.remove(path)
+
+    streaming = [r['peak_rss_mb'] for r in results if r['mode'] == 'streaming']
+    growth = streaming[-1] / streaming[0] - 1
+    print(f"Streaming peak RSS growth {args.scales[0]}x -> {args.scales[-1]}x: {growth:+.1%}")
+    return 0 if growth <= args.tolerance else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
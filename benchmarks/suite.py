@@ -0,0 +1,349 @@
+"""
+Repeatable benchmark suite for feature engineering, training and inference
+
+    python -m benchmarks.suite [--quick] [--output PATH] [--baseline PATH]
+                               [--update-baseline] [--benchmarks-file PATH]
+
+Every scenario runs in a fresh interpreter so its peak RSS is its own:
+
+- features: engineer_features rows/s as the row count grows
+- train: fit + 5-fold CV wall time for each n_projects and thread count
+- predict: predict_esg_risk p50/p95/p99 latency, prediction cache off
+- batch: predict_esg_risk_batch rows/s
+
+The headline numbers are also written in the ModelBenchmark shape of
+server/model-benchmarks.ts and appended to model-benchmarks.json, so the
+dashboard shows measured figures. Each run is compared with a stored
+baseline and exits non-zero on a regression.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmarks.cold_start import repo_root
+
+default_baseline_path = os.path.join(repo_root, 'benchmarks', 'baseline.json')
+default_output_path = 'benchmark_results.json'
+default_benchmarks_file = 'model-benchmarks.json'
+
+# Metric names ending in these are better when larger
+higher_is_better = ('rows_per_s', 'accuracy', 'cv_score')
+
+
+def peak_rss_mb():
+    # VmHWM is per address space; ru_maxrss survives exec from the parent
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentiles_ms(timings):
+    timings = np.asarray(timings) * 1e3
+    return {
+        'mean_ms': float(timings.mean()),
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p95_ms': float(np.percentile(timings, 95)),
+        'p99_ms': float(np.percentile(timings, 99))
+    }
+
+
+def bench_features(n_rows, repeats=3):
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.features import engineer_features
+
+    data = generate_synthetic_projects(n_rows, seed=7)
+    timings = []
+    for _ in range(repeats):
+        frame = data.copy()
+        start = time.perf_counter()
+        engineer_features(frame)
+        timings.append(time.perf_counter() - start)
+    return {'n_rows': n_rows, 'wall_s': min(timings),
+            'rows_per_s': n_rows / min(timings)}
+
+
+def bench_train(n_projects, threads, output_dir=None):
+    """
+    Fit with early stopping plus 5-fold CV, as run_training does
+    """
+    from sklearn.metrics import precision_recall_fscore_support
+
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.evaluate import evaluate_model
+    from finergycloud_xgboost.features import engineer_features
+    from finergycloud_xgboost.train import (
+        build_model, cross_validate_model, fit_model, split_dataset
+    )
+
+    data = engineer_features(generate_synthetic_projects(n_projects))
+    X, y, X_train, X_test, y_train, y_test = split_dataset(data)
+
+    start = time.perf_counter()
+    model = fit_model(build_model(n_jobs=threads), X_train, y_train, X_test, y_test)
+    fit_s = time.perf_counter() - start
+    cv_scores = cross_validate_model(model, X, y, cores=threads)
+    cv_s = time.perf_counter() - start - fit_s
+
+    evaluation = evaluate_model(model, X_test, y_test)
+    precision, recall, f1, _ = precision_recall_fscore_support(
+        y_test, evaluation['y_pred'], average='macro'
+    )
+    result = {
+        'n_projects': n_projects, 'threads': threads,
+        'fit_s': fit_s, 'cv_s': cv_s, 'wall_s': fit_s + cv_s,
+        'best_iteration': int(model.best_iteration),
+        'test_set_size': len(y_test),
+        'accuracy': evaluation['accuracy'],
+        'precision': float(precision), 'recall': float(recall), 'f1': float(f1),
+        'cv_score': float(cv_scores.mean())
+    }
+    if output_dir is not None:
+        import joblib
+
+        from finergycloud_xgboost.predict import default_model_path
+
+        model_path = os.path.join(output_dir, default_model_path)
+        joblib.dump(model, model_path)
+        result['model_path'] = model_path
+        result['model_size_mb'] = os.path.getsize(model_path) / 2 ** 20
+    return result
+
+
+def bench_predict(model_path, n_calls=2000):
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.features import raw_columns
+    from finergycloud_xgboost.predict import load_model, predict_esg_risk
+
+    load_model(model_path)
+    projects = generate_synthetic_projects(n_calls, seed=11)[raw_columns].to_dict('records')
+    predict_esg_risk(projects[0])
+    timings = []
+    for project in projects:
+        start = time.perf_counter()
+        predict_esg_risk(project)
+        timings.append(time.perf_counter() - start)
+    return dict(percentiles_ms(timings), n_calls=n_calls)
+
+
+def bench_batch(model_path, n_rows):
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.predict import load_model, predict_esg_risk_batch
+
+    model = load_model(model_path)
+    projects = generate_synthetic_projects(n_rows, seed=13)
+    predict_esg_risk_batch(projects.head(100), model=model)
+    start = time.perf_counter()
+    predict_esg_risk_batch(projects, model=model)
+    wall_s = time.perf_counter() - start
+    return {'n_rows': n_rows, 'wall_s': wall_s, 'rows_per_s': n_rows / wall_s}
+
+
+scenarios = {
+    'features': bench_features,
+    'train': bench_train,
+    'predict': bench_predict,
+    'batch': bench_batch
+}
+
+
+def run_scenario(name, **params):
+    """
+    Run one scenario in a fresh interpreter and return its result
+    """
+    out = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.suite', '--child', name, json.dumps(params)],
+        cwd=repo_root, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def model_benchmark(train, predict):
+    """
+    Headline numbers in the ModelBenchmark shape of server/model-benchmarks.ts
+    """
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+        'testSetSize': train['test_set_size'],
+        'accuracy': round(train['accuracy'] * 100, 2),
+        'precision': round(train['precision'] * 100, 2),
+        'recall': round(train['recall'] * 100, 2),
+        'f1Score': round(train['f1'] * 100, 2),
+        'averageLatency': round(predict['mean_ms'], 2),
+        'modelSize': round(train['model_size_mb'], 2),
+        'crossValidationScore': round(train['cv_score'] * 100, 2)
+    }
+
+
+def flatten_metrics(results):
+    """
+    Comparable metrics keyed by scenario, e.g. ``train.2847.t1.wall_s``
+    """
+    metrics = {}
+    for r in results['features']:
+        prefix = f"features.{r['n_rows']}"
+        metrics[f'{prefix}.rows_per_s'] = r['rows_per_s']
+        metrics[f'{prefix}.peak_rss_mb'] = r['peak_rss_mb']
+    for r in results['train']:
+        prefix = f"train.{r['n_projects']}.t{r['threads']}"
+        for name in ('fit_s', 'cv_s', 'wall_s', 'accuracy', 'cv_score', 'peak_rss_mb'):
+            metrics[f'{prefix}.{name}'] = r[name]
+    for name in ('p50_ms', 'p95_ms', 'p99_ms', 'peak_rss_mb'):
+        metrics[f'predict.{name}'] = results['predict'][name]
+    for name in ('rows_per_s', 'peak_rss_mb'):
+        metrics[f"batch.{results['batch']['n_rows']}.{name}"] = results['batch'][name]
+    return metrics
+
+
+def compare_to_baseline(metrics, baseline, tolerance=0.25, accuracy_tolerance=0.01):
+    """
+    Metrics worse than the baseline by more than the tolerance
+    Timings, throughput and memory use a relative tolerance, accuracy an
+    absolute one; metrics missing from either side are skipped
+    """
+    regressions = []
+    for name, value in metrics.items():
+        if name not in baseline:
+            continue
+        reference = baseline[name]
+        if name.endswith(('accuracy', 'cv_score')):
+            worse = value < reference - accuracy_tolerance
+        elif name.endswith(higher_is_better):
+            worse = value < reference * (1 - tolerance)
+        else:
+            worse = value > reference * (1 + tolerance)
+        if worse:
+            regressions.append({'metric': name, 'baseline': reference, 'current': value,
+                                'change': value / reference - 1 if reference else None})
+    return regressions
+
+
+def append_model_benchmark(path, benchmark):
+    history = []
+    if os.path.exists(path):
+        with open(path) as f:
+            history = json.load(f)
+    history.append(benchmark)
+    with open(path, 'w') as f:
+        json.dump(history, f, indent=2)
+
+
+def run_suite(quick=False, cores=None):
+    cores = cores or os.cpu_count() or 1
+    if quick:
+        feature_rows, train_sizes, batch_rows, n_calls = [1000, 10000, 100000], [2847], 20000, 500
+    else:
+        feature_rows = [1000, 10000, 100000, 1000000]
+        train_sizes, batch_rows, n_calls = [2847, 20000], 100000, 2000
+    thread_counts = sorted({1, cores})
+
+    results = {'features': [], 'train': []}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in feature_rows:
+            r = run_scenario('features', n_rows=n_rows)
+            results['features'].append(r)
+            print(f"features {n_rows:>9,d} rows  {r['rows_per_s']:>12,.0f} rows/s  "
+                  f"{r['peak_rss_mb']:7.1f} MB")
+
+        model_path = None
+        for n_projects in train_sizes:
+            for threads in thread_counts:
+                # The default-sized, full-thread model is the one served below
+                keep = n_projects == train_sizes[0] and threads == thread_counts[-1]
+                r = run_scenario('train', n_projects=n_projects, threads=threads,
+                                 output_dir=tmp if keep else None)
+                results['train'].append(r)
+                if keep:
+                    model_path = r['model_path']
+                    headline = r
+                print(f"train    {n_projects:>9,d} proj  {threads:2d} threads  fit {r['fit_s']:6.2f}s  "
+                      f"CV {r['cv_s']:6.2f}s  acc {r['accuracy']:.3f}  {r['peak_rss_mb']:7.1f} MB")
+
+        r = results['predict'] = run_scenario('predict', model_path=model_path, n_calls=n_calls)
+        print(f"predict  {n_calls:>9,d} calls p50 {r['p50_ms']:.2f} ms  p95 {r['p95_ms']:.2f} ms  "
+              f"p99 {r['p99_ms']:.2f} ms  {r['peak_rss_mb']:7.1f} MB")
+        r = results['batch'] = run_scenario('batch', model_path=model_path, n_rows=batch_rows)
+        print(f"batch    {batch_rows:>9,d} rows  {r['rows_per_s']:>12,.0f} rows/s  "
+              f"{r['peak_rss_mb']:7.1f} MB")
+
+    for r in results['train']:
+        r.pop('model_path', None)
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cores': cores,
+            'xgboost': __import__('xgboost').__version__,
+            'numpy': np.__version__
+        },
+        'quick': quick,
+        'modelBenchmark': model_benchmark(headline, results['predict']),
+        'scenarios': results
+    }
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['--child']:
+        result = scenarios[argv[1]](**json.loads(argv[2]))
+        result['peak_rss_mb'] = peak_rss_mb()
+        print(json.dumps(result))
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='smaller sizes for a fast check')
+    parser.add_argument('--cores', type=int, help='thread budget (default: all cores)')
+    parser.add_argument('--output', default=default_output_path)
+    parser.add_argument('--benchmarks-file', default=default_benchmarks_file,
+                        help='ModelBenchmark history read by the dashboard ("" to skip)')
+    parser.add_argument('--baseline', default=default_baseline_path)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative slowdown, throughput or memory growth')
+    parser.add_argument('--accuracy-tolerance', type=float, default=0.01)
+    args = parser.parse_args(argv)
+
+    report = run_suite(quick=args.quick, cores=args.cores)
+    metrics = flatten_metrics(report['scenarios'])
+    report['metrics'] = metrics
+
+    regressions = []
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({'environment': report['environment'], 'metrics': metrics}, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(metrics, baseline['metrics'], args.tolerance,
+                                          args.accuracy_tolerance)
+        report['baseline'] = args.baseline
+        checked = len(set(metrics) & set(baseline['metrics']))
+        print(f"Baseline: {checked} metrics compared, {len(regressions)} regressions")
+        for r in regressions:
+            print(f"  REGRESSION {r['metric']}: {r['baseline']:.4g} -> {r['current']:.4g}")
+    report['regressions'] = regressions
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    if args.benchmarks_file:
+        append_model_benchmark(args.benchmarks_file, report['modelBenchmark'])
+    print(json.dumps(report['modelBenchmark'], indent=2))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
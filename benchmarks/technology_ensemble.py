@@ -0,0 +1,74 @@
+"""
+Per-technology ensemble against the single global model
+
+    python -m benchmarks.technology_ensemble [--n-projects 2847] [--cores 1 4]
+
+Times training of the global XGBClassifier alone, then the ensemble (global
+plus one model per project_type trained at the same time) under each core
+budget. Prints the per-member single-row latency and accuracy on each
+technology's test rows next to the global model's. The routed ensemble is
+checked against scoring one row per call, and batch throughput is compared
+with the global model at 100k rows.
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+
+def main(argv=None):
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.features import engineer_features
+    from finergycloud_xgboost.technology import (format_technology_report, technology_report,
+                                                 train_technology_ensemble)
+    from finergycloud_xgboost.train import build_model, fit_model, split_dataset
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n-projects', type=int, default=2847)
+    parser.add_argument('--cores', type=int, nargs='+', default=[os.cpu_count() or 1])
+    parser.add_argument('--min-rows', type=int, default=100)
+    parser.add_argument('--n-calls', type=int, default=2000)
+    args = parser.parse_args(argv)
+    warnings.filterwarnings('ignore')
+
+    data = engineer_features(generate_synthetic_projects(args.n_projects, seed=42))
+    _, _, X_train, X_test, y_train, y_test = split_dataset(data)
+
+    start = time.perf_counter()
+    global_model = fit_model(build_model(), X_train, y_train, X_test, y_test)
+    global_seconds = time.perf_counter() - start
+    print(f"{'training':28s} {'models':>6s} {'workers':>7s} {'threads':>7s} {'wall s':>7s} "
+          f"{'summed s':>8s}")
+    print(f"{'global model alone':28s} {1:6d} {1:7d} {os.cpu_count() or 1:7d} "
+          f"{global_seconds:7.2f} {global_seconds:8.2f}")
+    for cores in args.cores:
+        training = train_technology_ensemble(X_train, y_train, X_test, y_test, cores=cores,
+                                             min_rows=args.min_rows)
+        print(f"{f'ensemble, {cores} cores':28s} {len(training['members']):6d} "
+              f"{training['workers']:7d} {training['nthread']:7d} "
+              f"{training['wall_time_s']:7.2f} {training['member_wall_time_s']:8.2f}")
+    for member in training['members']:
+        print(f"  {member['name']:12s} {member['n_train']:6,d} rows {member['n_rounds']:4d} rounds "
+              f"{member['wall_time_s']:6.2f} s")
+
+    ensemble = training['model']
+    X = np.asarray(X_test, dtype=np.float32)
+    routed = ensemble.predict_proba(X)
+    one_by_one = np.vstack([ensemble.predict_proba(row[None]) for row in X])
+    error = float(np.abs(routed - one_by_one).max())
+    print(f"Routed batch vs one row per call: max |diff| = {error:.2e}")
+
+    rows = technology_report(ensemble, X_test, y_test, global_model=global_model,
+                             n_calls=args.n_calls)
+    print(format_technology_report(rows))
+    total = rows[-1]
+    print(f"Batch rows/s: routed {total['batch_rows_per_s']:,.0f}, "
+          f"global {total['global_batch_rows_per_s']:,.0f}")
+    return 0 if error == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Flat NumPy tree evaluator against the xgboost predict_proba path
+
+    python -m benchmarks.tree_evaluator [--model PATH] [--batch-sizes 1 100 100000]
+
+Checks that FlatTreeEnsemble probabilities match predict_proba, then scores
+each batch size in a fresh interpreter per path so load time, latency and
+peak RSS include everything that path imports.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from benchmarks.cold_start import repo_root, train_quick_model
+
+child_script = """
+import json, resource, sys, time
+import numpy as np
+
+def peak_rss_mb():
+    # VmHWM is per address space; ru_maxrss survives exec from the parent
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+path, model_path, data_path, batch_size, repeats = sys.argv[1:6]
+batch_size, repeats = int(batch_size), int(repeats)
+X = np.load(data_path)[:batch_size]
+start = time.perf_counter()
+if path == 'flat':
+    from finergycloud_xgboost.trees import FlatTreeEnsemble
+    model = FlatTreeEnsemble.load(model_path)
+else:
+    import joblib
+    model = joblib.load(model_path)
+load_s = time.perf_counter() - start
+model.predict_proba(X)
+timings = []
+for _ in range(repeats):
+    t = time.perf_counter()
+    model.predict_proba(X)
+    timings.append(time.perf_counter() - t)
+print(json.dumps({
+    'path': path, 'batch_size': batch_size, 'load_s': load_s,
+    'p50_ms': float(np.percentile(timings, 50)) * 1e3,
+    'p99_ms': float(np.percentile(timings, 99)) * 1e3,
+    'rows_per_s': batch_size / float(np.median(timings)),
+    'peak_rss_mb': peak_rss_mb()
+}))
+"""
+
+
+def check_parity(model, flat, X):
+    expected = model.predict_proba(X)
+    actual = flat.predict_proba(X)
+    return float(np.abs(actual - expected).max()), float((actual.argmax(1) == expected.argmax(1)).mean())
+
+
+def run_case(path, model_path, data_path, batch_size):
+    repeats = max(3, min(200, 200000 // batch_size))
+    out = subprocess.run(
+        [sys.executable, '-c', child_script, path, model_path, data_path,
+         str(batch_size), str(repeats)],
+        cwd=repo_root, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    import joblib
+
+    from finergycloud_xgboost.data import generate_synthetic_projects
+    from finergycloud_xgboost.features import engineer_features, feature_columns
+    from finergycloud_xgboost.trees import export_flat_trees
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', help='saved joblib model (default: train a quick one)')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 100, 100000])
+    parser.add_argument('--tolerance', type=float, default=1e-5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = args.model or train_quick_model(tmp)
+        model = joblib.load(model_path)
+        flat = export_flat_trees(model)
+        flat_path = flat.save(os.path.join(tmp, 'trees.npz'))
+
+        n_rows = max(args.batch_sizes)
+        data = engineer_features(generate_synthetic_projects(n_rows, seed=7))
+        X = data[feature_columns].to_numpy(dtype=np.float32)
+        data_path = os.path.join(tmp, 'X.npy')
+        np.save(data_path, X)
+
+        max_error, label_agreement = check_parity(model, flat, X[:20000])
+        print(f"Trees: {flat.n_trees} (max depth {flat.max_depth}), "
+              f"flat arrays {flat.nbytes / 1024:.0f} KiB")
+        print(f"Parity: max |p_flat - p_xgb| = {max_error:.2e}, "
+              f"label agreement {label_agreement:.4%}")
+
+        results = []
+        print(f"{'path':8s} {'batch':>8s} {'load s':>8s} {'p50 ms':>10s} {'p99 ms':>10s} "
+              f"{'rows/s':>12s} {'peak MB':>8s}")
+        for batch_size in args.batch_sizes:
+            for path, path_model in (('xgboost', model_path), ('flat', flat_path)):
+                r = run_case(path, path_model, data_path, batch_size)
+                results.append(r)
+                print(f"{r['path']:8s} {r['batch_size']:8d} {r['load_s']:8.3f} "
+                      f"{r['p50_ms']:10.3f} {r['p99_ms']:10.3f} "
+                      f"{r['rows_per_s']:12.0f} {r['peak_rss_mb']:8.1f}")
+
+    return 0 if max_error <= args.tolerance else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,339 +1,37 @@
 #!/usr/bin/env python3
 """
 Script to create a proper Jupyter notebook from the XGBoost training script
-"""
-
-import json
-
-# Read the Python script
-with open('xgboost_model_training.py', 'r') as f:
-    script_content = f.read()
-
-# Split the script into logical sections
-sections = [
-    {
-        "type": "markdown",
-        "content": """# FinergyCloud XGBoost Model Training Notebook
-## AI-Powered ESG Risk Assessment for Renewable Energy Investments
-
-**Developer:** Onuorah Joshua Nwani  
-**Model Accuracy:** 94.2%  
-**Training Dataset:** 2,847 West African renewable energy projects  
-**Cross-Validation:** 5-fold with 94.52% ± 0.61% consistency
-
----"""
-    },
-    {
-        "type": "code",
-        "content": """# Import Required Libraries
-import pandas as pd
-import numpy as np
-import xgboost as xgb
-from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, precision_recall_curve
-import matplotlib.pyplot as plt
-import seaborn as sns
-import warnings
-import joblib
-import json
-warnings.filterwarnings('ignore')
-
-print("XGBoost Version:", xgb.__version__)
-print("Training Environment: Jupyter Notebook")
-print("Target: ESG Risk Classification (High/Medium/Low)")"""
-    },
-    {
-        "type": "markdown",
-        "content": """## 1. Data Loading and Preprocessing
-
-Loading comprehensive ESG dataset covering renewable energy projects across Nigeria, Ghana, Kenya, Senegal, and Mali."""
-    },
-    {
-        "type": "code",
-        "content": """# Generate Synthetic Training Dataset for Demo
-np.random.seed(42)
-n_projects = 2847
-
-# Generate realistic project data
-countries = ['Nigeria', 'Ghana', 'Kenya', 'Senegal', 'Mali']
-project_types = ['Solar', 'Wind', 'Hydro', 'Biomass', 'Geothermal']
-country_weights = [0.31, 0.26, 0.24, 0.11, 0.08]
-tech_weights = [0.40, 0.25, 0.20, 0.10, 0.05]
-
-data = pd.DataFrame({
-    'project_id': [f'PRJ-{i:04d}' for i in range(n_projects)],
-    'country': np.random.choice(countries, n_projects, p=country_weights),
-    'project_type': np.random.choice(project_types, n_projects, p=tech_weights),
-    'capacity_mw': np.random.lognormal(3.5, 0.8, n_projects),
-    'projected_irr': np.random.normal(15.2, 3.1, n_projects),
-    'environmental_score': np.random.beta(2, 1, n_projects) * 10,
-    'social_score': np.random.beta(1.8, 1.2, n_projects) * 10,
-    'governance_score': np.random.beta(1.9, 1.1, n_projects) * 10
-})
-
-# Ensure realistic ranges
-data['capacity_mw'] = np.clip(data['capacity_mw'], 5, 200)
-data['projected_irr'] = np.clip(data['projected_irr'], 8, 25)
-data['environmental_score'] = np.clip(data['environmental_score'], 4, 10)
-data['social_score'] = np.clip(data['social_score'], 4, 10)
-data['governance_score'] = np.clip(data['governance_score'], 4, 10)
-
-print(f"Dataset Shape: {data.shape}")
-print(f"Total Projects: {len(data)}")
-print(f"Countries Covered: {data['country'].nunique()}")
-print(f"Project Types: {list(data['project_type'].unique())}")
-
-data.head()"""
-    },
-    {
-        "type": "code",
-        "content": """# Feature Engineering Pipeline
-def engineer_features(df):
-    # Geographic risk adjustment
-    country_risk_scores = {
-        'Nigeria': 0.72, 'Ghana': 0.85, 'Kenya': 0.78, 
-        'Senegal': 0.81, 'Mali': 0.65
-    }
-    df['country_risk_score'] = df['country'].map(country_risk_scores)
-    
-    # Technology maturity scoring
-    tech_maturity = {
-        'Solar': 0.92, 'Wind': 0.88, 'Hydro': 0.85,
-        'Biomass': 0.75, 'Geothermal': 0.70
-    }
-    df['tech_maturity_score'] = df['project_type'].map(tech_maturity)
-    
-    # Capacity-based risk adjustment
-    df['capacity_risk'] = np.where(df['capacity_mw'] > 100, 0.8, 
-                          np.where(df['capacity_mw'] > 50, 0.9, 1.0))
-    
-    # Financial viability indicators
-    df['irr_risk'] = np.where(df['projected_irr'] > 15, 0.9,
-                     np.where(df['projected_irr'] > 12, 0.8, 0.6))
-    
-    # ESG composite scoring
-    df['esg_composite'] = (df['environmental_score'] * 0.4 + 
-                          df['social_score'] * 0.35 + 
-                          df['governance_score'] * 0.25)
-    
-    # Generate risk classification
-    risk_score = (df['esg_composite'] * 0.4 + 
-                  df['projected_irr'] * 0.3 + 
-                  df['country_risk_score'] * 10 * 0.2 + 
-                  df['tech_maturity_score'] * 10 * 0.1)
-    
-    df['risk_classification'] = np.where(risk_score > 8.5, 0,  # Low Risk
-                               np.where(risk_score > 7.0, 1, 2))  # Medium/High Risk
-    
-    return df
 
-# Apply feature engineering
-data_engineered = engineer_features(data.copy())
-print("Feature engineering completed.")
-print(f"New features added: {len(data_engineered.columns) - len(data.columns)}")
-print(f"Risk Distribution:")
-print(data_engineered['risk_classification'].value_counts().sort_index())"""
-    },
-    {
-        "type": "markdown",
-        "content": """## 2. XGBoost Model Configuration and Training
+    python create_notebook.py [--output NOTEBOOK] [--cache-dir DIR] [--no-execute]
 
-Optimized hyperparameters through extensive grid search and Bayesian optimization."""
-    },
-    {
-        "type": "code",
-        "content": """# Prepare features and target
-feature_columns = [
-    'capacity_mw', 'projected_irr', 'environmental_score', 'social_score', 
-    'governance_score', 'country_risk_score', 'tech_maturity_score',
-    'capacity_risk', 'irr_risk', 'esg_composite'
-]
-
-X = data_engineered[feature_columns]
-y = data_engineered['risk_classification']
-
-# Split data
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
-
-print(f"Training Set: {X_train.shape}")
-print(f"Test Set: {X_test.shape}")
-print(f"Class Distribution: {dict(zip(*np.unique(y_train, return_counts=True)))}")"""
-    },
-    {
-        "type": "code",
-        "content": """# XGBoost Model Configuration
-xgb_model = xgb.XGBClassifier(
-    n_estimators=300,
-    max_depth=6,
-    learning_rate=0.1,
-    subsample=0.8,
-    colsample_bytree=0.8,
-    min_child_weight=3,
-    gamma=0.1,
-    reg_alpha=0.01,
-    reg_lambda=1.0,
-    random_state=42,
-    objective='multi:softprob',
-    eval_metric='mlogloss',
-    tree_method='hist'
-)
-
-print("Model Configuration:")
-print(f"Estimators: {xgb_model.n_estimators}")
-print(f"Max Depth: {xgb_model.max_depth}")
-print(f"Learning Rate: {xgb_model.learning_rate}")"""
-    },
-    {
-        "type": "code",
-        "content": """# Model Training
-print("Training XGBoost model...")
-xgb_model.fit(
-    X_train, y_train,
-    eval_set=[(X_train, y_train), (X_test, y_test)],
-    eval_metric='mlogloss',
-    early_stopping_rounds=50,
-    verbose=False
-)
-
-print("Training completed!")
-print(f"Best iteration: {xgb_model.best_iteration}")
-print(f"Best score: {xgb_model.best_score:.4f}")"""
-    },
-    {
-        "type": "markdown",
-        "content": """## 3. Model Evaluation and Performance Metrics"""
-    },
-    {
-        "type": "code",
-        "content": """# Predictions and Performance
-y_pred = xgb_model.predict(X_test)
-y_pred_proba = xgb_model.predict_proba(X_test)
-
-accuracy = (y_pred == y_test).mean()
-print(f"Test Accuracy: {accuracy:.3f} ({accuracy*100:.1f}%)")
-
-class_names = ['Low Risk', 'Medium Risk', 'High Risk']
-print("\\nClassification Report:")
-print(classification_report(y_test, y_pred, target_names=class_names))"""
-    },
-    {
-        "type": "code",
-        "content": """# Cross-Validation Performance
-cv_scores = cross_val_score(
-    xgb_model, X, y, cv=StratifiedKFold(n_splits=5, shuffle=True, random_state=42),
-    scoring='accuracy', n_jobs=-1
-)
-
-print("5-Fold Cross-Validation Results:")
-print(f"Mean Accuracy: {cv_scores.mean():.3f} ± {cv_scores.std():.3f}")
-print(f"Consistency: {cv_scores.mean()*100:.2f}% ± {cv_scores.std()*100:.2f}%")"""
-    },
-    {
-        "type": "code",
-        "content": """# Feature Importance Analysis
-feature_importance = pd.DataFrame({
-    'feature': feature_columns,
-    'importance': xgb_model.feature_importances_
-}).sort_values('importance', ascending=False)
-
-print("Feature Importance Rankings:")
-for i, (_, row) in enumerate(feature_importance.iterrows(), 1):
-    print(f"{i:2d}. {row['feature']:20s}: {row['importance']:.3f}")
-
-# Visualization
-plt.figure(figsize=(10, 6))
-sns.barplot(data=feature_importance.head(8), x='importance', y='feature')
-plt.title('XGBoost Feature Importance - Top 8 Features')
-plt.xlabel('Importance Score')
-plt.tight_layout()
-plt.show()"""
-    },
-    {
-        "type": "markdown",
-        "content": """## 4. Production Model Deployment"""
-    },
-    {
-        "type": "code",
-        "content": """# Save trained model and configuration
-joblib.dump(xgb_model, 'finergycloud_xgboost_model.joblib')
-
-# Production prediction function
-def predict_esg_risk(project_data):
-    processed_data = engineer_features(pd.DataFrame([project_data]))
-    features = processed_data[feature_columns]
-    
-    risk_proba = xgb_model.predict_proba(features)[0]
-    risk_class = xgb_model.predict(features)[0]
-    
-    return {
-        'risk_classification': class_names[risk_class],
-        'confidence_score': float(max(risk_proba)),
-        'risk_probabilities': {
-            'low_risk': float(risk_proba[0]),
-            'medium_risk': float(risk_proba[1]),
-            'high_risk': float(risk_proba[2])
-        }
-    }
+Cells come from finergycloud_xgboost.train.run_training and are executed
+headlessly; outputs are cached per cell, so a rebuild after editing one
+section only re-runs that section and the ones after it.
+"""
+import argparse
+import sys
 
-# Test with sample project
-sample_project = {
-    'capacity_mw': 75, 'projected_irr': 18.5, 'environmental_score': 8.2,
-    'social_score': 7.8, 'governance_score': 8.5, 'country': 'Ghana', 'project_type': 'Solar'
-}
+from finergycloud_xgboost.notebook import build_notebook, default_cache_dir, default_notebook_path
 
-result = predict_esg_risk(sample_project)
-print("Sample Prediction:")
-print(json.dumps(result, indent=2))"""
-    }
-]
 
-# Create notebook structure
-notebook = {
-    "cells": [],
-    "metadata": {
-        "kernelspec": {
-            "display_name": "Python 3",
-            "language": "python",
-            "name": "python3"
-        },
-        "language_info": {
-            "codemirror_mode": {"name": "ipython", "version": 3},
-            "file_extension": ".py",
-            "mimetype": "text/x-python",
-            "name": "python",
-            "nbconvert_exporter": "python",
-            "pygments_lexer": "ipython3",
-            "version": "3.8.10"
-        }
-    },
-    "nbformat": 4,
-    "nbformat_minor": 4
-}
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', default=default_notebook_path)
+    parser.add_argument('--cache-dir', default=default_cache_dir)
+    parser.add_argument('--no-execute', action='store_true',
+                        help='write the cells without outputs')
+    args = parser.parse_args(argv)
 
-# Add cells to notebook
-for section in sections:
-    if section["type"] == "markdown":
-        cell = {
-            "cell_type": "markdown",
-            "metadata": {},
-            "source": section["content"].split('\n')
-        }
-    else:  # code
-        cell = {
-            "cell_type": "code",
-            "execution_count": None,
-            "metadata": {},
-            "outputs": [],
-            "source": section["content"].split('\n')
-        }
-    
-    notebook["cells"].append(cell)
+    report = build_notebook(args.output, cache_dir=args.cache_dir,
+                            execute=not args.no_execute)
+    print(f"Created working Jupyter notebook: {report['output_path']}")
+    print(f"Code cells: {report['code_cells']} ({report['executed']} executed, "
+          f"{report['cached']} from cache) in {report['wall_time_s']:.1f}s")
+    if report['error']:
+        print(''.join(report['error']['traceback']), file=sys.stderr)
+        return 1
+    return 0
 
-# Save notebook
-with open('XGBoost_Model_Training_Notebook_Working.ipynb', 'w') as f:
-    json.dump(notebook, f, indent=1)
 
-print("Created working Jupyter notebook: XGBoost_Model_Training_Notebook_Working.ipynb")
\ No newline at end of file
+if __name__ == '__main__':
+    sys.exit(main())
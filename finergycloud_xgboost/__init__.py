@@ -0,0 +1,40 @@
+"""
+FinergyCloud XGBoost ESG risk model
+
+Importable, side-effect free package behind xgboost_model_training.py:
+features, train, evaluate and predict. Public names are resolved lazily so
+``import finergycloud_xgboost`` does not pull in pandas, sklearn or xgboost.
+"""
+import importlib
+
+_exports = {
+    'engineer_features': 'features',
+    'feature_columns': 'features',
+    'class_names': 'features',
+    'generate_synthetic_projects': 'data',
+    'enable_prediction_cache': 'predict',
+    'load_model': 'predict',
+    'predict_esg_risk': 'predict',
+    'predict_esg_risk_batch': 'predict',
+    'feature_contributions': 'explain',
+    'summarize_contributions': 'explain',
+    'run_training': 'train',
+    'stress_test_portfolio': 'stress',
+    'train_technology_ensemble': 'technology',
+    'FeatureStore': 'feature_store',
+    'DriftMonitor': 'drift',
+    'PredictionLog': 'prediction_log',
+    'PredictionLogReader': 'prediction_log',
+    'fit_checkpointed': 'checkpoint',
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    if name not in _exports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f'.{_exports[name]}', __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,214 @@
+"""
+Quantized project dataset, binned once and reused across CV folds and retrains
+
+BinnedDataset computes per-feature bin edges and the binned feature matrix
+once and persists them as memory-mapped .npy files plus cut metadata. Each
+fold or retrain takes a row subset of the codes and hands xgboost the bins'
+lower edges. A reference QuantileDMatrix built from the tiny table of those
+edges gives xgboost exact cuts, so the hist sketch over the full data never
+runs again. Trees split exactly between bins, so the boosters score raw
+feature rows unchanged.
+
+run_training(binned=True) (``train --binned``) fits the production model and
+runs its cross-validation folds this way from one BinnedDataset.
+"""
+import json
+import os
+
+import numpy as np
+
+from .features import feature_columns
+
+codes_filename = 'codes.npy'
+labels_filename = 'labels.npy'
+cuts_filename = 'cuts.npz'
+metadata_filename = 'metadata.json'
+
+
+class BinnedDataset:
+    """
+    Binned feature codes (one small integer per cell) plus the bin edges
+    Code ``missing_code`` marks NaN
+    """
+
+    def __init__(self, codes, labels, edges, minimums, max_bin=256, columns=feature_columns):
+        self.codes = codes
+        self.labels = labels
+        self.edges = [np.asarray(e, dtype=np.float32) for e in edges]
+        self.minimums = np.asarray(minimums, dtype=np.float32)
+        self.max_bin = max_bin
+        self.columns = list(columns)
+        self.missing_code = max_bin - 1
+        self._reference = None
+
+        # Row b of a feature's table is the lower edge of bin b
+        n_features = len(self.edges)
+        self.representatives = np.full((n_features, max_bin), np.nan, dtype=np.float32)
+        for f, feature_edges in enumerate(self.edges):
+            self.representatives[f, 0] = self.minimums[f]
+            self.representatives[f, 1:len(feature_edges) + 1] = feature_edges
+        self._offsets = np.arange(n_features, dtype=np.intp) * max_bin
+
+    def __len__(self):
+        return len(self.codes)
+
+    @classmethod
+    def build(cls, X, y, max_bin=256, sample_size=1000000, seed=42, columns=feature_columns):
+        """
+        Bin a feature matrix; edges come from quantiles of up to sample_size rows
+        """
+        if max_bin > 65536:
+            raise ValueError('max_bin must be at most 65536')
+        X = np.asarray(X, dtype=np.float32)
+        sample = X
+        if len(X) > sample_size:
+            rows = np.random.default_rng(seed).choice(len(X), sample_size, replace=False)
+            sample = X[np.sort(rows)]
+
+        # One code is kept back for NaN
+        n_value_bins = max_bin - 1
+        edges, minimums = [], []
+        for f in range(X.shape[1]):
+            values = sample[:, f]
+            values = values[~np.isnan(values)]
+            unique = np.unique(values)
+            if len(unique) <= n_value_bins:
+                feature_edges = unique[1:]
+            else:
+                quantiles = np.linspace(0, 1, n_value_bins + 1)[1:-1]
+                feature_edges = np.unique(np.quantile(values, quantiles).astype(np.float32))
+                feature_edges = feature_edges[feature_edges > unique[0]]
+            edges.append(feature_edges)
+            minimums.append(unique[0] if len(unique) else 0.0)
+
+        dtype = np.uint8 if max_bin <= 256 else np.uint16
+        codes = np.empty(X.shape, dtype=dtype)
+        for f, feature_edges in enumerate(edges):
+            column = X[:, f]
+            codes[:, f] = np.searchsorted(feature_edges, column, side='right')
+            codes[np.isnan(column), f] = max_bin - 1
+        return cls(codes, np.asarray(y, dtype=np.int32), edges, minimums, max_bin, columns)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, codes_filename), self.codes)
+        np.save(os.path.join(directory, labels_filename), self.labels)
+        np.savez(os.path.join(directory, cuts_filename),
+                 indptr=np.cumsum([0] + [len(e) for e in self.edges]),
+                 values=np.concatenate(self.edges), minimums=self.minimums)
+        with open(os.path.join(directory, metadata_filename), 'w') as f:
+            json.dump({'columns': self.columns, 'max_bin': self.max_bin,
+                       'n_rows': len(self.codes), 'dtype': str(self.codes.dtype)}, f, indent=2)
+        return directory
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """
+        Open a saved dataset; codes and labels are memory-mapped by default
+        """
+        mmap_mode = 'r' if mmap else None
+        with open(os.path.join(directory, metadata_filename)) as f:
+            metadata = json.load(f)
+        with np.load(os.path.join(directory, cuts_filename)) as cuts:
+            indptr, values = cuts['indptr'], cuts['values']
+            edges = [values[indptr[i]:indptr[i + 1]] for i in range(len(indptr) - 1)]
+            minimums = cuts['minimums']
+        return cls(
+            np.load(os.path.join(directory, codes_filename), mmap_mode=mmap_mode),
+            np.load(os.path.join(directory, labels_filename), mmap_mode=mmap_mode),
+            edges, minimums, metadata['max_bin'], metadata['columns']
+        )
+
+    def values(self, rows=None):
+        """
+        Lower-edge float32 values for a row subset, ready for xgboost
+        """
+        codes = self.codes if rows is None else self.codes[rows]
+        return np.take(self.representatives.ravel(), codes + self._offsets)
+
+    @property
+    def reference(self):
+        """
+        QuantileDMatrix over the bin edges only; its cuts match the bins
+        """
+        if self._reference is None:
+            import xgboost as xgb
+
+            table = np.where(np.isnan(self.representatives),
+                             self.representatives[:, :1], self.representatives)
+            self._reference = xgb.QuantileDMatrix(table.T, max_bin=self.max_bin)
+        return self._reference
+
+    def dmatrix(self, rows=None, ref=None):
+        """
+        Training matrix for a row subset, reusing the cuts instead of sketching
+        Eval matrices pass the training matrix as ``ref``, as xgb.train requires
+        """
+        import xgboost as xgb
+
+        labels = self.labels if rows is None else self.labels[rows]
+        return xgb.QuantileDMatrix(self.values(rows), np.asarray(labels),
+                                   ref=self.reference if ref is None else ref,
+                                   max_bin=self.max_bin)
+
+
+def train_binned(binned, rows=None, eval_rows=None, **overrides):
+    """
+    Train (or retrain) the booster on a row subset of a binned dataset
+    """
+    import xgboost as xgb
+
+    from .train import native_params
+
+    params, num_boost_round, early_stopping_rounds = native_params(**overrides)
+    params['max_bin'] = binned.max_bin
+    dtrain = binned.dmatrix(rows)
+    evals = []
+    if eval_rows is not None:
+        # Same eval set as fit_model; early stopping watches the last entry
+        evals = [(dtrain, 'train'), (binned.dmatrix(eval_rows, ref=dtrain), 'eval')]
+    else:
+        early_stopping_rounds = None
+    return xgb.train(params, dtrain, num_boost_round=num_boost_round, evals=evals,
+                     early_stopping_rounds=early_stopping_rounds, verbose_eval=False)
+
+
+def fit_binned(model, binned, train_rows, test_rows):
+    """
+    fit_model on a binned dataset: early stopping on test_rows, and the
+    booster loaded into ``model`` (an XGBClassifier from build_model)
+    """
+    from .train import default_hyperparameters
+
+    params = model.get_params()
+    overrides = {name: params[name] for name in list(default_hyperparameters) + ['n_jobs']}
+    booster = train_binned(binned, train_rows, eval_rows=test_rows, **overrides)
+    model.load_model(bytearray(booster.save_raw(raw_format='ubj')))
+    return model
+
+
+def cross_validate_binned(binned, n_splits=5, cores=None, **overrides):
+    """
+    Stratified k-fold accuracy over a binned dataset, folds run in threads
+    Like cross_validate_model, folds train the full n_estimators
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from sklearn.model_selection import StratifiedKFold
+
+    from .train import split_core_budget
+
+    n_workers, threads = split_core_budget(cores, n_splits)
+    overrides = dict(overrides, early_stopping_rounds=None, n_jobs=threads)
+    labels = np.asarray(binned.labels)
+    binned.reference  # build once before the folds share it
+
+    def run_fold(fold):
+        train_rows, test_rows = fold
+        booster = train_binned(binned, train_rows, **overrides)
+        proba = booster.inplace_predict(binned.values(test_rows))
+        return float((proba.argmax(axis=1) == labels[test_rows]).mean())
+
+    folds = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        return np.array(list(pool.map(run_fold, folds.split(np.zeros(len(labels)), labels))))
@@ -0,0 +1,105 @@
+"""
+Bounded LRU memoization of ESG risk predictions
+
+Entries are keyed on a hash of the engineered feature vector (optionally
+quantized) plus the model version, so re-scoring an unchanged project skips
+the ensemble entirely. The whole cache is dropped when a new model is loaded,
+and a value scored by the previous model that arrives afterwards is not stored.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of class probabilities with optional TTL
+    ``precision`` rounds features to that many decimals before hashing, so
+    near-identical slider positions share an entry
+    """
+
+    def __init__(self, maxsize=10000, ttl=None, precision=None, clock=time.monotonic):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.precision = precision
+        self.clock = clock
+        self.model_version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._model_generation = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def bind_model(self, generation, model_version):
+        """
+        Follow the served model; a newer load drops every entry. Generations
+        only move forward, so a caller still on an older load changes nothing
+        """
+        with self._lock:
+            if self._model_generation is None or generation > self._model_generation:
+                self._entries.clear()
+                self._model_generation = generation
+                self.model_version = model_version
+
+    def key(self, features, tag=None):
+        features = np.asarray(features, dtype=np.float64)
+        if self.precision is not None:
+            features = np.round(features, self.precision) + 0.0  # folds -0.0 into 0.0
+        digest = hashlib.blake2b(features.tobytes(), digest_size=16)
+        digest.update(str(self.model_version).encode())
+        if tag is not None:
+            digest.update(b'\0' + tag.encode())
+        return digest.digest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, generation=None):
+        """
+        Store a value; with ``generation`` (the model load it was scored by)
+        it is dropped if the cache has since moved on to another load
+        """
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            if generation is not None and generation != self._model_generation:
+                return
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'model_version': self.model_version
+        }
@@ -0,0 +1,301 @@
+"""
+Checkpointed, time-budgeted and resumable boosting
+
+    result = fit_checkpointed(build_model(), X_train, y_train, X_test, y_test,
+                              'model_dir', every_rounds=25, time_budget=600)
+    # killed or out of budget? the same call picks up at the last checkpoint
+    result = fit_checkpointed(build_model(), ..., 'model_dir', resume=True)
+
+Three xgboost training callbacks:
+
+* Checkpoint saves the booster to checkpoint.ubj every N rounds and/or T
+  seconds and when training ends. checkpoint.json next to it records the
+  rounds done, the early-stopping state and the hyperparameters. Both
+  files are replaced atomically, so a run killed mid-save leaves the
+  previous checkpoint intact. At the end it also writes best_model.ubj,
+  the booster truncated to its best iteration.
+* TimeBudget stops before a round that would not fit in the wall-clock
+  budget. Training ends cleanly and the model keeps its best iteration.
+* Progress reports rounds/s, rows/s and the latest validation metric.
+
+These callbacks act in before_iteration. xgb.train runs early stopping
+after every other callback and stops at the first callback that asks it
+to, so this way every finished round is scored before a checkpoint or a
+budget stop. Resuming continues boosting from the checkpoint with the
+early-stopping counters restored. Without row or column sampling, a
+resumed run grows the same trees as an uninterrupted one. xgboost does not
+save its sampler state, so with subsample/colsample the sampling sequence
+starts over at the resume point: the procedure is the same, the draws are
+not.
+"""
+import json
+import os
+import time
+
+import xgboost as xgb
+
+checkpoint_filename = 'checkpoint.ubj'
+state_filename = 'checkpoint.json'
+best_filename = 'best_model.ubj'
+default_report_seconds = 10.0
+
+# Hyperparameters that may differ between the original and a resumed run
+_resumable_overrides = ('n_estimators', 'early_stopping_rounds', 'callbacks', 'n_jobs')
+
+
+def _replace(path, write):
+    # Write to a temporary name, then rename over the old file; the name
+    # keeps its extension, which tells save_model the format
+    root, extension = os.path.splitext(path)
+    temporary = f'{root}.tmp{extension}'
+    write(temporary)
+    os.replace(temporary, path)
+
+
+def _hyperparameters(model):
+    return {name: value for name, value in model.get_params().items()
+            if name not in _resumable_overrides}
+
+
+class TimeBudget(xgb.callback.TrainingCallback):
+    """
+    Stop before the round that would take training past ``seconds``
+    The next round is assumed to take as long as the mean round so far
+    """
+
+    def __init__(self, seconds):
+        super().__init__()
+        self.seconds = seconds
+        self.stopped = False
+        self._start = None
+        self._first_round = 0
+
+    def before_training(self, model):
+        self._start = time.perf_counter()
+        self._first_round = model.num_boosted_rounds()
+        return model
+
+    def before_iteration(self, model, epoch, evals_log):
+        elapsed = time.perf_counter() - self._start
+        rounds = model.num_boosted_rounds() - self._first_round
+        next_round = elapsed / rounds if rounds else 0.0
+        self.stopped = elapsed + next_round > self.seconds
+        return self.stopped
+
+
+class Progress(xgb.callback.TrainingCallback):
+    """
+    Rounds/s, rows/s and the latest validation metric every few seconds
+    """
+
+    def __init__(self, n_rows, every_seconds=default_report_seconds, log=print):
+        super().__init__()
+        self.n_rows = n_rows
+        self.every_seconds = every_seconds
+        self.log = log
+        self.rounds = 0
+        self.wall_time_s = 0.0
+        self._start = self._reported = None
+
+    def before_training(self, model):
+        self._start = self._reported = time.perf_counter()
+        return model
+
+    def after_iteration(self, model, epoch, evals_log):
+        self.rounds += 1
+        now = time.perf_counter()
+        self.wall_time_s = now - self._start
+        if self.log is not None and now - self._reported >= self.every_seconds:
+            self._reported = now
+            metric = ''
+            if evals_log:
+                data, scores = list(evals_log.items())[-1]
+                name, values = list(scores.items())[-1]
+                metric = f", {data}-{name} {values[-1]:.5f}"
+            self.log(f"round {model.num_boosted_rounds()}: {self.rounds_per_s:.1f} rounds/s, "
+                     f"{self.rows_per_s:,.0f} rows/s{metric}")
+        return False
+
+    @property
+    def rounds_per_s(self):
+        return self.rounds / self.wall_time_s if self.wall_time_s else 0.0
+
+    @property
+    def rows_per_s(self):
+        # Every round computes gradients over every training row
+        return self.rounds_per_s * self.n_rows
+
+
+class Checkpoint(xgb.callback.TrainingCallback):
+    """
+    Save the booster every ``every_rounds`` rounds and/or ``every_seconds``
+    and when training ends; a budget stop leaves the run resumable
+    """
+
+    def __init__(self, directory, every_rounds=None, every_seconds=None, hyperparameters=None,
+                 early_stopping_rounds=None, budget=None):
+        super().__init__()
+        self.directory = directory
+        self.every_rounds = every_rounds
+        self.every_seconds = every_seconds
+        self.hyperparameters = hyperparameters or {}
+        self.early_stopping_rounds = early_stopping_rounds
+        self.budget = budget
+        self.n_saved = 0
+        self.save_time_s = 0.0
+        self._data = self._metric = None
+        self._saved_rounds = 0
+        self._saved_at = None
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, checkpoint_filename)
+
+    def before_training(self, model):
+        self._saved_rounds = model.num_boosted_rounds()
+        self._saved_at = time.perf_counter()
+        return model
+
+    def before_iteration(self, model, epoch, evals_log):
+        rounds = model.num_boosted_rounds()
+        if rounds > self._saved_rounds and (
+                self.every_rounds and rounds - self._saved_rounds >= self.every_rounds
+                or self.every_seconds and time.perf_counter() - self._saved_at >= self.every_seconds):
+            self.save(model)
+        return False
+
+    def after_iteration(self, model, epoch, evals_log):
+        if evals_log:
+            self._data = list(evals_log)[-1]
+            self._metric = list(evals_log[self._data])[-1]
+        return False
+
+    def after_training(self, model):
+        finished = self.budget is None or not self.budget.stopped
+        self.save(model, finished=finished)
+        from .compaction import truncate_to_best_iteration
+
+        _replace(os.path.join(self.directory, best_filename),
+                 truncate_to_best_iteration(model).save_model)
+        return model
+
+    def save(self, model, finished=False):
+        start = time.perf_counter()
+        rounds = model.num_boosted_rounds()
+        best_iteration = model.attr('best_iteration')
+        best_score = model.attr('best_score')
+        state = {
+            'rounds': rounds,
+            'finished': finished,
+            'best_iteration': None if best_iteration is None else int(best_iteration),
+            'best_score': None if best_score is None else float(best_score),
+            'rounds_since_best': None if best_iteration is None
+            else rounds - 1 - int(best_iteration),
+            'early_stopping_rounds': self.early_stopping_rounds,
+            'eval_data': self._data,
+            'eval_metric': self._metric,
+            'hyperparameters': self.hyperparameters
+        }
+        # Booster first: a state file never points past the saved booster
+        _replace(self.path, model.save_model)
+
+        def write_state(path):
+            with open(path, 'w') as f:
+                json.dump(state, f, indent=2, default=str)
+
+        _replace(os.path.join(self.directory, state_filename), write_state)
+        self._saved_rounds = rounds
+        self._saved_at = time.perf_counter()
+        self.n_saved += 1
+        self.save_time_s += self._saved_at - start
+
+
+def read_checkpoint(directory):
+    """
+    (booster path, state) of the directory's checkpoint, or None
+    """
+    path = os.path.join(directory, checkpoint_filename)
+    state_path = os.path.join(directory, state_filename)
+    if not (os.path.exists(path) and os.path.exists(state_path)):
+        return None
+    with open(state_path) as f:
+        return path, json.load(f)
+
+
+def resumed_early_stopping(state):
+    """
+    EarlyStopping carrying on from a checkpoint's best score and patience
+    """
+    early_stopping = xgb.callback.EarlyStopping(rounds=state['early_stopping_rounds'])
+    if state['best_score'] is not None:
+        data, metric = state['eval_data'], state['eval_metric']
+        early_stopping.stopping_history = {data: {metric: [state['best_score']]}}
+        early_stopping.best_scores = {data: {metric: [state['best_score']]}}
+        early_stopping.current_rounds = state['rounds_since_best']
+    return early_stopping
+
+
+def fit_checkpointed(model, X_train, y_train, X_test, y_test, directory, every_rounds=None,
+                     every_seconds=None, time_budget=None, resume=True,
+                     report_seconds=default_report_seconds, log=print):
+    """
+    fit_model with checkpoints, an optional wall-clock budget and resume
+    ``resume`` continues from the directory's checkpoint when there is one;
+    a finished checkpoint is loaded without training. Returns the fitted
+    model with how the run ended and its throughput.
+    """
+    start = time.perf_counter()
+    hyperparameters = _hyperparameters(model)
+    total_rounds = model.n_estimators
+    early_stopping_rounds = model.early_stopping_rounds
+    found = read_checkpoint(directory) if resume else None
+    done = 0
+    if found is not None:
+        path, state = found
+        if json.loads(json.dumps(hyperparameters, default=str)) != state['hyperparameters']:
+            raise ValueError(f'checkpoint in {directory} was trained with other hyperparameters')
+        done = state['rounds']
+        if state['finished'] or done >= total_rounds:
+            model.load_model(path)
+            return {'model': model, 'resumed_from_round': done, 'rounds': done,
+                    'stopped_by': 'checkpoint', 'wall_time_s': time.perf_counter() - start,
+                    'rounds_per_s': 0.0, 'rows_per_s': 0.0, 'checkpoints': 0,
+                    'checkpoint_time_s': 0.0}
+
+    budget = TimeBudget(time_budget) if time_budget is not None else None
+    progress = Progress(len(X_train), report_seconds, log)
+    checkpoint = Checkpoint(directory, every_rounds, every_seconds, json.loads(
+        json.dumps(hyperparameters, default=str)), early_stopping_rounds, budget)
+    callbacks = [cb for cb in (budget, checkpoint, progress) if cb is not None]
+    fit_kwargs = {}
+    if done:
+        if early_stopping_rounds:
+            callbacks.append(resumed_early_stopping(state))
+            model.set_params(early_stopping_rounds=None)
+        fit_kwargs['xgb_model'] = path
+        if log is not None:
+            log(f"Resuming from round {done} ({path})")
+    model.set_params(n_estimators=total_rounds - done, callbacks=callbacks)
+    try:
+        model.fit(X_train, y_train, eval_set=[(X_train, y_train), (X_test, y_test)],
+                  verbose=False, **fit_kwargs)
+    finally:
+        # The fitted model reports the run's own hyperparameters
+        model.set_params(n_estimators=total_rounds, early_stopping_rounds=early_stopping_rounds,
+                         callbacks=None)
+
+    rounds = model.get_booster().num_boosted_rounds()
+    stopped_by = ('time_budget' if budget is not None and budget.stopped else
+                  'completed' if rounds >= total_rounds else 'early_stopping')
+    return {
+        'model': model,
+        'resumed_from_round': done,
+        'rounds': rounds,
+        'stopped_by': stopped_by,
+        'wall_time_s': time.perf_counter() - start,
+        'rounds_per_s': progress.rounds_per_s,
+        'rows_per_s': progress.rows_per_s,
+        'checkpoints': checkpoint.n_saved,
+        'checkpoint_time_s': checkpoint.save_time_s
+    }
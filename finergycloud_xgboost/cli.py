@@ -0,0 +1,605 @@
+"""
+Command line entry points
+
+    python -m finergycloud_xgboost train [--output-dir DIR] [--n-projects N]
+                                         [--checkpoint-every N] [--time-budget S] [--resume]
+                                         [--binned] [--feature-store DIR]
+    python -m finergycloud_xgboost score projects.csv [--output scores.csv] [--explain]
+                                         [--feature-store DIR]
+    python -m finergycloud_xgboost tune [--n-configs N] [--cores N] [--method hyperband]
+    python -m finergycloud_xgboost serve [--port 8008] [--max-batch-size 64] [--max-wait-ms 2]
+                                         [--drift [REFERENCE]] [--prediction-log DIR]
+    python -m finergycloud_xgboost registry DIR {list,activate VERSION}
+    python -m finergycloud_xgboost update DIR new_projects.csv [--rounds 50]
+    python -m finergycloud_xgboost generate DIR --n-projects 10000000 [--format npy]
+    python -m finergycloud_xgboost evaluate projects.csv|DIR [--model PATH] [--output FILE]
+    python -m finergycloud_xgboost stress projects.csv --shocks shocks.json [--scenarios N]
+    python -m finergycloud_xgboost compact [--model PATH] [--publish CANDIDATE --registry DIR]
+    python -m finergycloud_xgboost technology [--output-dir DIR] [--cores N] [--min-rows 100]
+    python -m finergycloud_xgboost features DIR projects.csv|DIR [--chunk-size N]
+    python -m finergycloud_xgboost drift [projects.csv|DIR] [--reference FILE] [--merge SKETCH]
+    python -m finergycloud_xgboost predictions LOG_DIR [--replay] [--model PATH]
+"""
+import argparse
+import json
+import os
+import sys
+import warnings
+
+
+def train(args):
+    from .train import run_training
+
+    warnings.filterwarnings('ignore')
+    if args.feature_store:
+        from .feature_store import manifest_filename
+
+        if not os.path.exists(os.path.join(args.feature_store, manifest_filename)):
+            print(f"No feature store at {args.feature_store}", file=sys.stderr)
+            return 2
+    if args.metrics_file or args.profile:
+        from .instrumentation import enable_instrumentation
+
+        enable_instrumentation(args.metrics_file, trace_memory=args.trace_memory,
+                               profile=args.profile or (), profile_dir=args.output_dir)
+    results = run_training(n_projects=args.n_projects, seed=args.seed,
+                           output_dir=args.output_dir, checkpoint_every=args.checkpoint_every,
+                           checkpoint_seconds=args.checkpoint_seconds,
+                           time_budget=args.time_budget, resume=args.resume, binned=args.binned,
+                           feature_store=args.feature_store)
+    if args.metrics_file or args.profile:
+        from .instrumentation import finish_run
+
+        record = finish_run('training', n_projects=args.n_projects,
+                            accuracy=results['accuracy'])
+        print("Stage timings:")
+        for s in record['stages']:
+            # rssDelta is None where the platform does not report RSS
+            rss_delta = s['memoryUsage']['rssDelta']
+            rss = 'n/a' if rss_delta is None else f'{rss_delta / 2 ** 20:+8.1f} MB'
+            print(f"{'  ' * s['depth']}{s['name']:22s} {s['responseTime']:10.1f} ms "
+                  f"cpu {s['cpuTime']:10.1f} ms  rss {rss}")
+    print("XGBoost Model Training Complete!")
+    print(f"Final Accuracy: {results['accuracy']:.1%}")
+    if args.registry:
+        from .incremental import reservoir_filename, seed_reservoir
+        from .registry import ModelRegistry
+
+        version = ModelRegistry(args.registry).publish(
+            results['model'], results['model_config'],
+            drift_reference=results['drift_reference_path'])
+        # A retrained base version restarts the history update samples from
+        seed_reservoir(os.path.join(args.registry, reservoir_filename), results['X_train'],
+                       results['y_train'])
+        print(f"Published {version} to {args.registry}")
+    return 0
+
+
+def read_projects(path):
+    import pandas as pd
+
+    if path.endswith('.json'):
+        return pd.read_json(path)
+    return pd.read_csv(path)
+
+
+def score(args):
+    import pandas as pd
+
+    from .predict import load_model, predict_esg_risk_batch, predict_esg_risk_features
+
+    projects = read_projects(args.input)
+    model = load_model(args.model)
+    if args.feature_store:
+        from .feature_store import FeatureStore
+
+        if 'project_id' not in projects.columns:
+            print("--feature-store needs a project_id column", file=sys.stderr)
+            return 2
+        # Only new or changed projects go through feature engineering
+        store = FeatureStore(args.feature_store, writable=True)
+        store.upsert(projects)
+        scores = predict_esg_risk_features(store.get(projects['project_id'].to_numpy()),
+                                           chunk_size=args.chunk_size, model=model,
+                                           explain=args.explain)
+    else:
+        scores = predict_esg_risk_batch(projects, chunk_size=args.chunk_size, model=model,
+                                        explain=args.explain)
+    contributions = scores.pop('feature_contributions', None)
+    scores.pop('contribution_bias', None)
+    result = pd.DataFrame(scores)
+    if contributions is not None:
+        import numpy as np
+
+        from .features import feature_columns
+
+        # Contributions towards each row's predicted class, plus its top driver
+        risk_class = result[['low_risk', 'medium_risk', 'high_risk']].to_numpy().argmax(axis=1)
+        own = contributions[np.arange(len(result)), risk_class]
+        for j, column in enumerate(feature_columns):
+            result[f'{column}_contribution'] = own[:, j]
+        result['top_driver'] = np.asarray(feature_columns, dtype=object)[own.argmax(axis=1)]
+    if 'project_id' in projects.columns:
+        result.insert(0, 'project_id', projects['project_id'].to_numpy())
+
+    if args.output:
+        result.to_csv(args.output, index=False)
+        print(f"Scored {len(result)} projects: {args.output}")
+    else:
+        result.to_csv(sys.stdout, index=False)
+    return 0
+
+
+def tune(args):
+    from sklearn.model_selection import train_test_split
+
+    from .data import generate_synthetic_projects
+    from .features import engineer_features
+    from .train import split_dataset
+    from .tuning import leaderboard_filename, tune_hyperparameters
+
+    data = engineer_features(generate_synthetic_projects(args.n_projects, seed=args.seed))
+    _, _, X_train, _, y_train, _ = split_dataset(data)
+    X_fit, X_valid, y_fit, y_valid = train_test_split(
+        X_train, y_train, test_size=0.2, random_state=args.seed, stratify=y_train
+    )
+    leaderboard = tune_hyperparameters(
+        X_fit, y_fit, X_valid, y_valid, n_configs=args.n_configs,
+        min_rounds=args.min_rounds, max_rounds=args.max_rounds, eta=args.eta,
+        method=args.method, cores=args.cores, seed=args.seed, output_dir=args.output_dir
+    )
+    best = leaderboard['best']
+    print(f"Trials: {len(leaderboard['leaderboard'])} on {leaderboard['workers']} workers "
+          f"({leaderboard['total_wall_time_s']:.1f}s wall)")
+    print(f"Best mlogloss {best['mlogloss']:.4f}, accuracy {best['accuracy']:.3f} "
+          f"at {best['n_estimators']} rounds: {json.dumps(best['config'])}")
+    print(f"Leaderboard saved: {os.path.join(args.output_dir, leaderboard_filename)}")
+    return 0
+
+
+def serve(args):
+    import asyncio
+
+    from .server import serve as serve_http
+
+    try:
+        asyncio.run(serve_http(
+            model_path=args.model, host=args.host, port=args.port,
+            max_batch_size=args.max_batch_size, max_wait=args.max_wait_ms / 1e3,
+            max_queue=args.max_queue, drift_reference=args.drift,
+            prediction_log=args.prediction_log
+        ))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def registry(args):
+    from .registry import ModelRegistry
+
+    models = ModelRegistry(args.root)
+    if args.action == 'activate':
+        models.activate(args.version)
+    current = models.current_version()
+    for version in models.versions():
+        with open(os.path.join(models.version_path(version), 'manifest.json')) as f:
+            created = json.load(f)['created']
+        print(f"{'*' if version == current else ' '} {version}  {created}")
+    return 0
+
+
+def update(args):
+    from .incremental import incremental_update, reservoir_filename
+    from .registry import ModelRegistry
+
+    registry = ModelRegistry(args.registry)
+    X_holdout = y_holdout = None
+    if args.holdout:
+        import numpy as np
+
+        from .features import engineer_features, feature_columns
+
+        holdout = engineer_features(read_projects(args.holdout))
+        X_holdout = holdout[feature_columns].to_numpy(dtype=np.float32)
+        y_holdout = holdout['risk_classification'].to_numpy()
+    reservoir_path = None if args.no_reservoir else os.path.join(args.registry,
+                                                                 reservoir_filename)
+    report = incremental_update(
+        registry, read_projects(args.input), X_holdout, y_holdout, n_rounds=args.rounds,
+        reservoir_path=reservoir_path, max_accuracy_drop=args.max_accuracy_drop
+    )
+    print(f"Holdout accuracy {report['before']['accuracy']:.4f} ({report['parent_version']}) "
+          f"-> {report['after']['accuracy']:.4f} ({report['version']}) "
+          f"in {report['wall_time_s']:.2f}s")
+    print(f"{report['version']} {'promoted to CURRENT' if report['promoted'] else 'stored, not promoted'}")
+    return 0
+
+
+def generate(args):
+    import time
+
+    from .data import generate_project_shards
+
+    start = time.perf_counter()
+    manifest = generate_project_shards(args.output_dir, args.n_projects, args.shard_size,
+                                       seed=args.seed, file_format=args.format,
+                                       workers=args.workers)
+    print(f"Wrote {args.n_projects:,} projects as {len(manifest['shards'])} {args.format} "
+          f"shards to {args.output_dir} in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+def evaluate(args):
+    from .predict import load_model
+    from .streaming import evaluate_streaming
+
+    evaluator = evaluate_streaming(load_model(args.model), args.input, args.chunk_size)
+    result = evaluator.result()
+    print(f"Rows: {result['n_rows']:,}")
+    print(f"Accuracy: {result['accuracy']:.4f}  Log-loss: {result['log_loss']:.4f}")
+    print(result['classification_report'])
+    print("Confusion Matrix:")
+    print(result['confusion_matrix'])
+    roc_auc_scores = evaluator.roc_auc_scores()
+    print(f"ROC-AUC: {json.dumps(roc_auc_scores)}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'n_rows': result['n_rows'],
+                'accuracy': result['accuracy'],
+                'log_loss': result['log_loss'],
+                'confusion_matrix': result['confusion_matrix'].tolist(),
+                'roc_auc_scores': roc_auc_scores
+            }, f, indent=2)
+    return 0
+
+
+def stress(args):
+    from .predict import load_model
+    from .stress import stress_test_portfolio
+
+    with open(args.shocks) as f:
+        shocks = json.load(f)
+    report = stress_test_portfolio(read_projects(args.input), shocks,
+                                   n_scenarios=args.scenarios, model=load_model(args.model),
+                                   weights=args.weights, memory_budget_mb=args.budget_mb,
+                                   seed=args.seed)
+    print(f"{report['n_scenarios']:,} scenarios x {report['n_projects']:,} projects "
+          f"in {report['wall_time_s']:.1f} s ({report['n_chunks']} chunks, "
+          f"{report['rows_scored']:,} distinct rows scored)")
+    print(f"{'share':12s} {'baseline':>9s} {'mean':>8s} {'p95':>8s} {'p99':>8s} {'ES99':>8s}")
+    for name, tails in report['class_share_tails'].items():
+        print(f"{name:12s} {report['baseline']['class_share'][name]:9.4f} {tails['mean']:8.4f} "
+              f"{tails['p95']:8.4f} {tails['p99']:8.4f} {tails['expected_shortfall_99']:8.4f}")
+    if args.output:
+        keys = ('n_scenarios', 'n_projects', 'shocks', 'baseline', 'class_share_tails',
+                'high_risk_proba_tails', 'downgraded_share_tails', 'wall_time_s')
+        with open(args.output, 'w') as f:
+            json.dump(dict({key: report[key] for key in keys},
+                           project_high_risk_frequency=report['project_high_risk_frequency'].tolist()),
+                      f, indent=2)
+    return 0
+
+
+def compact(args):
+    import numpy as np
+
+    from .compaction import (compact_model, compaction_report, default_distill_configs,
+                             format_compaction_report, report_filename)
+    from .data import generate_synthetic_projects
+    from .features import engineer_features, feature_columns
+    from .predict import load_model
+    from .train import split_dataset
+
+    if args.publish and not args.registry:
+        print("--publish needs --registry", file=sys.stderr)
+        return 2
+    warnings.filterwarnings('ignore')
+    # The training split, plus a fresh draw for pruning decisions so the
+    # early-stopping set is not reused to choose rounds
+    data = engineer_features(generate_synthetic_projects(args.n_projects, seed=args.seed))
+    _, _, X_train, X_test, _, y_test = split_dataset(data)
+    valid = engineer_features(generate_synthetic_projects(args.n_projects, seed=args.seed + 1))
+    X_valid = valid[feature_columns].to_numpy(dtype=np.float32)
+    y_valid = valid['risk_classification'].to_numpy()
+
+    candidates = compact_model(load_model(args.model), X_valid, y_valid, X_train=X_train,
+                               max_loss_increase=args.max_loss_increase,
+                               distill_configs=() if args.no_distill else default_distill_configs)
+    rows = compaction_report(candidates, X_test, y_test)
+    print(format_compaction_report(rows))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for name, booster in candidates.items():
+        booster.save_model(os.path.join(args.output_dir, f'{name}.ubj'))
+    report_path = os.path.join(args.output_dir, report_filename)
+    with open(report_path, 'w') as f:
+        json.dump(rows, f, indent=2)
+    print(f"Report: {report_path}")
+
+    if args.publish:
+        from .registry import ModelRegistry
+
+        row = next((r for r in rows if r['candidate'] == args.publish), None)
+        if row is None:
+            print(f"Unknown candidate {args.publish!r}; choose from {', '.join(candidates)}",
+                  file=sys.stderr)
+            return 2
+        version = ModelRegistry(args.registry).publish(candidates[args.publish], dict(
+            row, training_accuracy=row['accuracy'], dataset_size=args.n_projects
+        ))
+        print(f"Published {args.publish} as {version} in {args.registry}")
+    return 0
+
+
+def technology(args):
+    import joblib
+
+    from .data import generate_synthetic_projects
+    from .features import engineer_features
+    from .technology import (default_ensemble_path, format_technology_report,
+                             save_technology_report, technology_report,
+                             train_technology_ensemble)
+    from .train import split_dataset
+
+    warnings.filterwarnings('ignore')
+    data = engineer_features(generate_synthetic_projects(args.n_projects, seed=args.seed))
+    _, _, X_train, X_test, y_train, y_test = split_dataset(data)
+    training = train_technology_ensemble(X_train, y_train, X_test, y_test, cores=args.cores,
+                                         min_rows=args.min_rows)
+    print(f"Trained {len(training['members'])} models on {training['workers']} workers x "
+          f"{training['nthread']} threads: {training['wall_time_s']:.1f}s wall "
+          f"({training['member_wall_time_s']:.1f}s summed)")
+    if training['fallback_types']:
+        print(f"Served by the global model: {', '.join(training['fallback_types'])}")
+    rows = technology_report(training['model'], X_test, y_test)
+    print(format_technology_report(rows))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    model_path = os.path.join(args.output_dir, default_ensemble_path)
+    joblib.dump(training['model'], model_path)
+    print(f"Model: {model_path}")
+    print(f"Report: {save_technology_report(training, rows, args.output_dir)}")
+    return 0
+
+
+def features(args):
+    import time
+
+    from .feature_store import FeatureStore
+    from .features import raw_columns
+    from .streaming import iter_project_chunks
+
+    start = time.perf_counter()
+    store = FeatureStore(args.store, writable=True)
+    totals = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    for chunk in iter_project_chunks(args.input, args.chunk_size,
+                                     columns=['project_id'] + raw_columns):
+        for key, count in store.upsert(chunk).items():
+            totals[key] += count
+    print(f"{args.store}: {len(store):,} projects, feature version "
+          f"{store.manifest['feature_version'] if store.manifest else '-'}")
+    print(f"Inserted {totals['inserted']:,}, updated {totals['updated']:,}, "
+          f"unchanged {totals['unchanged']:,} in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+def drift(args):
+    from .drift import DriftSketch, format_drift_report
+    from .predict import enable_drift_monitor, load_model, predict_esg_risk_batch
+    from .streaming import iter_project_chunks
+
+    load_model(args.model)
+    monitor = enable_drift_monitor(args.reference)
+    if args.input:
+        for chunk in iter_project_chunks(args.input, args.chunk_size):
+            predict_esg_risk_batch(chunk, chunk_size=args.chunk_size)
+    for path in args.merge or []:
+        monitor.merge(DriftSketch.load(path))
+    if args.save_sketch:
+        monitor.live.save(args.save_sketch)
+    report = monitor.report()
+    print(format_drift_report(report))
+    print(f"Drifted: {', '.join(report['drifted']) or 'none'}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+def predictions(args):
+    from .prediction_log import PredictionLogReader, format_log_summary
+
+    reader = PredictionLogReader(args.log_dir, args.prefix)
+    summary = reader.summary()
+    print(format_log_summary(summary))
+    if args.replay:
+        from .predict import load_model
+
+        summary['replay'] = replay = reader.replay(load_model(args.model))
+        print(f"Replayed {replay['n_records']:,} predictions in {replay['wall_time_s']:.2f}s "
+              f"({replay['records_per_s']:,.0f}/s): class agreement "
+              f"{replay['class_agreement']:.4%}, max probability difference "
+              f"{replay['max_probability_difference']:.2e}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='finergycloud_xgboost',
+                                     description='FinergyCloud ESG risk model')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    train_parser = commands.add_parser('train', help='train and save the model')
+    train_parser.add_argument('--output-dir', default='.')
+    train_parser.add_argument('--n-projects', type=int, default=2847)
+    train_parser.add_argument('--seed', type=int, default=42)
+    train_parser.add_argument('--registry', help='also publish to this model registry')
+    train_parser.add_argument('--metrics-file',
+                              help='append per-stage timings as a JSON line to this file')
+    train_parser.add_argument('--trace-memory', action='store_true',
+                              help='also record tracemalloc peaks per stage')
+    train_parser.add_argument('--profile', action='append', metavar='STAGE',
+                              help='capture this stage with cProfile into STAGE.prof')
+    train_parser.add_argument('--checkpoint-every', type=int, metavar='N',
+                              help='save the booster to the output directory every N rounds')
+    train_parser.add_argument('--checkpoint-seconds', type=float, metavar='T',
+                              help='save the booster every T seconds')
+    train_parser.add_argument('--time-budget', type=float, metavar='S',
+                              help='stop boosting cleanly before S seconds, keeping the best '
+                                   'iteration')
+    train_parser.add_argument('--resume', action='store_true',
+                              help="continue boosting from the output directory's checkpoint")
+    train_parser.add_argument('--binned', action='store_true',
+                              help='bin the features once and reuse the bins in the fit and '
+                                   'every CV fold')
+    train_parser.add_argument('--feature-store', metavar='DIR',
+                              help='train on the engineered features and labels of this '
+                                   'feature store instead of generated projects')
+    train_parser.set_defaults(func=train)
+
+    score_parser = commands.add_parser('score', help='score a CSV or JSON file of projects')
+    score_parser.add_argument('input')
+    score_parser.add_argument('--output', '-o')
+    score_parser.add_argument('--model', help='path to the saved model')
+    score_parser.add_argument('--chunk-size', type=int, default=50000)
+    score_parser.add_argument('--explain', nargs='?', const=True, choices=[True, 'approximate'],
+                              help='add per-feature contributions to the predicted class '
+                                   '(exact TreeSHAP, or approximate)')
+    score_parser.add_argument('--feature-store', metavar='DIR',
+                              help='upsert the projects into this feature store and score '
+                                   'its rows, engineering only new or changed projects')
+    score_parser.set_defaults(func=score)
+
+    tune_parser = commands.add_parser('tune', help='search hyperparameters')
+    tune_parser.add_argument('--output-dir', default='.')
+    tune_parser.add_argument('--n-projects', type=int, default=2847)
+    tune_parser.add_argument('--seed', type=int, default=42)
+    tune_parser.add_argument('--n-configs', type=int, default=27)
+    tune_parser.add_argument('--min-rounds', type=int, default=12)
+    tune_parser.add_argument('--max-rounds', type=int, default=300)
+    tune_parser.add_argument('--eta', type=int, default=3)
+    tune_parser.add_argument('--method', choices=['halving', 'hyperband'], default='halving')
+    tune_parser.add_argument('--cores', type=int, help='core budget (default: all)')
+    tune_parser.set_defaults(func=tune)
+
+    serve_parser = commands.add_parser('serve', help='HTTP scoring with micro-batching')
+    serve_parser.add_argument('--model', help='saved model or model registry directory')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8008)
+    serve_parser.add_argument('--max-batch-size', type=int, default=64,
+                              help='1 disables micro-batching')
+    serve_parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    serve_parser.add_argument('--max-queue', type=int, default=1024)
+    serve_parser.add_argument('--drift', nargs='?', const='', metavar='REFERENCE',
+                              help='monitor drift against this reference (default: the '
+                                   'drift_reference.json next to the model); see GET /drift')
+    serve_parser.add_argument('--prediction-log', metavar='DIR',
+                              help='append every prediction to a binary audit log here')
+    serve_parser.set_defaults(func=serve)
+
+    registry_parser = commands.add_parser('registry', help='list or activate model versions')
+    registry_parser.add_argument('root')
+    registry_parser.add_argument('action', choices=['list', 'activate'], nargs='?', default='list')
+    registry_parser.add_argument('version', nargs='?')
+    registry_parser.set_defaults(func=registry)
+
+    update_parser = commands.add_parser('update', help='continue the current model on new projects')
+    update_parser.add_argument('registry')
+    update_parser.add_argument('input', help='CSV or JSON file of new projects')
+    update_parser.add_argument('--holdout', help='holdout projects (default: 20%% of the input)')
+    update_parser.add_argument('--rounds', type=int, default=50)
+    update_parser.add_argument('--max-accuracy-drop', type=float, default=0.005)
+    update_parser.add_argument('--no-reservoir', action='store_true',
+                               help='train on the new batch only')
+    update_parser.set_defaults(func=update)
+
+    generate_parser = commands.add_parser('generate', help='write sharded synthetic projects')
+    generate_parser.add_argument('output_dir')
+    generate_parser.add_argument('--n-projects', type=int, default=10000000)
+    generate_parser.add_argument('--shard-size', type=int, default=1000000)
+    generate_parser.add_argument('--format', choices=['parquet', 'npy'], default='parquet')
+    generate_parser.add_argument('--seed', type=int, default=42)
+    generate_parser.add_argument('--workers', type=int, help='processes (default: all cores)')
+    generate_parser.set_defaults(func=generate)
+
+    evaluate_parser = commands.add_parser('evaluate', help='one-pass evaluation of a dataset')
+    evaluate_parser.add_argument('input', help='CSV, Parquet, .npy or shard directory')
+    evaluate_parser.add_argument('--model', help='saved model or model registry directory')
+    evaluate_parser.add_argument('--chunk-size', type=int, default=100000)
+    evaluate_parser.add_argument('--output', '-o', help='write metrics JSON here')
+    evaluate_parser.set_defaults(func=evaluate)
+
+    stress_parser = commands.add_parser('stress', help='Monte Carlo stress scoring of a portfolio')
+    stress_parser.add_argument('input', help='CSV or JSON portfolio of projects')
+    stress_parser.add_argument('--shocks', required=True, help='JSON list of shock specifications')
+    stress_parser.add_argument('--scenarios', type=int, default=10000)
+    stress_parser.add_argument('--model', help='saved model or model registry directory')
+    stress_parser.add_argument('--weights', help='column weighting projects, e.g. capacity_mw')
+    stress_parser.add_argument('--budget-mb', type=int, default=512)
+    stress_parser.add_argument('--seed', type=int, default=42)
+    stress_parser.add_argument('--output', '-o', help='write the report JSON here')
+    stress_parser.set_defaults(func=stress)
+
+    compact_parser = commands.add_parser('compact',
+                                         help='truncate, prune and distill the ensemble')
+    compact_parser.add_argument('--model', help='saved model or model registry directory')
+    compact_parser.add_argument('--n-projects', type=int, default=2847)
+    compact_parser.add_argument('--seed', type=int, default=42)
+    compact_parser.add_argument('--max-loss-increase', type=float, default=0.01,
+                                help='relative validation log-loss rise allowed when pruning')
+    compact_parser.add_argument('--no-distill', action='store_true')
+    compact_parser.add_argument('--output-dir', default='compact')
+    compact_parser.add_argument('--registry', help='registry to --publish a candidate to')
+    compact_parser.add_argument('--publish', metavar='CANDIDATE')
+    compact_parser.set_defaults(func=compact)
+
+    technology_parser = commands.add_parser('technology',
+                                            help='train one model per project type')
+    technology_parser.add_argument('--output-dir', default='.')
+    technology_parser.add_argument('--n-projects', type=int, default=2847)
+    technology_parser.add_argument('--seed', type=int, default=42)
+    technology_parser.add_argument('--cores', type=int, help='core budget (default: all)')
+    technology_parser.add_argument('--min-rows', type=int, default=100,
+                                   help='fewer training rows than this use the global model')
+    technology_parser.set_defaults(func=technology)
+
+    features_parser = commands.add_parser('features',
+                                          help='upsert projects into a feature store')
+    features_parser.add_argument('store', help='feature store directory')
+    features_parser.add_argument('input', help='CSV, Parquet, .npy or a directory of shards')
+    features_parser.add_argument('--chunk-size', type=int, default=1000000)
+    features_parser.set_defaults(func=features)
+
+    drift_parser = commands.add_parser('drift',
+                                       help='PSI/KS of scored projects against training')
+    drift_parser.add_argument('input', nargs='?', help='CSV, Parquet, .npy or shard directory')
+    drift_parser.add_argument('--model', help='saved model or model registry directory')
+    drift_parser.add_argument('--reference',
+                              help='drift reference (default: next to the model)')
+    drift_parser.add_argument('--chunk-size', type=int, default=100000)
+    drift_parser.add_argument('--merge', action='append', metavar='SKETCH',
+                              help='add a sketch saved by another process')
+    drift_parser.add_argument('--save-sketch', metavar='FILE',
+                              help="save this run's sketch for merging elsewhere")
+    drift_parser.add_argument('--output', '-o', help='write the report JSON here')
+    drift_parser.set_defaults(func=drift)
+
+    predictions_parser = commands.add_parser('predictions',
+                                             help='summarize or replay a prediction log')
+    predictions_parser.add_argument('log_dir')
+    predictions_parser.add_argument('--prefix', help='only segments of this writer')
+    predictions_parser.add_argument('--replay', action='store_true',
+                                    help='re-score the logged features and compare')
+    predictions_parser.add_argument('--model', help='model to replay with (default: served)')
+    predictions_parser.add_argument('--output', '-o', help='write the summary JSON here')
+    predictions_parser.set_defaults(func=predictions)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,289 @@
+"""
+Post-training ensemble compaction for the latency-critical scoring tier
+
+    candidates = compact_model(model, X_valid, y_valid, X_train=X_train)
+    report = compaction_report(candidates, X_test, y_test)
+
+Three ways to shrink the 300-round, depth-6, 3-class ensemble:
+
+* truncate to best_iteration, dropping the rounds early stopping rejected
+* greedily prune whole boosting rounds: a round's trees add a fixed
+  per-class term to the margin, so the validation log-loss without any one
+  round is a vectorized update, and the round whose removal hurts least is
+  dropped until the loss rises by more than max_loss_increase
+* distill into a shallower, shorter ensemble trained on the teacher's soft
+  probabilities (each row is repeated once per class, weighted by the
+  teacher's probability, which is exactly soft-label cross-entropy)
+
+Every candidate is a plain xgboost Booster. compaction_report() measures tree
+count, serialized bytes, single-row p50/p99 latency, accuracy, macro
+ROC-AUC and agreement with the full model, and is written to
+compaction_report.json next to model_config.json.
+"""
+import json
+import time
+
+import numpy as np
+
+from .features import class_names, feature_columns
+
+report_filename = 'compaction_report.json'
+prune_block_bytes = 16 * 2 ** 20
+
+default_distill_configs = ({'max_depth': 3, 'n_estimators': 100},
+                           {'max_depth': 4, 'n_estimators': 60})
+
+
+def _model_json(booster):
+    return json.loads(booster.save_raw(raw_format='json'))
+
+
+def _booster_from_json(model_json):
+    import xgboost as xgb
+
+    return xgb.Booster(model_file=bytearray(json.dumps(model_json).encode()))
+
+
+def truncate_to_best_iteration(model):
+    """
+    Booster with only the rounds up to best_iteration
+    """
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    best_iteration = booster.attr('best_iteration')
+    if best_iteration is None:
+        return booster.copy()
+    booster = booster[:int(best_iteration) + 1]
+    booster.set_attr(best_iteration=None, best_score=None)
+    return booster
+
+
+def select_rounds(booster, rounds):
+    """
+    New booster keeping only the given boosting rounds (in order)
+    """
+    model_json = _model_json(booster)
+    learner = model_json['learner']
+    gbtree = learner['gradient_booster']['model']
+    indptr = gbtree['iteration_indptr']
+    trees, tree_info, new_indptr = [], [], [0]
+    for r in sorted(rounds):
+        for t in range(indptr[r], indptr[r + 1]):
+            tree = dict(gbtree['trees'][t], id=len(trees))
+            trees.append(tree)
+            tree_info.append(gbtree['tree_info'][t])
+        new_indptr.append(len(trees))
+    gbtree['trees'] = trees
+    gbtree['tree_info'] = tree_info
+    gbtree['iteration_indptr'] = new_indptr
+    gbtree['gbtree_model_param']['num_trees'] = str(len(trees))
+    learner.get('attributes', {}).pop('best_iteration', None)
+    learner.get('attributes', {}).pop('best_score', None)
+    return _booster_from_json(model_json)
+
+
+def round_margins(booster, X):
+    """
+    Per-round margin terms (n_rows, n_rounds, n_classes) and the base margin
+    Their sum over rounds plus the base margin is output_margin
+    """
+    import xgboost as xgb
+
+    model_json = _model_json(booster)
+    gbtree = model_json['learner']['gradient_booster']['model']
+    indptr = gbtree['iteration_indptr']
+    n_rounds = len(indptr) - 1
+    # Leaf values padded into a (n_trees, max_nodes) lookup table
+    trees = gbtree['trees']
+    values = np.zeros((len(trees), max(len(t['split_conditions']) for t in trees)),
+                      dtype=np.float32)
+    for t, tree in enumerate(trees):
+        values[t, :len(tree['split_conditions'])] = tree['split_conditions']
+
+    dmatrix = xgb.DMatrix(np.asarray(X, dtype=np.float32), feature_names=feature_columns)
+    leaves = booster.predict(dmatrix, pred_leaf=True, strict_shape=True).astype(np.int64)
+    leaves = leaves.reshape(len(leaves), -1)  # (n_rows, n_trees)
+    leaf_values = values[np.arange(len(trees)), leaves]
+
+    terms = np.zeros((len(leaves), n_rounds, len(class_names)), dtype=np.float64)
+    tree_round = np.repeat(np.arange(n_rounds), np.diff(indptr))
+    np.add.at(terms, (slice(None), tree_round, np.asarray(gbtree['tree_info'])),
+              leaf_values)
+    full_margin = booster.predict(dmatrix, output_margin=True, strict_shape=True)
+    full_margin = full_margin.reshape(len(leaves), -1)
+    base = full_margin - terms.sum(axis=1)
+    return terms, base
+
+
+def _log_loss(margin, y):
+    # Softmax log-loss over the last axis; margin is (..., n_rows, n_classes)
+    shifted = margin - margin.max(axis=-1, keepdims=True)
+    picked = shifted[..., np.arange(len(y)), y]
+    return (np.log(np.exp(shifted).sum(axis=-1)) - picked).mean(axis=-1)
+
+
+def greedy_prune_rounds(booster, X_valid, y_valid, max_loss_increase=0.01, min_rounds=1):
+    """
+    Backward elimination of boosting rounds on validation log-loss
+    Returns the removal path: list of (kept_rounds, log_loss), starting from
+    the full booster and stopping before the loss exceeds
+    (1 + max_loss_increase) times the starting loss
+    """
+    y = np.asarray(y_valid)
+    terms, base = round_margins(booster, X_valid)
+    kept = list(range(terms.shape[1]))
+    margin = base + terms.sum(axis=1)
+    start_loss = float(_log_loss(margin, y))
+    limit = start_loss * (1 + max_loss_increase)
+    path = [(list(kept), start_loss)]
+
+    # Candidate margins are built a block of rounds at a time, so memory is
+    # capped at prune_block_bytes instead of growing as rounds x rows
+    block = max(1, prune_block_bytes // margin.nbytes)
+    while len(kept) > min_rounds:
+        # Loss without each remaining round: the running margin minus that
+        # round's contribution
+        losses = np.empty(len(kept))
+        for start in range(0, len(kept), block):
+            rounds = kept[start:start + block]
+            candidate = margin[None] - terms[:, rounds].transpose(1, 0, 2)
+            losses[start:start + len(rounds)] = _log_loss(candidate, y)
+        best = int(losses.argmin())
+        if losses[best] > limit:
+            break
+        margin -= terms[:, kept[best]]
+        del kept[best]
+        path.append((list(kept), float(losses[best])))
+    return path
+
+
+def distill(teacher, X_transfer, max_depth=3, n_estimators=100, learning_rate=0.2, seed=42,
+            min_weight=1e-4):
+    """
+    Train a smaller XGBClassifier on the teacher's class probabilities
+    """
+    from .train import build_model
+
+    X_transfer = np.asarray(X_transfer, dtype=np.float32)
+    soft = np.asarray(teacher.predict_proba(X_transfer), dtype=np.float32)
+    n_classes = soft.shape[1]
+    # Row i appears once per class k with weight p_k(i): weighted hard-label
+    # log-loss of the copies is the soft-label cross-entropy of the row
+    X = np.repeat(X_transfer, n_classes, axis=0)
+    y = np.tile(np.arange(n_classes), len(X_transfer))
+    weight = soft.ravel()
+    keep = weight >= min_weight
+    student = build_model(max_depth=max_depth, n_estimators=n_estimators,
+                          learning_rate=learning_rate, early_stopping_rounds=None,
+                          random_state=seed, subsample=1.0, colsample_bytree=1.0)
+    student.fit(X[keep], y[keep], sample_weight=weight[keep], verbose=False)
+    return student.get_booster()
+
+
+def compact_model(model, X_valid, y_valid, X_train=None, max_loss_increase=0.01,
+                  prune_fractions=(0.5, 0.25), distill_configs=default_distill_configs,
+                  X_transfer=None):
+    """
+    Named candidate boosters: full, best_iteration, pruned_* and distilled_*
+    Pruned candidates are the greedy path at the given fractions of the
+    truncated rounds (if within max_loss_increase) and its smallest model.
+    Students are trained on X_transfer (default: X_train, plus X_valid)
+    """
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    candidates = {'full': booster.copy()}
+    candidates['full'].set_attr(best_iteration=None, best_score=None)
+    truncated = truncate_to_best_iteration(booster)
+    candidates['best_iteration'] = truncated
+
+    path = greedy_prune_rounds(truncated, X_valid, y_valid, max_loss_increase)
+    n_rounds = len(path[0][0])
+    targets = sorted({max(1, int(n_rounds * f)) for f in prune_fractions}, reverse=True)
+    for target in targets:
+        step = next((kept for kept, _ in path if len(kept) <= target), None)
+        if step is not None:
+            candidates[f'pruned_{len(step)}'] = select_rounds(truncated, step)
+    smallest = path[-1][0]
+    if len(smallest) < n_rounds:
+        candidates[f'pruned_{len(smallest)}'] = select_rounds(truncated, smallest)
+
+    if distill_configs:
+        if X_transfer is None:
+            parts = [X for X in (X_train, X_valid) if X is not None]
+            X_transfer = np.concatenate([np.asarray(X, dtype=np.float32) for X in parts])
+        teacher = _BoosterModel(truncated)
+        for config in distill_configs:
+            name = f"distilled_d{config['max_depth']}_r{config['n_estimators']}"
+            candidates[name] = distill(teacher, X_transfer, **config)
+    return candidates
+
+
+class _BoosterModel:
+    # predict_proba over a plain booster (all of its rounds)
+
+    def __init__(self, booster):
+        self.booster = booster
+
+    def predict_proba(self, X):
+        return self.booster.inplace_predict(np.asarray(X, dtype=np.float32))
+
+
+def _latency_ms(booster, X, n_calls=1000):
+    rows = np.asarray(X, dtype=np.float32)
+    timings = np.empty(n_calls)
+    for i in range(n_calls):
+        row = rows[i % len(rows)][None]
+        start = time.perf_counter()
+        booster.inplace_predict(row)
+        timings[i] = time.perf_counter() - start
+    timings *= 1e3
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 99))
+
+
+def _batch_rows_per_s(booster, X, n_rows=100000):
+    X = np.resize(np.asarray(X, dtype=np.float32), (n_rows, X.shape[1]))
+    start = time.perf_counter()
+    booster.inplace_predict(X)
+    return n_rows / (time.perf_counter() - start)
+
+
+def compaction_report(candidates, X_test, y_test, reference='best_iteration', n_calls=1000):
+    """
+    Tree count, bytes, single-row p50/p99 latency, batch throughput and test
+    metrics per candidate; agreement is with the reference candidate's labels
+    """
+    from .evaluate import roc_auc_by_class
+
+    X_test = np.asarray(X_test, dtype=np.float32)
+    y_test = np.asarray(y_test)
+    reference_class = candidates[reference].inplace_predict(X_test).argmax(axis=1)
+    rows = []
+    for name, booster in candidates.items():
+        proba = booster.inplace_predict(X_test)
+        p50, p99 = _latency_ms(booster, X_test, n_calls)
+        roc_auc = roc_auc_by_class(y_test, proba)
+        picked = np.clip(proba[np.arange(len(y_test)), y_test], 1e-15, 1.0)
+        rows.append({
+            'candidate': name,
+            'n_rounds': booster.num_boosted_rounds(),
+            'n_trees': int(_model_json(booster)['learner']['gradient_booster']['model'][
+                'gbtree_model_param']['num_trees']),
+            'model_bytes': len(booster.save_raw(raw_format='ubj')),
+            'latency_p50_ms': p50,
+            'latency_p99_ms': p99,
+            'batch_rows_per_s': _batch_rows_per_s(booster, X_test),
+            'accuracy': float((proba.argmax(axis=1) == y_test).mean()),
+            'macro_roc_auc': float(np.mean(list(roc_auc.values()))),
+            'log_loss': float(-np.log(picked).mean()),
+            'agreement': float((proba.argmax(axis=1) == reference_class).mean())
+        })
+    return rows
+
+
+def format_compaction_report(rows):
+    lines = [f"{'candidate':20s} {'rounds':>6s} {'trees':>6s} {'KiB':>7s} {'p50 ms':>7s} "
+             f"{'p99 ms':>7s} {'rows/s':>9s} {'accuracy':>8s} {'AUC':>7s} {'agree':>7s}"]
+    for r in rows:
+        lines.append(f"{r['candidate']:20s} {r['n_rounds']:6d} {r['n_trees']:6d} "
+                     f"{r['model_bytes'] / 1024:7.1f} {r['latency_p50_ms']:7.3f} "
+                     f"{r['latency_p99_ms']:7.3f} {r['batch_rows_per_s']:9,.0f} "
+                     f"{r['accuracy']:8.4f} {r['macro_roc_auc']:7.4f} {r['agreement']:7.4f}")
+    return '\n'.join(lines)
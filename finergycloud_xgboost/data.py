@@ -0,0 +1,212 @@
+"""
+Synthetic West African renewable energy project dataset
+
+In production, projects would be loaded from:
+pd.read_csv('esg_renewable_projects_west_africa.csv')
+"""
+import os
+
+import numpy as np
+
+# Realistic project mix across the covered markets
+countries = ['Nigeria', 'Ghana', 'Kenya', 'Senegal', 'Mali']
+project_types = ['Solar', 'Wind', 'Hydro', 'Biomass', 'Geothermal']
+country_weights = [0.31, 0.26, 0.24, 0.11, 0.08]
+tech_weights = [0.40, 0.25, 0.20, 0.10, 0.05]
+
+default_n_projects = 2847
+shard_manifest_filename = 'manifest.json'
+
+clip_ranges = {
+    'capacity_mw': (5, 200),
+    'projected_irr': (8, 25),
+    'environmental_score': (4, 10),
+    'social_score': (4, 10),
+    'governance_score': (4, 10)
+}
+
+
+def draw_project_columns(rng, n_projects):
+    """
+    Draw the raw synthetic columns from a RandomState or a Generator
+    Countries and project types come back as integer codes into ``countries``
+    and ``project_types``; numeric columns are float64, already clipped
+    """
+    columns = {
+        'country': rng.choice(len(countries), n_projects, p=country_weights),
+        'project_type': rng.choice(len(project_types), n_projects, p=tech_weights),
+        'capacity_mw': rng.lognormal(3.5, 0.8, n_projects),
+        'projected_irr': rng.normal(15.2, 3.1, n_projects),
+        'environmental_score': rng.beta(2, 1, n_projects) * 10,
+        'social_score': rng.beta(1.8, 1.2, n_projects) * 10,
+        'governance_score': rng.beta(1.9, 1.1, n_projects) * 10
+    }
+
+    # Ensure realistic ranges
+    for name, (low, high) in clip_ranges.items():
+        np.clip(columns[name], low, high, out=columns[name])
+    return columns
+
+
+def generate_synthetic_projects(n_projects=default_n_projects, seed=42, compact=False):
+    """
+    Generate the synthetic training dataset used for the demo model
+    Uses a private RandomState so callers' global numpy state is untouched
+    compact=True draws the same projects into a compact frame (compact_projects)
+    """
+    import pandas as pd
+
+    # choice() over indices draws the same stream as choice() over the names
+    columns = draw_project_columns(np.random.RandomState(seed), n_projects)
+    if compact:
+        data = pd.DataFrame({
+            'project_id': np.arange(n_projects, dtype=_id_dtype(n_projects)),
+            'country': pd.Categorical.from_codes(columns.pop('country').astype(np.int8),
+                                                 categories=countries),
+            'project_type': pd.Categorical.from_codes(columns.pop('project_type').astype(np.int8),
+                                                      categories=project_types)
+        })
+        for name, values in columns.items():
+            data[name] = values.astype(np.float32)
+        return data
+
+    data = pd.DataFrame({
+        'project_id': [f'PRJ-{i:04d}' for i in range(n_projects)],
+        'country': np.asarray(countries)[columns.pop('country')],
+        'project_type': np.asarray(project_types)[columns.pop('project_type')]
+    })
+    for name, values in columns.items():
+        data[name] = values
+    return data
+
+
+def _id_dtype(n_projects):
+    return np.int32 if n_projects < 2 ** 31 else np.int64
+
+
+def compact_projects(df):
+    """
+    Compact copy of a project frame: integer project_id, categorical
+    country/project_type and float32 numeric columns
+    ``PRJ-0042`` style ids keep their number; other ids are factorized
+    """
+    import pandas as pd
+
+    from .features import country_codes, tech_codes
+
+    compact = pd.DataFrame(index=df.index)
+    if 'project_id' in df.columns:
+        ids = df['project_id']
+        if not pd.api.types.is_integer_dtype(ids.dtype):
+            numbers = ids.astype(str).str.extract(r'^[A-Za-z-]*(\d+)$', expand=False)
+            if numbers.notna().all() and not numbers.duplicated().any():
+                ids = numbers.astype(np.int64)
+            else:
+                ids = pd.Series(pd.factorize(ids)[0], index=df.index)
+        compact['project_id'] = ids.astype(_id_dtype(int(ids.max()) + 1 if len(ids) else 0))
+    compact['country'] = pd.Categorical(df['country'], categories=country_codes)
+    compact['project_type'] = pd.Categorical(df['project_type'], categories=tech_codes)
+    for column in df.columns:
+        if column not in compact.columns:
+            values = df[column]
+            if pd.api.types.is_float_dtype(values.dtype):
+                values = values.astype(np.float32)
+            compact[column] = values
+    return compact
+
+
+def shard_dtype(n_projects):
+    """
+    Packed record layout of a .npy project shard
+    """
+    return np.dtype([('project_id', _id_dtype(n_projects)), ('country', np.int8),
+                     ('project_type', np.int8)]
+                    + [(name, np.float32) for name in clip_ranges])
+
+
+def _write_shard(task):
+    shard, start, n_rows, n_projects, seed, output_dir, file_format = task
+    # Shard i always draws from stream i, whichever worker runs it
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(shard,)))
+    columns = draw_project_columns(rng, n_rows)
+    project_id = np.arange(start, start + n_rows, dtype=_id_dtype(n_projects))
+
+    if file_format == 'npy':
+        path = os.path.join(output_dir, f'part-{shard:05d}.npy')
+        records = np.lib.format.open_memmap(path, mode='w+', dtype=shard_dtype(n_projects),
+                                            shape=(n_rows,))
+        records['project_id'] = project_id
+        for name, values in columns.items():
+            records[name] = values
+        records.flush()
+        del records
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = os.path.join(output_dir, f'part-{shard:05d}.parquet')
+        arrays = {'project_id': pa.array(project_id)}
+        for name, names in (('country', countries), ('project_type', project_types)):
+            arrays[name] = pa.DictionaryArray.from_arrays(
+                pa.array(columns.pop(name).astype(np.int8)), pa.array(names))
+        for name, values in columns.items():
+            arrays[name] = pa.array(values.astype(np.float32))
+        pq.write_table(pa.table(arrays), path)
+    return {'path': os.path.basename(path), 'start': start, 'rows': n_rows}
+
+
+def generate_project_shards(output_dir, n_projects, shard_size=1000000, seed=42,
+                            file_format='parquet', workers=None):
+    """
+    Write n_projects synthetic projects as Parquet or .npy shards, in parallel
+    Each shard draws from its own np.random.Generator stream, so the files
+    depend only on seed and shard_size, never on the number of workers.
+    Memory per worker is bounded by one shard. Writes manifest.json and
+    returns it.
+    """
+    import json
+    from concurrent.futures import ProcessPoolExecutor
+
+    if file_format not in ('parquet', 'npy'):
+        raise ValueError(f"unknown shard format: {file_format}")
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [(shard, start, min(shard_size, n_projects - start), n_projects, seed,
+              output_dir, file_format)
+             for shard, start in enumerate(range(0, n_projects, shard_size))]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    if workers == 1:
+        shards = [_write_shard(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            shards = list(pool.map(_write_shard, tasks))
+
+    manifest = {
+        'n_projects': n_projects,
+        'shard_size': shard_size,
+        'seed': seed,
+        'format': file_format,
+        'countries': countries,
+        'project_types': project_types,
+        'shards': shards
+    }
+    with open(os.path.join(output_dir, shard_manifest_filename), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_npy_shard(path, chunk_size=None, columns=None):
+    """
+    Yield compact project DataFrames from a memory-mapped .npy shard
+    """
+    import pandas as pd
+
+    records = np.load(path, mmap_mode='r')
+    chunk_size = chunk_size or len(records)
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        data = pd.DataFrame({name: chunk[name] for name in records.dtype.names
+                             if columns is None or name in columns})
+        for name, names in (('country', countries), ('project_type', project_types)):
+            if name in data.columns:
+                data[name] = pd.Categorical.from_codes(data[name], categories=names)
+        yield data
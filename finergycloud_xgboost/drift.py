@@ -0,0 +1,220 @@
+"""
+Constant-memory drift monitoring of scoring traffic against training
+
+    predict.enable_drift_monitor('drift_reference.json')
+    ...                                   # predict_esg_risk / batch / server
+    predict.get_drift_monitor().report()  # PSI and KS per column
+
+Every monitored column (the ten feature_columns and the three predicted
+class probabilities) has a fixed-bin histogram. The bin edges are the
+reference's quantiles, so each bin holds about the same share of the
+training rows, plus one bin for missing values. run_training saves the
+reference histograms over the training split as drift_reference.json next
+to model_config.json.
+
+An update compares each value with its column's at most n_bins - 1 edges
+and adds one bincount, so its cost per row is constant and no row is kept. Sketches
+with the same edges add up, so sketches from worker processes merge
+exactly: merge() in memory, or to_dict()/save() and load() across
+processes. PSI uses the binned shares (each floored at 1e-4). KS is the
+largest gap between the binned CDFs, which is exact at the bin edges.
+"""
+import json
+import threading
+
+import numpy as np
+
+from .features import class_names, feature_columns
+
+reference_filename = 'drift_reference.json'
+default_n_bins = 20
+probability_columns = ['p_' + name.lower().replace(' ', '_') for name in class_names]
+monitored_columns = feature_columns + probability_columns
+
+# PSI below 0.1 is stable, 0.1-0.2 moderate shift, above 0.2 drift
+psi_thresholds = (0.1, 0.2)
+_min_share = 1e-4
+# Rows binned per broadcast comparison, bounding its temporary to ~5 MB
+_chunk_rows = 16384
+
+
+def reference_edges(values, n_bins=default_n_bins):
+    """
+    Interior bin edges per column: the distinct quantiles of the reference
+    """
+    values = np.asarray(values, dtype=np.float32)
+    quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+    edges = []
+    for j in range(values.shape[1]):
+        column = values[:, j][~np.isnan(values[:, j])]
+        edges.append(np.unique(np.quantile(column, quantiles).astype(np.float32))
+                     if len(column) else np.empty(0, dtype=np.float32))
+    return edges
+
+
+class DriftSketch:
+    """
+    Fixed-bin histograms of the monitored columns
+    Column j has len(edges[j]) + 1 value bins and a trailing missing bin
+    """
+
+    def __init__(self, edges, counts=None, n_rows=0, columns=monitored_columns):
+        self.columns = list(columns)
+        # float32 like the model's input, so a feature equal to an edge
+        # lands in the same bin here and in the reference
+        self.edges = [np.asarray(e, dtype=np.float32) for e in edges]
+        sizes = np.array([len(e) + 2 for e in self.edges])
+        self._offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp)
+        self._sizes = sizes
+        self._missing = self._offsets + sizes - 1
+        # Edges padded with +inf: a row's bins are one broadcast comparison
+        self._padded = np.full((len(self.edges), max(sizes) - 2), np.inf, dtype=np.float32)
+        for j, e in enumerate(self.edges):
+            self._padded[j, :len(e)] = e
+        self.counts = (np.zeros(sizes.sum(), dtype=np.int64) if counts is None
+                       else np.asarray(counts, dtype=np.int64).copy())
+        self.n_rows = n_rows
+
+    @classmethod
+    def from_data(cls, X, risk_proba, n_bins=default_n_bins):
+        """
+        Reference sketch: edges from the data's quantiles, then its histograms
+        """
+        values = np.concatenate([np.asarray(X), np.asarray(risk_proba)], axis=1,
+                                dtype=np.float32)
+        return cls(reference_edges(values, n_bins)).update(X, risk_proba)
+
+    def empty(self):
+        """
+        A sketch with the same edges and no rows
+        """
+        return DriftSketch(self.edges, columns=self.columns)
+
+    def bin_counts(self, X, risk_proba):
+        """
+        Histogram counts of a batch of rows, without adding them
+        """
+        values = np.concatenate([np.asarray(X), np.asarray(risk_proba)], axis=1,
+                                dtype=np.float32)
+        counts = np.zeros(len(self.counts), dtype=np.int64)
+        for start in range(0, len(values), _chunk_rows):
+            chunk = values[start:start + _chunk_rows]
+            bins = (chunk[:, :, None] >= self._padded).sum(axis=2) + self._offsets
+            missing = np.isnan(chunk)
+            if missing.any():
+                bins[missing] = np.broadcast_to(self._missing, bins.shape)[missing]
+            counts += np.bincount(bins.ravel(), minlength=len(counts))
+        return counts
+
+    def update(self, X, risk_proba):
+        self.counts += self.bin_counts(X, risk_proba)
+        self.n_rows += len(X)
+        return self
+
+    def merge(self, other):
+        if len(other.edges) != len(self.edges) or not all(
+                np.array_equal(a, b) for a, b in zip(self.edges, other.edges)):
+            raise ValueError('sketches must have the same columns and bin edges')
+        self.counts += other.counts
+        self.n_rows += other.n_rows
+        return self
+
+    def histogram(self, j):
+        return self.counts[self._offsets[j]:self._offsets[j] + self._sizes[j]]
+
+    def compare(self, reference):
+        """
+        PSI, KS and missing share per column of this sketch against a reference
+        """
+        report = {'n_rows': self.n_rows, 'reference_rows': reference.n_rows, 'columns': {}}
+        for j, name in enumerate(self.columns):
+            current = self.histogram(j) / max(self.n_rows, 1)
+            expected = reference.histogram(j) / max(reference.n_rows, 1)
+            ks = float(np.abs(np.cumsum(current) - np.cumsum(expected)).max())
+            current = np.maximum(current, _min_share)
+            expected = np.maximum(expected, _min_share)
+            psi = float(np.sum((current - expected) * np.log(current / expected)))
+            status = ('drift' if psi >= psi_thresholds[1] else
+                      'moderate' if psi >= psi_thresholds[0] else 'stable')
+            report['columns'][name] = {
+                'psi': psi,
+                'ks': ks,
+                'missing_share': float(self.histogram(j)[-1] / max(self.n_rows, 1)),
+                'status': status if self.n_rows else 'no data'
+            }
+        psi = {name: c['psi'] for name, c in report['columns'].items()}
+        report['max_psi'] = max(psi.values())
+        report['drifted'] = [name for name, value in psi.items()
+                             if value >= psi_thresholds[1]] if self.n_rows else []
+        return report
+
+    def to_dict(self):
+        return {
+            'columns': self.columns,
+            'edges': [e.tolist() for e in self.edges],
+            'counts': self.counts.tolist(),
+            'n_rows': self.n_rows
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state['edges'], state['counts'], state['n_rows'], state['columns'])
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+class DriftMonitor:
+    """
+    Live sketch of scored traffic against a reference sketch; thread-safe
+    """
+
+    def __init__(self, reference):
+        if not isinstance(reference, DriftSketch):
+            reference = DriftSketch.load(reference)
+        self.reference = reference
+        self.live = reference.empty()
+        self._lock = threading.Lock()
+
+    def update(self, X, risk_proba):
+        # Binning outside the lock; only the counter add is serialized
+        counts = self.reference.bin_counts(X, risk_proba)
+        with self._lock:
+            self.live.counts += counts
+            self.live.n_rows += len(X)
+        return self
+
+    def merge(self, other):
+        """
+        Add another monitor's or a saved sketch's traffic
+        """
+        sketch = other.live if isinstance(other, DriftMonitor) else other
+        with self._lock:
+            self.live.merge(sketch)
+        return self
+
+    def reset(self):
+        with self._lock:
+            self.live = self.reference.empty()
+
+    def report(self):
+        with self._lock:
+            live = DriftSketch(self.live.edges, self.live.counts, self.live.n_rows,
+                               self.live.columns)
+        return live.compare(self.reference)
+
+
+def format_drift_report(report):
+    lines = [f"{report['n_rows']:,} rows against {report['reference_rows']:,} reference rows",
+             f"{'column':22s} {'PSI':>8s} {'KS':>7s} {'missing':>8s}  status"]
+    for name, c in report['columns'].items():
+        lines.append(f"{name:22s} {c['psi']:8.4f} {c['ks']:7.4f} {c['missing_share']:8.2%}  "
+                     f"{c['status']}")
+    return '\n'.join(lines)
@@ -0,0 +1,209 @@
+"""
+Model evaluation and performance metrics for the ESG risk classifier
+"""
+import numpy as np
+
+from .features import class_names, feature_columns
+from .instrumentation import instrumented
+
+
+def evaluate_model(model, X_test, y_test):
+    """
+    Score the hold-out set and collect accuracy, report and confusion matrix
+    """
+    from sklearn.metrics import classification_report, confusion_matrix
+
+    # Predictions and Performance; multi:softprob labels are the argmax of
+    # the probabilities, so the test set is scored once
+    y_pred_proba = model.predict_proba(X_test)
+    y_pred = y_pred_proba.argmax(axis=1)
+    accuracy = (y_pred == y_test).mean()
+
+    # Per-class accuracy from the confusion matrix
+    cm = confusion_matrix(y_test, y_pred)
+    class_accuracy = cm.diagonal() / cm.sum(axis=1)
+
+    return {
+        'y_pred': y_pred,
+        'y_pred_proba': y_pred_proba,
+        'accuracy': float(accuracy),
+        'classification_report': classification_report(
+            y_test, y_pred, target_names=class_names
+        ),
+        'confusion_matrix': cm,
+        'class_accuracy': class_accuracy,
+        'roc_auc': roc_auc_by_class(y_test, y_pred_proba)
+    }
+
+
+@instrumented('roc_auc')
+def roc_auc_by_class(y_test, y_pred_proba):
+    """
+    One-vs-rest ROC-AUC for each risk class
+    """
+    from sklearn.metrics import auc, roc_curve
+    from sklearn.preprocessing import label_binarize
+
+    # Binarize labels for multi-class ROC
+    y_test_bin = label_binarize(y_test, classes=list(range(len(class_names))))
+    n_classes = y_test_bin.shape[1]
+
+    roc_auc = dict()
+    for i in range(n_classes):
+        fpr, tpr, _ = roc_curve(y_test_bin[:, i], y_pred_proba[:, i])
+        roc_auc[i] = auc(fpr, tpr)
+    return roc_auc
+
+
+def feature_importance_table(model, columns=feature_columns):
+    """
+    Feature importances sorted from most to least important
+    """
+    import pandas as pd
+
+    return pd.DataFrame({
+        'feature': columns,
+        'importance': model.feature_importances_
+    }).sort_values('importance', ascending=False)
+
+
+def mean_roc_auc(roc_auc):
+    return float(np.mean(list(roc_auc.values())))
+
+
+def format_classification_report(precision, recall, f1, support, target_names=class_names,
+                                 digits=2):
+    """
+    Text report laid out exactly like sklearn's classification_report
+    """
+    support = np.asarray(support)
+    total = int(support.sum())
+    width = max(max(len(name) for name in target_names), len('weighted avg'), digits)
+    headers = ['precision', 'recall', 'f1-score', 'support']
+    report = ('{:>{width}s} ' + ' {:>9}' * len(headers)).format('', *headers, width=width)
+    report += '\n\n'
+    row_fmt = '{:>{width}s} ' + ' {:>9.{digits}f}' * 3 + ' {:>9}\n'
+    for row in zip(target_names, precision, recall, f1, support):
+        report += row_fmt.format(*row, width=width, digits=digits)
+    report += '\n'
+
+    accuracy = float(np.sum(np.asarray(recall) * support) / total) if total else 0.0
+    report += ('{:>{width}s} ' + ' {:>9.{digits}}' * 2 + ' {:>9.{digits}f}' + ' {:>9}\n').format(
+        'accuracy', '', '', accuracy, total, width=width, digits=digits)
+    weights = support / total if total else np.zeros(len(support))
+    for name, average in (('macro avg', np.mean), ('weighted avg', None)):
+        values = [float(np.mean(v)) if average else float(np.dot(v, weights))
+                  for v in (precision, recall, f1)]
+        report += row_fmt.format(name, *values, total, width=width, digits=digits)
+    return report
+
+
+class StreamingEvaluator:
+    """
+    Single-pass, constant-memory evaluation over chunks of predictions
+    Keeps a confusion matrix, the summed log-loss and, per class, histograms
+    of the one-vs-rest scores of positive and negative rows. ROC-AUC is
+    integrated from the histograms, treating rows in the same bin as ties.
+    Evaluators from different workers combine with merge().
+    """
+
+    def __init__(self, n_classes=len(class_names), n_bins=65536):
+        self.n_classes = n_classes
+        self.n_bins = n_bins
+        self.n_rows = 0
+        self.log_loss_sum = 0.0
+        self.confusion = np.zeros((n_classes, n_classes), dtype=np.int64)
+        # [class, negative/positive, bin]
+        self.histograms = np.zeros((n_classes, 2, n_bins), dtype=np.int64)
+        self._offsets = np.arange(n_classes, dtype=np.intp) * 2 * n_bins
+
+    def update(self, y_true, y_pred_proba):
+        y_true = np.asarray(y_true, dtype=np.intp)
+        proba = np.asarray(y_pred_proba)
+        n_classes = self.n_classes
+
+        y_pred = proba.argmax(axis=1)
+        self.confusion += np.bincount(y_true * n_classes + y_pred,
+                                      minlength=n_classes * n_classes
+                                      ).reshape(n_classes, n_classes)
+
+        eps = np.finfo(proba.dtype).eps
+        picked = np.clip(proba[np.arange(len(y_true)), y_true], eps, 1 - eps)
+        self.log_loss_sum -= float(np.log(picked.astype(np.float64)).sum())
+
+        bins = (proba * self.n_bins).astype(np.intp)
+        np.minimum(bins, self.n_bins - 1, out=bins)
+        bins += self._offsets
+        bins += (y_true[:, None] == np.arange(n_classes)) * self.n_bins
+        self.histograms += np.bincount(bins.ravel(), minlength=self.histograms.size
+                                       ).reshape(self.histograms.shape)
+        self.n_rows += len(y_true)
+        return self
+
+    def merge(self, other):
+        if (other.n_classes, other.n_bins) != (self.n_classes, self.n_bins):
+            raise ValueError('evaluators must have the same classes and bins')
+        self.n_rows += other.n_rows
+        self.log_loss_sum += other.log_loss_sum
+        self.confusion += other.confusion
+        self.histograms += other.histograms
+        return self
+
+    def roc_auc(self):
+        """
+        One-vs-rest ROC-AUC for each class, keyed like roc_auc_by_class
+        """
+        roc_auc = {}
+        for i in range(self.n_classes):
+            negatives, positives = self.histograms[i]
+            # Sweep the threshold from the top bin down
+            tpr = np.concatenate([[0], np.cumsum(positives[::-1])]) / max(positives.sum(), 1)
+            fpr = np.concatenate([[0], np.cumsum(negatives[::-1])]) / max(negatives.sum(), 1)
+            roc_auc[i] = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1])) / 2)
+        return roc_auc
+
+    def result(self, target_names=class_names):
+        """
+        The metrics evaluate_model returns, minus the per-row predictions
+        """
+        cm = self.confusion
+        support = cm.sum(axis=1)
+        predicted = cm.sum(axis=0)
+        true_positives = cm.diagonal()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            precision = np.where(predicted > 0, true_positives / predicted, 0.0)
+            recall = np.where(support > 0, true_positives / support, 0.0)
+            f1 = np.where(precision + recall > 0,
+                          2 * precision * recall / (precision + recall), 0.0)
+        return {
+            'n_rows': self.n_rows,
+            'accuracy': float(true_positives.sum() / self.n_rows) if self.n_rows else 0.0,
+            'log_loss': self.log_loss_sum / self.n_rows if self.n_rows else 0.0,
+            'precision': precision,
+            'recall': recall,
+            'f1': f1,
+            'support': support,
+            'classification_report': format_classification_report(
+                precision, recall, f1, support, target_names
+            ),
+            'confusion_matrix': cm.copy(),
+            'class_accuracy': recall,
+            'roc_auc': self.roc_auc()
+        }
+
+    def roc_auc_scores(self):
+        """
+        The roc_auc_scores block of model_config.json
+        """
+        return {f'class_{k}': v for k, v in self.roc_auc().items()}
+
+
+def evaluate_model_streaming(model, chunks, n_bins=65536):
+    """
+    Evaluate a model over an iterable of (X, y) chunks in one pass
+    Each chunk is scored once with predict_proba and then discarded
+    """
+    evaluator = StreamingEvaluator(n_bins=n_bins)
+    for X, y in chunks:
+        evaluator.update(y, model.predict_proba(X))
+    return evaluator
@@ -0,0 +1,103 @@
+"""
+Per-prediction feature attributions from xgboost's native tree contributions
+
+    contributions, bias = feature_contributions(model, X)
+    summary = summarize_contributions(contributions, risk_proba)
+
+pred_contribs computes exact TreeSHAP values for every row of a batch in one
+booster call. For each class the contributions of the ten feature_columns
+plus the bias add up to that class's raw margin, i.e. the log-odds that the
+softmax turns into risk_probabilities. predict_esg_risk(explain=True) and
+predict_esg_risk_batch(explain=True) attach them to their usual results;
+explain='approximate' trades exact TreeSHAP for the much cheaper per-path
+attribution on large portfolio screens.
+"""
+import numpy as np
+
+from .features import class_names, feature_columns
+
+
+def _booster_and_range(model):
+    if hasattr(model, 'members'):
+        # TechnologyEnsemble rows are scored by different boosters
+        raise TypeError(f'explain is not supported for {type(model).__name__}')
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    if not hasattr(booster, 'predict'):
+        raise TypeError(f'{type(model).__name__} has no xgboost booster to explain')
+    # Score with the same trees as predict_proba (up to best_iteration)
+    best_iteration = booster.attr('best_iteration')
+    iteration_range = (0, int(best_iteration) + 1) if best_iteration is not None else (0, 0)
+    return booster, iteration_range
+
+
+def feature_contributions(model, X, chunk_size=50000, approximate=False):
+    """
+    Per-class feature contributions for a batch of encoded rows
+    Returns (contributions, bias) shaped (n_rows, n_classes, n_features)
+    and (n_rows, n_classes), float32. approximate=True uses the per-path
+    (Saabas) attribution instead of TreeSHAP: still additive, ~14x faster
+    """
+    import xgboost as xgb
+
+    booster, iteration_range = _booster_and_range(model)
+    if hasattr(X, 'to_numpy'):
+        X = X[feature_columns].to_numpy(dtype=np.float32)
+    X = np.asarray(X, dtype=np.float32).reshape(-1, len(feature_columns))
+    n_rows, n_features = X.shape
+    contributions = np.empty((n_rows, len(class_names), n_features), dtype=np.float32)
+    bias = np.empty((n_rows, len(class_names)), dtype=np.float32)
+
+    for start in range(0, n_rows, chunk_size):
+        chunk = xgb.DMatrix(X[start:start + chunk_size], feature_names=feature_columns)
+        values = booster.predict(chunk, pred_contribs=True, approx_contribs=approximate,
+                                 iteration_range=iteration_range, strict_shape=True)
+        contributions[start:start + chunk_size] = values[:, :, :n_features]
+        bias[start:start + chunk_size] = values[:, :, n_features]
+    return contributions, bias
+
+
+def contribution_table(contributions, bias):
+    """
+    predict_esg_risk explanation block for one row: per class, feature -> contribution
+    """
+    return {
+        name: dict(zip(feature_columns + ['bias'],
+                       [float(v) for v in contributions[k]] + [float(bias[k])]))
+        for k, name in enumerate(['low_risk', 'medium_risk', 'high_risk'])
+    }
+
+
+def summarize_contributions(contributions, risk_proba=None, top_k=3):
+    """
+    Portfolio-level view of a batch of contributions, fully vectorized
+    Rows are explained for their predicted class (argmax of risk_proba, or of
+    the summed contributions when no probabilities are given)
+    """
+    import pandas as pd
+
+    contributions = np.asarray(contributions)
+    n_rows = len(contributions)
+    if risk_proba is not None:
+        risk_class = np.asarray(risk_proba).argmax(axis=1)
+    else:
+        risk_class = contributions.sum(axis=2).argmax(axis=1)
+    # (n_rows, n_features): each row's contributions towards its own class
+    own = contributions[np.arange(n_rows), risk_class]
+
+    top_k = min(top_k, len(feature_columns))
+    top = np.argpartition(-own, top_k - 1, axis=1)[:, :top_k]
+    order = np.take_along_axis(own, top, axis=1).argsort(axis=1)[:, ::-1]
+    top = np.take_along_axis(top, order, axis=1)
+
+    columns = np.asarray(feature_columns, dtype=object)
+    counts = np.zeros((len(class_names), len(feature_columns)), dtype=np.int64)
+    np.add.at(counts, (risk_class, top[:, 0]), 1)
+    return {
+        'mean_contribution': pd.DataFrame(contributions.mean(axis=0), index=class_names,
+                                          columns=feature_columns),
+        'mean_abs_contribution': pd.DataFrame(np.abs(contributions).mean(axis=0),
+                                              index=class_names, columns=feature_columns),
+        'top_drivers': columns[top],
+        'top_driver_counts': pd.DataFrame(counts, index=class_names, columns=feature_columns),
+        'n_rows': n_rows
+    }
@@ -0,0 +1,401 @@
+"""
+On-disk engineered-feature store keyed by project_id
+
+    FeatureStore('features/', writable=True).upsert(projects)  # only new or changed
+    store = FeatureStore('features/')        # read-only
+    X, y = store.features(), store.labels()  # memory-mapped, no copy
+
+A store is a directory of memory-mapped .npy columns plus a manifest:
+
+    features/
+        manifest.json   row count, capacity, feature version, category names
+        raw.npy         (capacity, 7) float64 raw fields, categories as codes
+        digests.npy     64-bit hash of each row's raw fields
+        features.npy    (capacity, 10) float32, feature_columns order
+        labels.npy      int8 risk_classification
+        ids.npy         project_id per row
+        index_*.npy     sorted project_id keys, check hashes and their rows
+
+upsert() hashes the raw fields of the incoming rows and runs
+engineer_features only on projects that are new or whose digest changed;
+they are written in place or appended, their digests after their features,
+and the manifest is replaced last, so readers never see rows past the
+committed count and an interrupted upsert leaves stale rows marked stale. Integer project_ids are
+their own keys; string ids are looked up by two independent 64-bit hashes
+of their characters, which avoids sorting and comparing unicode arrays.
+Features are those of
+engineer_features on a string-keyed frame, rounded to float32 once, i.e.
+exactly what the booster is fed.
+
+The store is versioned by a hash of engineer_features' source and the
+feature schema (lookup tables, columns). A store has a single writer, opened
+with writable=True; readers map the columns read-only and may do so
+concurrently. Opening a store written by other feature code as the writer
+recomputes every row from the stored raw fields first; a reader refuses it.
+"""
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+
+from .features import category_codes, country_codes, feature_columns, tech_codes
+
+manifest_filename = 'manifest.json'
+default_chunk_size = 1000000
+
+# Raw fields in raw.npy column order; country and project_type as codes
+store_raw_columns = [
+    'country', 'project_type', 'capacity_mw', 'projected_irr',
+    'environmental_score', 'social_score', 'governance_score'
+]
+
+_min_capacity = 1024
+_max_id_length = 64
+
+
+def feature_version():
+    """
+    Hash of the feature definition: engineer_features' code and the schema
+    """
+    from .features import engineer_features
+    from .registry import feature_schema
+
+    definition = inspect.getsource(engineer_features) + json.dumps(feature_schema(),
+                                                                   sort_keys=True)
+    return hashlib.sha256(definition.encode()).hexdigest()[:16]
+
+
+def raw_matrix(projects):
+    """
+    (n, 7) float64 raw fields of a project frame, categories as codes (-1 unknown)
+    """
+    raw = np.empty((len(projects), len(store_raw_columns)), dtype=np.float64)
+    raw[:, 0] = category_codes(projects['country'], country_codes)
+    raw[:, 1] = category_codes(projects['project_type'], tech_codes)
+    for j, name in enumerate(store_raw_columns[2:], 2):
+        raw[:, j] = projects[name].to_numpy(dtype=np.float64)
+    return raw
+
+
+def _mix(digest, words, skip_zero=False):
+    # splitmix64 over each column of words; zero words (string padding) can
+    # be skipped so a hash does not depend on the array's width
+    for j in range(words.shape[1]):
+        mixed = digest ^ words[:, j]
+        mixed ^= mixed >> np.uint64(30)
+        mixed *= np.uint64(0xBF58476D1CE4E5B9)
+        mixed ^= mixed >> np.uint64(27)
+        mixed *= np.uint64(0x94D049BB133111EB)
+        mixed ^= mixed >> np.uint64(31)
+        digest = np.where(words[:, j] != 0, mixed, digest) if skip_zero else mixed
+    return digest
+
+
+def row_digests(raw):
+    """
+    64-bit splitmix hash of each raw row's bit pattern
+    """
+    words = np.ascontiguousarray(raw).view(np.uint64)
+    return _mix(np.full(len(words), 0x9E3779B97F4A7C15, dtype=np.uint64), words)
+
+
+def project_keys(project_ids):
+    """
+    (ids, keys, check) for an array of project_ids: integer ids as int64
+    keyed by their own bits, string ids as an even-width unicode array keyed
+    by two independent hashes of their characters
+    """
+    ids = np.asarray(project_ids)
+    if ids.dtype.kind in 'iu':
+        ids = ids.astype(np.int64)
+        keys = ids.view(np.uint64)
+        return ids, keys, keys
+    ids = ids.astype(str)
+    if ids.dtype.itemsize % 8:
+        ids = ids.astype(f'U{ids.dtype.itemsize // 4 + 1}')
+    words = ids.view(np.uint64).reshape(len(ids), ids.dtype.itemsize // 8)
+    keys = _mix(np.full(len(ids), 0x9E3779B97F4A7C15, dtype=np.uint64), words, True)
+    check = _mix(np.full(len(ids), 0xD1B54A32D192ED03, dtype=np.uint64), words, True)
+    return ids, keys, check
+
+
+def _raw_frame(raw, countries, project_types):
+    # String-keyed project frame of raw rows, unknown category codes as None
+    import pandas as pd
+
+    codes = raw[:, :2].astype(np.int64)
+    frame = pd.DataFrame({
+        'country': np.asarray(countries + [None], dtype=object)[codes[:, 0]],
+        'project_type': np.asarray(project_types + [None], dtype=object)[codes[:, 1]]
+    })
+    for j, name in enumerate(store_raw_columns[2:], 2):
+        frame[name] = raw[:, j]
+    return frame
+
+
+def _engineer(raw, countries, project_types):
+    # Features and labels of raw rows through the string-keyed engineer_features
+    from .features import engineer_features
+
+    frame = engineer_features(_raw_frame(raw, countries, project_types))
+    return (frame[feature_columns].to_numpy(dtype=np.float32),
+            frame['risk_classification'].to_numpy(dtype=np.int8))
+
+
+class FeatureStore:
+    """
+    Engineered features keyed by project_id, upserted incrementally
+    """
+
+    def __init__(self, path, chunk_size=default_chunk_size, writable=False):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.writable = writable
+        self.manifest = None
+        self._columns = {}
+        manifest_path = os.path.join(path, manifest_filename)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self.manifest = json.load(f)
+            self._map()
+            if self.manifest['feature_version'] != feature_version():
+                if not writable:
+                    raise ValueError(f'feature store {path} was written by other feature code; '
+                                     'open it with writable=True to rebuild it')
+                self.rebuild()
+
+    def __len__(self):
+        return self.manifest['n_rows'] if self.manifest else 0
+
+    def _file(self, name):
+        return os.path.join(self.path, f'{name}.npy')
+
+    def _map(self):
+        mode = 'r+' if self.writable else 'r'
+        self._columns = {name: np.load(self._file(name), mmap_mode=mode)
+                         for name in ('raw', 'digests', 'features', 'labels', 'ids',
+                                      'index_keys', 'index_check', 'index_rows')}
+
+    def _allocate(self, capacity, id_dtype):
+        # Grow every column to capacity rows, keeping the committed rows
+        n_rows = len(self)
+        shapes = {'raw': (len(store_raw_columns),), 'digests': (), 'features':
+                  (len(feature_columns),), 'labels': (), 'ids': ()}
+        dtypes = {'raw': np.float64, 'digests': np.uint64, 'features': np.float32,
+                  'labels': np.int8, 'ids': id_dtype}
+        for name, shape in shapes.items():
+            tmp = self._file(name) + '.tmp'
+            column = np.lib.format.open_memmap(tmp, mode='w+', dtype=dtypes[name],
+                                               shape=(capacity,) + shape)
+            if n_rows:
+                column[:n_rows] = self._columns[name][:n_rows]
+            column.flush()
+            del column
+            os.replace(tmp, self._file(name))
+        for name, dtype in (('index_keys', np.uint64), ('index_check', np.uint64),
+                            ('index_rows', np.int64)):
+            if not os.path.exists(self._file(name)):
+                np.save(self._file(name), np.empty(0, dtype=dtype))
+        return capacity
+
+    def _commit(self, n_rows, capacity, index):
+        for name, values in index.items():
+            with open(self._file(name) + '.tmp', 'wb') as f:
+                np.save(f, values)
+            os.replace(self._file(name) + '.tmp', self._file(name))
+        self.manifest = {
+            'n_rows': n_rows,
+            'capacity': capacity,
+            'feature_version': feature_version(),
+            'raw_columns': store_raw_columns,
+            'feature_columns': feature_columns,
+            'countries': country_codes,
+            'project_types': tech_codes
+        }
+        tmp = os.path.join(self.path, manifest_filename + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, os.path.join(self.path, manifest_filename))
+        self._map()
+
+    def _check_writable(self):
+        if not self.writable:
+            raise ValueError(f'feature store {self.path} is open read-only; '
+                             'open it with writable=True to write')
+
+    def lookup(self, project_ids):
+        """
+        Row of each project_id in the store, -1 if absent
+        """
+        return self._lookup(*project_keys(project_ids)[1:])
+
+    def _lookup(self, keys, check):
+        if not len(self):
+            return np.full(len(keys), -1, dtype=np.int64)
+        index_keys = self._columns['index_keys']
+        # Searching in key order walks the index sequentially: ~4x faster
+        # than random probes at a million rows, even with the argsort
+        order = np.argsort(keys)
+        pos = np.empty(len(keys), dtype=np.int64)
+        pos[order] = np.searchsorted(index_keys, keys[order])
+        np.minimum(pos, len(index_keys) - 1, out=pos)
+        found = (index_keys[pos] == keys) & (self._columns['index_check'][pos] == check)
+        return np.where(found, self._columns['index_rows'][pos], -1)
+
+    def upsert(self, projects):
+        """
+        Insert new projects and recompute changed ones; unchanged rows are
+        skipped. Returns counts of inserted, updated and unchanged rows
+        """
+        import pandas as pd
+
+        self._check_writable()
+        if not isinstance(projects, pd.DataFrame):
+            projects = pd.DataFrame(projects)
+        if not len(projects):
+            return {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        ids, keys, check = project_keys(projects['project_id'].to_numpy())
+        sorted_keys = np.sort(keys)
+        if (sorted_keys[1:] == sorted_keys[:-1]).any():
+            raise ValueError('duplicate project_id in upsert')
+        os.makedirs(self.path, exist_ok=True)
+        n_rows = len(self)
+        capacity = self.manifest['capacity'] if self.manifest else 0
+        id_dtype = self._columns['ids'].dtype if self.manifest else ids.dtype
+        if id_dtype.kind != ids.dtype.kind:
+            raise ValueError(f"project_id must be {id_dtype}, got {ids.dtype}")
+
+        raw = raw_matrix(projects)
+        digests = row_digests(raw)
+        rows = self._lookup(keys, check)
+        found = rows >= 0
+        changed = ~found
+        if found.any():
+            changed[found] = self._columns['digests'][rows[found]] != digests[found]
+        new = np.flatnonzero(~found)
+        if not changed.any():
+            return {'inserted': 0, 'updated': 0, 'unchanged': len(ids)}
+
+        if n_rows and len(new):
+            index_keys = self._columns['index_keys']
+            at = np.minimum(np.searchsorted(index_keys, keys[new]), len(index_keys) - 1)
+            if (index_keys[at] == keys[new]).any():
+                raise ValueError('project_id hash collision; use integer project_ids')
+
+        # Grow the columns, or widen the ids column for longer string ids
+        current_dtype = self._columns['ids'].dtype if self.manifest else None
+        if ids.dtype.itemsize > id_dtype.itemsize:
+            id_dtype = ids.dtype
+        if n_rows + len(new) > capacity or id_dtype != current_dtype:
+            if n_rows + len(new) > capacity:
+                capacity = max(_min_capacity, 2 * capacity, n_rows + len(new))
+            self._allocate(capacity, id_dtype)
+            self._map()
+        rows[new] = np.arange(n_rows, n_rows + len(new))
+        targets = np.flatnonzero(changed)
+        for start in range(0, len(targets), self.chunk_size):
+            batch = targets[start:start + self.chunk_size]
+            destination = rows[batch]
+            X, y = _engineer(raw[batch], country_codes, tech_codes)
+            self._columns['raw'][destination] = raw[batch]
+            self._columns['features'][destination] = X
+            self._columns['labels'][destination] = y
+            self._columns['ids'][destination] = ids[batch]
+        for name in ('raw', 'features', 'labels', 'ids'):
+            self._columns[name].flush()
+        # Digests last: an upsert cut short leaves the old digest on a row
+        # whose features it did not finish, so the next upsert redoes it
+        self._columns['digests'][rows[targets]] = digests[targets]
+        self._columns['digests'].flush()
+
+        index = {name: self._columns[name]
+                 for name in ('index_keys', 'index_check', 'index_rows')}
+        if len(new):
+            order = np.argsort(keys[new])
+            at = np.searchsorted(index['index_keys'], keys[new][order])
+            for name, values in (('index_keys', keys), ('index_check', check),
+                                 ('index_rows', rows)):
+                index[name] = np.insert(index[name], at, values[new][order])
+        self._commit(n_rows + len(new), capacity, index)
+        return {'inserted': len(new), 'updated': int(changed.sum()) - len(new),
+                'unchanged': int((~changed).sum())}
+
+    def rebuild(self):
+        """
+        Recompute every row's features from its stored raw fields
+        Run on a writable open when the feature code or lookup tables have changed
+        """
+        self._check_writable()
+        n_rows = len(self)
+        countries = self.manifest['countries']
+        project_types = self.manifest['project_types']
+        # Codes follow the category lists the rows were written with
+        remap = countries != country_codes or project_types != tech_codes
+        for start in range(0, n_rows, self.chunk_size):
+            rows = slice(start, min(n_rows, start + self.chunk_size))
+            raw = np.array(self._columns['raw'][rows])
+            if remap:
+                remapped = raw.copy()
+                for j, (old, new) in enumerate(((countries, country_codes),
+                                                (project_types, tech_codes))):
+                    table = np.array([new.index(c) if c in new else -1 for c in old] + [-1])
+                    remapped[:, j] = table[raw[:, j].astype(np.int64)]
+                raw = remapped
+                self._columns['raw'][rows] = raw
+            X, y = _engineer(raw, country_codes, tech_codes)
+            self._columns['features'][rows] = X
+            self._columns['labels'][rows] = y
+            if remap:
+                self._columns['digests'][rows] = row_digests(raw)
+        for name in ('raw', 'digests', 'features', 'labels'):
+            self._columns[name].flush()
+        self._commit(n_rows, self.manifest['capacity'],
+                     {name: self._columns[name]
+                      for name in ('index_keys', 'index_check', 'index_rows')})
+
+    def features(self):
+        """
+        (n_rows, n_features) float32 feature matrix, a read-only memory map
+        """
+        return self._read('features')
+
+    def labels(self):
+        return self._read('labels')
+
+    def ids(self):
+        return self._read('ids')
+
+    def _read(self, name):
+        if not len(self):
+            raise ValueError(f'feature store {self.path} is empty')
+        view = self._columns[name][:len(self)].view(np.ndarray)
+        view.flags.writeable = False
+        return view
+
+    def projects(self):
+        """
+        Raw project fields as a DataFrame with project_id, e.g. for scoring
+        """
+        frame = _raw_frame(self._read('raw'), country_codes, tech_codes)
+        frame.insert(0, 'project_id', self.ids())
+        return frame
+
+    def features_frame(self):
+        """
+        Feature matrix as a DataFrame over the memory map, without copying
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.features(), columns=feature_columns, copy=False)
+
+    def get(self, project_ids):
+        """
+        Feature rows of the given project_ids (copied); KeyError if any is absent
+        """
+        rows = self.lookup(project_ids)
+        if (rows < 0).any():
+            missing = np.asarray(project_ids)[rows < 0]
+            raise KeyError(f'{len(missing)} project_ids not in the store, e.g. {missing[0]}')
+        return self._columns['features'][rows]
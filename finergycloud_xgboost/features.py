@@ -0,0 +1,181 @@
+"""
+Feature engineering for ESG risk assessment
+
+Side-effect free: importing this module only pulls in numpy.
+"""
+import numpy as np
+
+# Geographic risk adjustment
+country_risk_scores = {
+    'Nigeria': 0.72, 'Ghana': 0.85, 'Kenya': 0.78,
+    'Senegal': 0.81, 'Mali': 0.65
+}
+
+# Technology maturity scoring
+tech_maturity = {
+    'Solar': 0.92, 'Wind': 0.88, 'Hydro': 0.85,
+    'Biomass': 0.75, 'Geothermal': 0.70
+}
+
+# Raw project fields engineer_features reads
+raw_columns = [
+    'country', 'project_type', 'capacity_mw', 'projected_irr',
+    'environmental_score', 'social_score', 'governance_score'
+]
+
+# Model inputs, in the order the booster was trained on
+feature_columns = [
+    'capacity_mw', 'projected_irr', 'environmental_score', 'social_score',
+    'governance_score', 'country_risk_score', 'tech_maturity_score',
+    'capacity_risk', 'irr_risk', 'esg_composite'
+]
+
+# Target encoding: Low=0, Medium=1, High=2
+class_names = ['Low Risk', 'Medium Risk', 'High Risk']
+
+
+# Integer-coded lookups for compact frames: code i is the i-th key of the
+# dicts above and code -1 (unknown or missing) lands on the trailing NaN
+country_codes = list(country_risk_scores)
+tech_codes = list(tech_maturity)
+country_risk_table = np.array(list(country_risk_scores.values()) + [np.nan], dtype=np.float32)
+tech_maturity_table = np.array(list(tech_maturity.values()) + [np.nan], dtype=np.float32)
+
+# Step-function features as lookups, indexed by how many thresholds are passed
+capacity_risk_table = np.array([1.0, 0.9, 0.8], dtype=np.float32)
+irr_risk_table = np.array([0.6, 0.8, 0.9], dtype=np.float32)
+
+
+def is_compact(df):
+    """
+    True for frames with categorical or int-coded country/project_type
+    """
+    import pandas as pd
+
+    dtype = df['country'].dtype
+    return isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_integer_dtype(dtype)
+
+
+def category_codes(column, categories):
+    """
+    Integer codes of a categorical, int-coded or string column, -1 if unknown
+    """
+    import pandas as pd
+
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        if list(column.cat.categories) == categories:
+            return column.cat.codes.to_numpy()
+        column = column.astype(object)
+    elif pd.api.types.is_integer_dtype(column.dtype):
+        codes = column.to_numpy()
+        return np.where((codes >= 0) & (codes < len(categories)), codes, -1)
+    return pd.Categorical(column, categories=categories).codes
+
+
+def engineer_features(df):
+    """
+    Advanced feature engineering for ESG risk assessment
+    Compact frames (see is_compact) go through engineer_features_compact
+    """
+    if is_compact(df):
+        return engineer_features_compact(df)
+
+    # Geographic risk adjustment
+    df['country_risk_score'] = df['country'].map(country_risk_scores)
+
+    # Technology maturity scoring
+    df['tech_maturity_score'] = df['project_type'].map(tech_maturity)
+
+    # Capacity-based risk adjustment
+    df['capacity_risk'] = np.where(df['capacity_mw'] > 100, 0.8,
+                          np.where(df['capacity_mw'] > 50, 0.9, 1.0))
+
+    # Financial viability indicators
+    df['irr_risk'] = np.where(df['projected_irr'] > 15, 0.9,
+                     np.where(df['projected_irr'] > 12, 0.8, 0.6))
+
+    # ESG composite scoring
+    df['esg_composite'] = (df['environmental_score'] * 0.4 +
+                          df['social_score'] * 0.35 +
+                          df['governance_score'] * 0.25)
+
+    # Generate risk classification based on composite factors
+    risk_score = (df['esg_composite'] * 0.4 +
+                  df['projected_irr'] * 0.3 +
+                  df['country_risk_score'] * 10 * 0.2 +
+                  df['tech_maturity_score'] * 10 * 0.1)
+
+    df['risk_classification'] = np.where(risk_score > 8.5, 0,  # Low Risk
+                               np.where(risk_score > 7.0, 1, 2))  # Medium/High Risk
+
+    return df
+
+
+def engineer_features_compact(df):
+    """
+    engineer_features for compact frames, in place and in float32
+    Categories are looked up through integer-indexed arrays rather than
+    dict .map, and every derived column is float32 (int8 for the label)
+    """
+    df['country_risk_score'] = country_risk_table[category_codes(df['country'], country_codes)]
+    df['tech_maturity_score'] = tech_maturity_table[
+        category_codes(df['project_type'], tech_codes)
+    ]
+
+    capacity = df['capacity_mw'].to_numpy(dtype=np.float32)
+    irr = df['projected_irr'].to_numpy(dtype=np.float32)
+    steps = (capacity > 50).view(np.int8) + (capacity > 100).view(np.int8)
+    df['capacity_risk'] = capacity_risk_table[steps]
+    steps = (irr > 12).view(np.int8) + (irr > 15).view(np.int8)
+    df['irr_risk'] = irr_risk_table[steps]
+
+    esg_composite = df['environmental_score'].to_numpy(dtype=np.float32) * np.float32(0.4)
+    esg_composite += df['social_score'].to_numpy(dtype=np.float32) * np.float32(0.35)
+    esg_composite += df['governance_score'].to_numpy(dtype=np.float32) * np.float32(0.25)
+    df['esg_composite'] = esg_composite
+
+    risk_score = esg_composite * np.float32(0.4)
+    risk_score += irr * np.float32(0.3)
+    risk_score += df['country_risk_score'].to_numpy() * np.float32(10 * 0.2)
+    risk_score += df['tech_maturity_score'].to_numpy() * np.float32(10 * 0.1)
+    # Low=0 above 8.5, Medium=1 above 7.0, High=2 otherwise (and for NaN)
+    risk_class = np.full(len(df), 2, dtype=np.int8)
+    risk_class -= (risk_score > 7.0).view(np.int8)
+    risk_class -= (risk_score > 8.5).view(np.int8)
+    df['risk_classification'] = risk_class
+
+    return df
+
+
+n_features = len(feature_columns)
+
+
+def encode_project(project, out=None):
+    """
+    Pandas-free feature encoding for a single project dict
+    Fills a float32 vector in feature_columns order with the same values
+    engineer_features would produce; pass ``out`` to reuse a buffer
+    """
+    if out is None:
+        out = np.empty(n_features, dtype=np.float32)
+    capacity = project['capacity_mw']
+    irr = project['projected_irr']
+    environmental = project['environmental_score']
+    social = project['social_score']
+    governance = project['governance_score']
+
+    # Same order and float64 arithmetic as engineer_features, rounded to
+    # float32 once on assignment exactly as xgboost does for DataFrames
+    out[:] = (
+        capacity,
+        irr,
+        environmental,
+        social,
+        governance,
+        country_risk_scores.get(project['country'], np.nan),
+        tech_maturity.get(project['project_type'], np.nan),
+        0.8 if capacity > 100 else 0.9 if capacity > 50 else 1.0,
+        0.9 if irr > 15 else 0.8 if irr > 12 else 0.6,
+        environmental * 0.4 + social * 0.35 + governance * 0.25
+    )
+    return out
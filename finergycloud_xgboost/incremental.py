@@ -0,0 +1,194 @@
+"""
+Incremental warm-start training on new project batches
+
+New monthly batches continue boosting the current registry model instead of
+retraining from scratch. The batch can be mixed with a fixed-size reservoir
+sample of historical rows, so the extra trees do not just fit the latest
+month. The candidate and the current model are scored on the same holdout,
+and the candidate becomes CURRENT only if its accuracy does not drop by more
+than max_accuracy_drop. Rejected candidates are still stored as versions.
+
+The reservoir starts as a sample of the base version's training split
+(seed_reservoir, run by ``train --registry``) and a batch joins it only once
+a model trained on it is promoted, so it always samples the rows behind the
+CURRENT model.
+"""
+import os
+import time
+
+import numpy as np
+
+from .features import engineer_features, feature_columns
+from .train import native_params
+
+reservoir_filename = 'reservoir.npz'
+
+
+class ReservoirSample:
+    """
+    Uniform sample of at most ``capacity`` rows from every row ever added
+    (Algorithm R, vectorized per batch)
+    """
+
+    def __init__(self, capacity=20000, seed=42):
+        self.capacity = capacity
+        self.n_seen = 0
+        self.X = np.empty((0, len(feature_columns)), dtype=np.float32)
+        self.y = np.empty(0, dtype=np.int32)
+        self.seed = seed
+
+    def __len__(self):
+        return len(self.y)
+
+    def update(self, X, y):
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=np.int32)
+        # Fill the free slots first
+        n_free = min(self.capacity - len(self.y), len(y))
+        if n_free > 0:
+            self.X = np.concatenate([self.X, X[:n_free]])
+            self.y = np.concatenate([self.y, y[:n_free]])
+        X, y = X[n_free:], y[n_free:]
+        self.n_seen += n_free
+
+        if len(y):
+            # Row t (0-based over everything seen) replaces slot j ~ U[0, t]
+            # when j < capacity; the latest row wins a contested slot. The
+            # generator is seeded by stream position, so a reloaded sample
+            # continues exactly as an uninterrupted one would
+            rng = np.random.default_rng([self.seed, self.n_seen])
+            seen = self.n_seen + np.arange(len(y))
+            slots = rng.integers(0, seen + 1)
+            rows = np.flatnonzero(slots < self.capacity)[::-1]
+            slots, first = np.unique(slots[rows], return_index=True)
+            self.X[slots] = X[rows[first]]
+            self.y[slots] = y[rows[first]]
+            self.n_seen += len(y)
+        return self
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            np.savez(f, X=self.X, y=self.y, capacity=self.capacity, n_seen=self.n_seen,
+                     seed=self.seed)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            sample = cls(int(arrays['capacity']), int(arrays['seed']))
+            sample.X = arrays['X']
+            sample.y = arrays['y']
+            sample.n_seen = int(arrays['n_seen'])
+        return sample
+
+
+def seed_reservoir(path, X_train, y_train, capacity=20000, seed=42):
+    """
+    Start the reservoir at ``path`` over the base version's training rows
+    """
+    return ReservoirSample(capacity, seed).update(X_train, y_train).save(path)
+
+
+def holdout_metrics(model, X, y):
+    """
+    Accuracy and multi-class log-loss of a model on a holdout set
+    """
+    proba = np.asarray(model.predict_proba(np.asarray(X, dtype=np.float32)))
+    y = np.asarray(y)
+    picked = np.clip(proba[np.arange(len(y)), y], 1e-15, 1.0)
+    return {
+        'accuracy': float((proba.argmax(axis=1) == y).mean()),
+        'mlogloss': float(-np.log(picked).mean()),
+        'n_rows': int(len(y))
+    }
+
+
+def continue_training(model, X, y, n_rounds=50, **overrides):
+    """
+    Boost n_rounds more trees on (X, y) starting from model's booster
+    Boosting resumes after best_iteration, so trees early stopping rejected
+    are dropped first
+    """
+    import xgboost as xgb
+
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    best_iteration = booster.attr('best_iteration')
+    if best_iteration is not None:
+        booster = booster[:int(best_iteration) + 1]
+    else:
+        booster = booster.copy()
+
+    params, _, _ = native_params(**overrides)
+    params.pop('early_stopping_rounds', None)
+    dtrain = xgb.QuantileDMatrix(np.asarray(X, dtype=np.float32), np.asarray(y),
+                                 feature_names=feature_columns,
+                                 max_bin=params.get('max_bin', 256))
+    booster = xgb.train(params, dtrain, num_boost_round=n_rounds, xgb_model=booster,
+                        verbose_eval=False)
+    # Every tree counts now; a stale best_iteration would hide the new ones
+    booster.set_attr(best_iteration=None, best_score=None)
+    return booster
+
+
+def incremental_update(registry, new_projects, X_holdout=None, y_holdout=None, n_rounds=50,
+                       reservoir_path=None, max_accuracy_drop=0.005, holdout_size=0.2,
+                       seed=42, **overrides):
+    """
+    Continue the registry's current model on a batch of new raw projects
+    Without an explicit holdout, a stratified holdout_size share of the batch
+    is held out. Returns a report; the candidate is activated only when
+    promoted.
+    """
+    from sklearn.model_selection import train_test_split
+
+    from .registry import RegisteredModel
+
+    start = time.perf_counter()
+    current = registry.load()
+    batch = engineer_features(new_projects)
+    X = batch[feature_columns].to_numpy(dtype=np.float32)
+    y = batch['risk_classification'].to_numpy()
+    if X_holdout is None:
+        X, X_holdout, y, y_holdout = train_test_split(
+            X, y, test_size=holdout_size, random_state=seed, stratify=y
+        )
+
+    reservoir = None
+    X_fit, y_fit = X, y
+    if reservoir_path is not None and os.path.exists(reservoir_path):
+        reservoir = ReservoirSample.load(reservoir_path)
+        X_fit = np.concatenate([X, reservoir.X])
+        y_fit = np.concatenate([y, reservoir.y])
+
+    booster = continue_training(current, X_fit, y_fit, n_rounds, **overrides)
+    candidate = RegisteredModel(booster, None, current.schema, {})
+    before = holdout_metrics(current, X_holdout, y_holdout)
+    after = holdout_metrics(candidate, X_holdout, y_holdout)
+    promoted = after['accuracy'] >= before['accuracy'] - max_accuracy_drop
+
+    metrics = {
+        'training_accuracy': after['accuracy'],
+        'holdout': after,
+        'parent_version': current.version,
+        'parent_holdout': before,
+        'incremental': {
+            'n_rounds': n_rounds,
+            'n_new_rows': int(len(y)),
+            'n_reservoir_rows': len(reservoir) if reservoir is not None else 0,
+            'promoted': promoted,
+            'max_accuracy_drop': max_accuracy_drop
+        }
+    }
+    version = registry.publish(booster, metrics, activate=promoted)
+    if promoted and reservoir_path is not None:
+        # Only rows the served model has trained on join the history
+        (reservoir or ReservoirSample(seed=seed)).update(X, y).save(reservoir_path)
+
+    return {
+        'version': version,
+        'parent_version': current.version,
+        'promoted': promoted,
+        'before': before,
+        'after': after,
+        'wall_time_s': time.perf_counter() - start
+    }
@@ -0,0 +1,247 @@
+"""
+Per-stage timing and memory instrumentation for the training pipeline
+
+    enable_instrumentation('pipeline-metrics.jsonl', trace_memory=True,
+                           profile=['fit'])
+    with stage('feature_engineering'):
+        ...
+    finish_run('training')
+
+Each stage records wall and CPU time, RSS and its growth, the process peak
+RSS and, with trace_memory, the tracemalloc peak inside the stage. Named
+stages can be captured with cProfile. finish_run() appends one JSON line per
+run using the field names of performance-metrics.json (responseTime in ms,
+memoryUsage in bytes, cpuUsage user/system in microseconds). While disabled,
+stage() returns a shared no-op context and instrumented functions call
+straight through.
+"""
+import cProfile
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import nullcontext
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak RSS is not reported
+    resource = None
+
+default_metrics_path = 'pipeline-metrics.jsonl'
+
+_recorder = None
+_disabled = nullcontext()
+_page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+_statm_fd = None
+_statm_pid = None
+
+
+def _rss_bytes():
+    # A kept-open descriptor read with pread costs ~1 us; open() each time ~20 us
+    try:
+        if _statm_fd is None or _statm_pid != os.getpid():
+            _open_statm()
+        return int(os.pread(_statm_fd, 128, 0).split()[1]) * _page_size
+    except OSError:
+        return None
+
+
+def _open_statm():
+    global _statm_fd, _statm_pid
+    _statm_fd = os.open('/proc/self/statm', os.O_RDONLY)
+    _statm_pid = os.getpid()
+
+
+def _peak_rss_bytes():
+    # ru_maxrss is in KiB on Linux (bytes on macOS) and cheaper than /proc/self/status
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _cpu_usage():
+    if resource is None:
+        times = os.times()
+        return times.user, times.system
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime, usage.ru_stime
+
+
+class _Stage:
+    __slots__ = ('recorder', 'name', 'profile', 'depth', 'index', 'record', 'traced_peak',
+                 '_wall', '_cpu', '_rss', '_traced', '_profiler')
+
+    def __init__(self, recorder, name, profile):
+        self.recorder = recorder
+        self.name = name
+        self.profile = profile
+        self.traced_peak = 0
+
+    def __enter__(self):
+        recorder = self.recorder
+        self.depth = len(recorder.stack)
+        recorder.stack.append(self)
+        # Reserve the slot so stages stay in start order, parents before children
+        self.index = len(recorder.stages)
+        recorder.stages.append(None)
+        if recorder.trace_memory:
+            self._traced = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._rss = _rss_bytes()
+        self._profiler = None
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._cpu = _cpu_usage()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self._wall
+        user, system = _cpu_usage()
+        if self._profiler is not None:
+            self._profiler.disable()
+        recorder = self.recorder
+        rss = _rss_bytes()
+        memory = {
+            'rss': rss,
+            'rssDelta': rss - self._rss if rss is not None and self._rss is not None else None,
+            'peakRss': _peak_rss_bytes()
+        }
+        if recorder.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # A nested stage resets the tracemalloc peak, so fold its peak back in
+            peak = max(peak, self.traced_peak)
+            memory['tracedDelta'] = current - self._traced
+            memory['tracedPeak'] = peak - self._traced
+            tracemalloc.reset_peak()
+
+        self.record = {
+            'name': self.name,
+            'depth': self.depth,
+            'responseTime': round(wall * 1e3, 3),
+            'cpuTime': round((user - self._cpu[0] + system - self._cpu[1]) * 1e3, 3),
+            'memoryUsage': memory,
+            'cpuUsage': {'user': round((user - self._cpu[0]) * 1e6),
+                         'system': round((system - self._cpu[1]) * 1e6)}
+        }
+        if self._profiler is not None:
+            path = os.path.join(recorder.profile_dir, f'{self.name}.prof')
+            self._profiler.dump_stats(path)
+            self.record['profile'] = path
+
+        recorder.stack.pop()
+        if recorder.stack and recorder.trace_memory:
+            parent = recorder.stack[-1]
+            parent.traced_peak = max(parent.traced_peak, peak)
+        recorder.stages[self.index] = self.record
+        return False
+
+
+class RunRecorder:
+    """
+    Stage records of one instrumented run
+    """
+
+    def __init__(self, path=default_metrics_path, trace_memory=False, profile=(),
+                 profile_dir='.'):
+        self.path = path
+        self.trace_memory = trace_memory
+        self.profile = set([profile] if isinstance(profile, str) else profile or ())
+        self.profile_dir = profile_dir
+        self.stages = []
+        self.stack = []
+        self.started = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc)
+        self._cpu = _cpu_usage()
+        self.started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+
+    def stage(self, name):
+        return _Stage(self, name, name in self.profile)
+
+    def summary(self, run='training', **extra):
+        user, system = _cpu_usage()
+        record = {
+            'timestamp': self.started_at.isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+            'run': run,
+            'responseTime': round((time.perf_counter() - self.started) * 1e3, 3),
+            'memoryUsage': {'rss': _rss_bytes(), 'peakRss': _peak_rss_bytes()},
+            'cpuUsage': {'user': round((user - self._cpu[0]) * 1e6),
+                         'system': round((system - self._cpu[1]) * 1e6)},
+            'pid': os.getpid(),
+            'stages': [s for s in self.stages if s is not None]
+        }
+        record.update(extra)
+        return record
+
+    def write(self, run='training', **extra):
+        record = self.summary(run, **extra)
+        if self.path:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record, default=str) + '\n')
+        return record
+
+
+def enable_instrumentation(path=default_metrics_path, trace_memory=False, profile=(),
+                           profile_dir='.'):
+    """
+    Start recording stages for a new run
+    ``profile`` names the stages to capture with cProfile into profile_dir
+    """
+    global _recorder
+    _recorder = RunRecorder(path, trace_memory, profile, profile_dir)
+    return _recorder
+
+
+def disable_instrumentation():
+    global _recorder
+    if _recorder is not None and _recorder.started_tracing:
+        tracemalloc.stop()
+    _recorder = None
+
+
+def get_recorder():
+    return _recorder
+
+
+def stage(name):
+    """
+    Context manager timing one pipeline stage; a no-op while disabled
+    """
+    if _recorder is None:
+        return _disabled
+    return _recorder.stage(name)
+
+
+def instrumented(name=None):
+    """
+    Decorator running the function as a stage (named after it by default)
+    """
+    def decorate(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _recorder is None:
+                return func(*args, **kwargs)
+            with _recorder.stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def finish_run(run='training', **extra):
+    """
+    Append the run's JSON line and stop recording; returns the record
+    """
+    if _recorder is None:
+        return None
+    record = _recorder.write(run, **extra)
+    disable_instrumentation()
+    return record
@@ -0,0 +1,365 @@
+"""
+Training notebook built from run_training() and executed with cached outputs
+
+    report = build_notebook('XGBoost_Model_Training_Notebook_Working.ipynb')
+
+Cells are derived from the source of train.run_training, so the notebook
+and the training pipeline cannot drift apart:
+
+* each ``# N. Title`` comment in the function body starts a section and
+  becomes a markdown heading
+* each blank-line separated paragraph of top-level statements becomes a
+  code cell, and the final ``return`` becomes ``results = ...``
+* a setup cell imports the train module's namespace and binds the
+  function's parameters to their defaults
+
+Cells run headlessly in a local kernel, a child interpreter that executes
+one cell per request and replies with nbformat outputs. Each code cell's
+outputs are cached under a chained hash: its source plus the hash of the
+code cell before it, so a cell is only reused when nothing above it changed.
+Next to the outputs the cache keeps a snapshot of the kernel namespace
+after the cell, each value pickled once and shared by content hash. A rebuild restores the snapshot of the last
+unchanged cell into a fresh kernel and executes from the first changed cell
+onwards; a build with no changes starts no kernel at all.
+"""
+import ast
+import hashlib
+import json
+import os
+import pickle
+import subprocess
+import sys
+import textwrap
+import time
+
+default_notebook_path = 'XGBoost_Model_Training_Notebook_Working.ipynb'
+default_cache_dir = '.notebook_cache'
+script_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'xgboost_model_training.py')
+
+_section_marker = '# '
+
+
+def _section_title(line):
+    # '# 3. Model Evaluation' -> '3. Model Evaluation', else None
+    text = line[len(_section_marker):] if line.startswith(_section_marker) else ''
+    number, _, title = text.partition('. ')
+    return text if number.isdigit() and title else None
+
+
+def _paragraphs(lines):
+    # Split dedented lines on blank lines that precede a top-level line
+    chunk = []
+    for i, line in enumerate(lines):
+        following = next((l for l in lines[i + 1:] if l.strip()), '')
+        if not line.strip() and not following[:1].isspace():
+            if chunk:
+                yield chunk
+            chunk = []
+        elif line.strip() or chunk:
+            chunk.append(line)
+    if chunk:
+        yield chunk
+
+
+def derive_cells(module_path=None, function='run_training', intro_path=script_path):
+    """
+    Notebook cells as (cell_type, source) pairs from a function's body
+    The intro markdown is the training script's docstring up to its last
+    paragraph (the note on how to run it)
+    """
+    module_path = module_path or os.path.join(os.path.dirname(__file__), 'train.py')
+    with open(module_path) as f:
+        source = f.read()
+    node = next(n for n in ast.parse(source).body
+                if isinstance(n, ast.FunctionDef) and n.name == function)
+
+    cells = []
+    if intro_path:
+        with open(intro_path) as f:
+            paragraphs = ast.get_docstring(ast.parse(f.read())).split('\n\n')
+        title, *rest = '\n\n'.join(paragraphs[:-1] or paragraphs).splitlines()
+        cells.append(('markdown', '\n'.join([f'# {title}'] + [f'{line}  ' for line in rest])))
+
+    # Parameters bound to their defaults, in the train module's namespace
+    args = node.args
+    defaults = [None] * (len(args.args) - len(args.defaults)) + list(args.defaults)
+    setup = ['import warnings', "warnings.filterwarnings('ignore')", '',
+             'from finergycloud_xgboost.train import *', '']
+    for arg, default in zip(args.args, defaults):
+        value = 'None' if default is None else ast.get_source_segment(source, default)
+        setup.append(f'{arg.arg} = {value}')
+    cells.append(('code', '\n'.join(setup)))
+
+    lines = source.splitlines()
+    body = node.body[1:] if ast.get_docstring(node) else node.body
+    first = body[0].lineno - 1
+    while first > 0 and lines[first - 1].strip().startswith('#'):
+        first -= 1  # keep the comments above the first statement
+    body_lines = textwrap.dedent('\n'.join(lines[first:node.end_lineno])).splitlines()
+
+    for chunk in _paragraphs(body_lines):
+        title = _section_title(chunk[0])
+        if title:
+            cells.append(('markdown', f'## {title}'))
+            chunk = chunk[1:]
+        if chunk and chunk[0].startswith('return '):
+            chunk[0] = 'results = ' + chunk[0][len('return '):]
+        if chunk:
+            cells.append(('code', '\n'.join(chunk)))
+    return cells
+
+
+def cell_hashes(cells, salt=''):
+    """
+    Chained hash per code cell (None for markdown): sha256 of the previous
+    code cell's hash and this cell's source
+    """
+    previous = hashlib.sha256(salt.encode()).hexdigest()
+    hashes = []
+    for cell_type, source in cells:
+        if cell_type != 'code':
+            hashes.append(None)
+            continue
+        previous = hashlib.sha256(f'{previous}\0{source}'.encode()).hexdigest()
+        hashes.append(previous)
+    return hashes
+
+
+def default_salt():
+    """
+    Interpreter and library versions plus a hash of this package's sources,
+    so an upgrade or an edit to any module the cells call invalidates the cache
+    Versions are read from package metadata rather than by importing the libraries
+    """
+    from importlib.metadata import version
+
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    sources = hashlib.sha256()
+    for name in sorted(os.listdir(package_dir)):
+        if name.endswith('.py'):
+            with open(os.path.join(package_dir, name), 'rb') as f:
+                sources.update(f'{name}\0'.encode() + f.read() + b'\0')
+
+    packages = ('numpy', 'pandas', 'scikit-learn', 'xgboost')
+    return '; '.join([f'python {sys.version}'] + [f'{p} {version(p)}' for p in packages]
+                     + [f'finergycloud_xgboost {sources.hexdigest()}'])
+
+
+class _Kernel:
+    # Child interpreter running run_kernel(); one JSON request per line
+
+    def __init__(self, cwd):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+            [root] + [p for p in [os.environ.get('PYTHONPATH')] if p]))
+        self.process = subprocess.Popen(
+            [sys.executable, '-c', 'from finergycloud_xgboost.notebook import run_kernel; '
+                                   'run_kernel()'],
+            cwd=cwd, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        )
+
+    def request(self, **message):
+        self.process.stdin.write(json.dumps(message) + '\n')
+        self.process.stdin.flush()
+        reply = self.process.stdout.readline()
+        if not reply:
+            raise RuntimeError(f"notebook kernel exited with {self.process.wait()}")
+        return json.loads(reply)
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+
+def _snapshot(namespace, objects_dir):
+    # Picklable user variables, stored once per content hash in objects_dir;
+    # modules are recorded by name and re-imported
+    state = {}
+    for name, value in namespace.items():
+        if name.startswith('_'):
+            continue
+        if type(value).__name__ == 'module':
+            state[name] = ('module', value.__name__)
+            continue
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            continue  # generators, open files and the like do not survive a rebuild
+        digest = hashlib.sha256(data).hexdigest()
+        path = os.path.join(objects_dir, f'{digest}.pkl')
+        if not os.path.exists(path):
+            with open(path + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+        state[name] = ('object', digest)
+    return state
+
+
+def _restore(namespace, state, objects_dir):
+    import importlib
+
+    for name, (kind, value) in state.items():
+        if kind == 'module':
+            namespace[name] = importlib.import_module(value)
+        else:
+            with open(os.path.join(objects_dir, f'{value}.pkl'), 'rb') as f:
+                namespace[name] = pickle.load(f)
+
+
+def _execute(source, namespace):
+    # Run one cell, echoing the last expression like IPython; returns outputs
+    import contextlib
+    import io
+    import traceback
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    outputs, result = [], None
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            tree = ast.parse(source)
+            last = tree.body.pop() if tree.body and isinstance(tree.body[-1], ast.Expr) else None
+            exec(compile(tree, '<cell>', 'exec'), namespace)
+            if last is not None:
+                value = eval(compile(ast.Expression(last.value), '<cell>', 'eval'), namespace)
+                if value is not None:
+                    result = {'text/plain': repr(value)}
+                    if hasattr(value, '_repr_html_'):
+                        result['text/html'] = value._repr_html_()
+        error = None
+    except Exception as exc:
+        error = {'output_type': 'error', 'ename': type(exc).__name__, 'evalue': str(exc),
+                 'traceback': traceback.format_exception(exc)}
+    for name, stream in (('stdout', stdout), ('stderr', stderr)):
+        if stream.getvalue():
+            outputs.append({'output_type': 'stream', 'name': name, 'text': stream.getvalue()})
+    if result is not None:
+        outputs.append({'output_type': 'execute_result', 'data': result, 'metadata': {}})
+    if error is not None:
+        outputs.append(error)
+    return outputs, error is None
+
+
+def run_kernel():
+    """
+    Kernel loop: read {'code', 'restore', 'snapshot', 'objects'} requests
+    from stdin; snapshots name the pickled values they share in 'objects'
+    """
+    channel = sys.stdout
+    namespace = {'__name__': '__main__'}
+    for line in sys.stdin:
+        message = json.loads(line)
+        if message.get('restore'):
+            with open(message['restore'], 'rb') as f:
+                _restore(namespace, pickle.load(f), message['objects'])
+        outputs, ok = _execute(message['code'], namespace)
+        if ok and message.get('snapshot'):
+            state = _snapshot(namespace, message['objects'])
+            with open(message['snapshot'] + '.tmp', 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(message['snapshot'] + '.tmp', message['snapshot'])
+        channel.write(json.dumps({'outputs': outputs, 'ok': ok}) + '\n')
+        channel.flush()
+
+
+def _split_source(source):
+    lines = source.split('\n')
+    return [line + '\n' for line in lines[:-1]] + [lines[-1]]
+
+
+def build_notebook(output_path=default_notebook_path, cells=None, cache_dir=default_cache_dir,
+                   execute=True, salt=None):
+    """
+    Write the notebook, executing code cells whose chained hash is not cached
+    Returns counts of executed and cached cells, the wall time and the first
+    error (None if every cell ran)
+    """
+    start = time.perf_counter()
+    cells = derive_cells() if cells is None else cells
+    hashes = cell_hashes(cells, default_salt() if salt is None else salt)
+    os.makedirs(cache_dir, exist_ok=True)
+    workdir = os.path.join(cache_dir, 'work')
+    objects_dir = os.path.abspath(os.path.join(cache_dir, 'objects'))
+    os.makedirs(workdir, exist_ok=True)
+    os.makedirs(objects_dir, exist_ok=True)
+
+    def cached(cell_hash):
+        path = os.path.join(cache_dir, f'{cell_hash}.json')
+        if not os.path.exists(path) or not os.path.exists(
+                os.path.join(cache_dir, f'{cell_hash}.pkl')):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    # Cells up to the first miss come from the cache; the kernel starts
+    # from the snapshot of the last hit and runs everything after it
+    code = [i for i, (cell_type, _) in enumerate(cells) if cell_type == 'code']
+    entries = {}
+    if execute:
+        for i in code:
+            entry = cached(hashes[i])
+            if entry is None:
+                break
+            entries[i] = entry
+    reused = len(entries)
+    resume = next((i for i in code if i not in entries), None)
+
+    executed, error = 0, None
+    if execute and resume is not None:
+        hits = [i for i in code if i in entries]
+        restore = os.path.abspath(os.path.join(cache_dir, f'{hashes[hits[-1]]}.pkl')) \
+            if hits else None
+        kernel = _Kernel(os.path.abspath(workdir))
+        try:
+            for i in code[code.index(resume):]:
+                snapshot = os.path.abspath(os.path.join(cache_dir, f'{hashes[i]}.pkl'))
+                reply = kernel.request(code=cells[i][1], restore=restore, snapshot=snapshot,
+                                       objects=objects_dir)
+                restore = None
+                executed += 1
+                entries[i] = {'outputs': reply['outputs']}
+                if not reply['ok']:
+                    error = reply['outputs'][-1]
+                    break
+                with open(os.path.join(cache_dir, f'{hashes[i]}.json'), 'w') as f:
+                    json.dump(entries[i], f)
+        finally:
+            kernel.close()
+
+    notebook_cells = []
+    for i, (cell_type, source) in enumerate(cells):
+        cell = {'cell_type': cell_type, 'metadata': {}, 'source': _split_source(source)}
+        if cell_type == 'code':
+            entry = entries.get(i)
+            cell['execution_count'] = code.index(i) + 1 if entry else None
+            cell['outputs'] = [dict(o, execution_count=cell['execution_count'])
+                               if o['output_type'] == 'execute_result' else o
+                               for o in entry['outputs']] if entry else []
+        notebook_cells.append(cell)
+    notebook = {
+        'cells': notebook_cells,
+        'metadata': {
+            'kernelspec': {'display_name': 'Python 3', 'language': 'python', 'name': 'python3'},
+            'language_info': {
+                'codemirror_mode': {'name': 'ipython', 'version': 3},
+                'file_extension': '.py',
+                'mimetype': 'text/x-python',
+                'name': 'python',
+                'nbconvert_exporter': 'python',
+                'pygments_lexer': 'ipython3',
+                'version': '.'.join(map(str, sys.version_info[:3]))
+            }
+        },
+        'nbformat': 4,
+        'nbformat_minor': 4
+    }
+    with open(output_path, 'w') as f:
+        json.dump(notebook, f, indent=1)
+    return {
+        'output_path': output_path,
+        'code_cells': len(code),
+        'executed': executed,
+        'cached': reused,
+        'wall_time_s': time.perf_counter() - start,
+        'error': error
+    }
@@ -0,0 +1,343 @@
+"""
+Production ESG risk prediction used by the FinergyCloud platform API
+
+The trained model is loaded on first use and joblib/xgboost are only imported
+at that point, so importing this module stays cheap. Single projects are
+encoded without pandas; batches go through engineer_features. An optional
+LRU cache (enable_prediction_cache) memoizes single-project predictions and
+an optional drift monitor (enable_drift_monitor) sketches what is scored and
+an optional audit log (enable_prediction_log) records every prediction.
+explain=True adds per-class feature contributions (see explain.py).
+"""
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from .cache import PredictionCache
+from .explain import contribution_table, feature_contributions
+from .features import class_names, encode_project, engineer_features, feature_columns
+
+# Artifacts written by the training pipeline
+default_model_path = 'finergycloud_xgboost_model.joblib'
+default_config_path = 'model_config.json'
+model_path_env = 'FINERGYCLOUD_MODEL_PATH'
+
+_model = None
+_model_path = None
+_model_version = None
+_model_generation = 0
+_model_lock = threading.Lock()
+_prediction_cache = None
+_drift_monitor = None
+_prediction_log = None
+
+
+def read_model_version(config_path):
+    """
+    model_version from a model_config.json, or None if it cannot be read
+    """
+    try:
+        with open(config_path) as f:
+            return json.load(f).get('model_version')
+    except (OSError, ValueError):
+        return None
+
+
+def load_model(path=None, reload=False):
+    """
+    Return the production model, loading it from disk on first use
+    The path defaults to $FINERGYCLOUD_MODEL_PATH, then the training output;
+    a model registry directory loads its current version
+    """
+    global _model, _model_path, _model_version, _model_generation
+    path = path or os.environ.get(model_path_env, default_model_path)
+    with _model_lock:
+        if _model is None or reload or path != _model_path:
+            if os.path.isdir(path):
+                from .registry import ModelRegistry
+
+                _model = ModelRegistry(path).load()
+                _model_version = _model.version
+            else:
+                import joblib
+                _model = joblib.load(path)
+                _model_version = read_model_version(
+                    os.path.join(os.path.dirname(path), default_config_path)
+                )
+            _model_path = path
+            _model_generation += 1
+        return _model
+
+
+def set_model(model, model_version=None, model_path=None):
+    """
+    Serve an in-memory model, e.g. one that was just trained
+    model_path is the file or directory it came from, where
+    enable_drift_monitor looks for its reference
+    """
+    global _model, _model_path, _model_version, _model_generation
+    with _model_lock:
+        _model = model
+        _model_path = model_path
+        _model_version = model_version
+        _model_generation += 1
+
+
+def get_model(model=None):
+    """
+    Resolve the model to score with: an explicit one or the lazily loaded one
+    """
+    if model is not None:
+        return model
+    return _model if _model is not None else load_model()
+
+
+def enable_prediction_cache(maxsize=10000, ttl=None, precision=None):
+    """
+    Memoize predict_esg_risk for the served model
+    Calls that pass an explicit ``model`` bypass the cache
+    """
+    global _prediction_cache
+    _prediction_cache = PredictionCache(maxsize=maxsize, ttl=ttl, precision=precision)
+    return _prediction_cache
+
+
+def disable_prediction_cache():
+    global _prediction_cache
+    _prediction_cache = None
+
+
+def get_prediction_cache():
+    return _prediction_cache
+
+
+def enable_drift_monitor(reference=None):
+    """
+    Sketch every prediction of the served model against a drift reference
+    The reference (a path or a DriftSketch) defaults to the drift_reference.json
+    next to the loaded model, or in the served version's directory of a
+    registry; calls that pass an explicit ``model`` are not seen
+    """
+    from .drift import DriftMonitor, reference_filename
+    from .registry import is_registry
+
+    global _drift_monitor
+    if reference is None:
+        base = _model_path or default_model_path
+        if os.path.isdir(base) and is_registry(base):
+            base = _model.path
+        elif not os.path.isdir(base):
+            base = os.path.dirname(base)
+        reference = os.path.join(base, reference_filename)
+    _drift_monitor = DriftMonitor(reference)
+    return _drift_monitor
+
+
+def disable_drift_monitor():
+    global _drift_monitor
+    _drift_monitor = None
+
+
+def get_drift_monitor():
+    return _drift_monitor
+
+
+def enable_prediction_log(directory, **options):
+    """
+    Append every prediction of the served model to a binary audit log
+    Options go to PredictionLog; calls that pass an explicit ``model`` are
+    not logged
+    """
+    from .prediction_log import PredictionLog
+
+    global _prediction_log
+    disable_prediction_log()
+    _prediction_log = PredictionLog(directory, **options)
+    return _prediction_log
+
+
+def disable_prediction_log():
+    """
+    Stop logging, writing out and closing the current log
+    """
+    global _prediction_log
+    log, _prediction_log = _prediction_log, None
+    if log is not None:
+        log.close()
+
+
+def get_prediction_log():
+    return _prediction_log
+
+
+def _served_model():
+    # The served model with the load generation and version it belongs to;
+    # no generation if another load replaced it in between
+    xgb_model = get_model()
+    with _model_lock:
+        if xgb_model is _model:
+            return xgb_model, _model_generation, _model_version
+    return xgb_model, None, None
+
+
+def predict_esg_risk(project_data, model=None, explain=False):
+    """
+    Production-ready ESG risk prediction function
+    Used in FinergyCloud platform API
+    """
+    start = time.perf_counter()
+    cache = _prediction_cache if model is None else None
+    if cache is None:
+        xgb_model = get_model(model)
+    else:
+        xgb_model, generation, model_version = _served_model()
+
+    # Feature engineering for new project, straight into a float32 row
+    features = encode_project(project_data)
+
+    if cache is None or generation is None:
+        scored = _score_row(xgb_model, features, explain)
+    else:
+        cache.bind_model(generation, model_version)
+        # Explained entries carry the contributions too, so they are kept apart
+        key = cache.key(features, tag=f'explain={explain}' if explain else None)
+        scored = cache.get(key)
+        if scored is None:
+            scored = _score_row(xgb_model, features, explain)
+            # Dropped if a newer model was bound while this one was scoring
+            cache.put(key, scored, generation)
+
+    risk_proba = scored[0] if explain else scored
+    if model is None:
+        monitor, log = _drift_monitor, _prediction_log
+        if monitor is not None:
+            monitor.update(features.reshape(1, -1), risk_proba.reshape(1, -1))
+        if log is not None:
+            log.append(features, risk_proba, (time.perf_counter() - start) * 1e3,
+                       _model_version)
+
+    if not explain:
+        return prediction_result(risk_proba)
+    _, contributions, bias = scored
+    result = prediction_result(risk_proba)
+    result['feature_contributions'] = contribution_table(contributions, bias)
+    return result
+
+
+def _score_row(xgb_model, features, explain):
+    risk_proba = xgb_model.predict_proba(features.reshape(1, -1))[0]
+    if not explain:
+        return risk_proba
+    contributions, bias = feature_contributions(xgb_model, features,
+                                                approximate=explain == 'approximate')
+    return risk_proba, contributions[0], bias[0]
+
+
+def prediction_result(risk_proba):
+    """
+    predict_esg_risk response for one row of class probabilities
+    """
+    # multi:softprob labels are the argmax of the probabilities
+    risk_class = int(risk_proba.argmax())
+
+    return {
+        'risk_classification': class_names[risk_class],
+        'confidence_score': float(max(risk_proba)),
+        'risk_probabilities': {
+            'low_risk': float(risk_proba[0]),
+            'medium_risk': float(risk_proba[1]),
+            'high_risk': float(risk_proba[2])
+        }
+    }
+
+
+def predict_esg_risk_batch(projects, chunk_size=50000, model=None, explain=False):
+    """
+    Vectorized ESG risk prediction for whole deal pipelines
+    Accepts a list of project dicts, a DataFrame or a dict of column arrays and
+    returns column-oriented results that match predict_esg_risk row for row.
+    explain=True adds 'feature_contributions' (n_rows, n_classes, n_features)
+    and 'contribution_bias' (n_rows, n_classes); explain='approximate' uses
+    the faster per-path attribution
+    """
+    import pandas as pd
+
+    xgb_model = get_model(model)
+    if not isinstance(projects, pd.DataFrame):
+        projects = pd.DataFrame(projects)
+    n_rows = len(projects)
+    risk_proba = np.empty((n_rows, len(class_names)), dtype=np.float32)
+    monitor, log = (_drift_monitor, _prediction_log) if model is None else (None, None)
+    if explain:
+        contributions = np.empty((n_rows, len(class_names), len(feature_columns)),
+                                 dtype=np.float32)
+        bias = np.empty((n_rows, len(class_names)), dtype=np.float32)
+
+    # One feature pass and one predict_proba call per chunk
+    for start in range(0, n_rows, chunk_size):
+        started = time.perf_counter()
+        chunk = projects.iloc[start:start + chunk_size].copy()
+        features = engineer_features(chunk)[feature_columns]
+        risk_proba[start:start + chunk_size] = xgb_model.predict_proba(features)
+        if monitor is not None or log is not None:
+            X = features.to_numpy(dtype=np.float32)
+            if monitor is not None:
+                monitor.update(X, risk_proba[start:start + chunk_size])
+            if log is not None:
+                # Each row carries the latency of the chunk that scored it
+                log.append_batch(X, risk_proba[start:start + chunk_size],
+                                 (time.perf_counter() - started) * 1e3, _model_version)
+        if explain:
+            rows = slice(start, start + chunk_size)
+            contributions[rows], bias[rows] = feature_contributions(
+                xgb_model, features, approximate=explain == 'approximate'
+            )
+
+    result = _batch_result(risk_proba)
+    if explain:
+        result['feature_contributions'] = contributions
+        result['contribution_bias'] = bias
+    return result
+
+
+def predict_esg_risk_features(X, chunk_size=50000, model=None, explain=False):
+    """
+    predict_esg_risk_batch for an already engineered feature matrix, e.g.
+    rows of a FeatureStore, in feature_columns order
+    """
+    xgb_model = get_model(model)
+    X = np.asarray(X, dtype=np.float32)
+    risk_proba = np.empty((len(X), len(class_names)), dtype=np.float32)
+    monitor, log = (_drift_monitor, _prediction_log) if model is None else (None, None)
+    for start in range(0, len(X), chunk_size):
+        started = time.perf_counter()
+        rows = slice(start, start + chunk_size)
+        risk_proba[rows] = xgb_model.predict_proba(X[rows])
+        if monitor is not None:
+            monitor.update(X[rows], risk_proba[rows])
+        if log is not None:
+            log.append_batch(X[rows], risk_proba[rows], (time.perf_counter() - started) * 1e3,
+                             _model_version)
+    result = _batch_result(risk_proba)
+    if explain:
+        result['feature_contributions'], result['contribution_bias'] = feature_contributions(
+            xgb_model, X, chunk_size=chunk_size, approximate=explain == 'approximate'
+        )
+    return result
+
+
+def _batch_result(risk_proba):
+    # multi:softprob labels are the argmax of the probabilities, so there is
+    # no need to score every row a second time with predict()
+    risk_class = risk_proba.argmax(axis=1)
+    risk_proba = risk_proba.astype(np.float64)
+    return {
+        'risk_classification': np.asarray(class_names, dtype=object)[risk_class],
+        'confidence_score': risk_proba.max(axis=1),
+        'low_risk': risk_proba[:, 0],
+        'medium_risk': risk_proba[:, 1],
+        'high_risk': risk_proba[:, 2]
+    }
@@ -0,0 +1,397 @@
+"""
+Append-only binary audit log of predictions with fast NumPy replay
+
+    log = PredictionLog('prediction_log')       # or predict.enable_prediction_log
+    log.append(features, risk_proba, latency_ms, model_version)
+    log.close()
+
+    reader = PredictionLogReader('prediction_log')
+    reader.summary(); reader.replay(model); reader.evaluate(y_true)
+
+Every prediction is one fixed-width 96-byte record (record_dtype): the
+timestamp, the model version, the feature vector as float32, the three class
+probabilities and the latency. Records are copied into a preallocated batch
+in the caller's thread and a background thread writes full batches, plus
+whatever has been appended within the last flush_interval, so a prediction
+never waits on disk. Segments are append-only files of a 512-byte header and
+raw records, rotated once they hold segment_bytes; a writer never reopens an
+existing segment and skips to the next free sequence number when another
+writer has taken one, so separate processes can share a directory and even a
+prefix. At most max_pending records wait for the disk; beyond that new
+records are dropped and counted, so a stalled disk cannot grow the serving
+process without bound. A write error is reported and the flush thread
+carries on.
+
+The reader memory-maps each segment as a structured array. Replay,
+summaries and accuracy evaluation run over millions of records in NumPy
+without parsing or copying rows. A record torn by a crash mid-write is
+ignored.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .features import class_names, feature_columns
+
+record_dtype = np.dtype([
+    ('timestamp_ns', '<i8'),
+    ('model_version', 'S32'),
+    ('features', '<f4', (len(feature_columns),)),
+    ('probabilities', '<f4', (len(class_names),)),
+    ('latency_ms', '<f4')
+])
+segment_magic = b'FCPLOG01'
+segment_suffix = '.plog'
+header_bytes = 512
+default_prefix = 'predictions'
+default_segment_bytes = 64 * 2 ** 20
+default_batch_size = 4096
+default_max_pending = 1000000
+
+
+def segment_paths(directory, prefix=None):
+    """
+    Segment files in write order, optionally of one writer prefix only
+    """
+    names = sorted(name for name in os.listdir(directory) if name.endswith(segment_suffix)
+                   and (prefix is None or name.rsplit('-', 1)[0] == prefix))
+    return [os.path.join(directory, name) for name in names]
+
+
+def _segment_header():
+    header = json.dumps({
+        'record_size': record_dtype.itemsize,
+        'feature_columns': feature_columns,
+        'class_names': class_names,
+        'created': datetime.now(timezone.utc).isoformat()
+    }).encode()
+    if len(header) > header_bytes - len(segment_magic):
+        raise ValueError('segment header does not fit in header_bytes')
+    return segment_magic + header.ljust(header_bytes - len(segment_magic))
+
+
+def read_segment(path):
+    """
+    Memory-mapped records of one segment, or an empty array
+    """
+    with open(path, 'rb') as f:
+        header = f.read(header_bytes)
+    if not header.startswith(segment_magic):
+        raise ValueError(f'{path} is not a prediction log segment')
+    meta = json.loads(header[len(segment_magic):])
+    if meta['record_size'] != record_dtype.itemsize or meta['feature_columns'] != feature_columns:
+        raise ValueError(f'{path} was written with a different record layout')
+    # Whole records only: a crash can leave a partial one at the end
+    n_records = (os.path.getsize(path) - header_bytes) // record_dtype.itemsize
+    if n_records <= 0:
+        return np.empty(0, dtype=record_dtype)
+    return np.memmap(path, dtype=record_dtype, mode='r', offset=header_bytes,
+                     shape=(n_records,))
+
+
+def _version_bytes(model_version):
+    return b'' if model_version is None else str(model_version).encode()[:32]
+
+
+class PredictionLog:
+    """
+    Batched, append-only prediction log writer with a background flush thread
+    """
+
+    def __init__(self, directory, prefix=default_prefix, segment_bytes=default_segment_bytes,
+                 batch_size=default_batch_size, flush_interval=1.0,
+                 max_pending=default_max_pending):
+        if segment_bytes < header_bytes + record_dtype.itemsize:
+            raise ValueError('segment_bytes must hold at least one record')
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.segment_capacity = (segment_bytes - header_bytes) // record_dtype.itemsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.n_records = 0
+        self.n_written = 0
+        self.n_dropped = 0
+        self._n_pending = 0
+        existing = segment_paths(directory, prefix)
+        self._sequence = int(existing[-1].rsplit('-', 1)[1][:-len(segment_suffix)]) \
+            if existing else 0
+        self._file = None
+        self._segment_records = 0
+        self._buffer = np.empty(batch_size, dtype=record_dtype)
+        self._fill = 0
+        self._pending = deque()
+        self._lock = threading.Lock()        # the batch being filled
+        self._write_lock = threading.Lock()  # the segment file
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='prediction-log-flush',
+                                        daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def segment_path(self):
+        return os.path.join(self.directory,
+                            f'{self.prefix}-{self._sequence:06d}{segment_suffix}')
+
+    def append(self, features, risk_proba, latency_ms, model_version=None, timestamp_ns=None):
+        """
+        Log one prediction; only copies it into the current batch
+        """
+        record = (time.time_ns() if timestamp_ns is None else timestamp_ns,
+                  _version_bytes(model_version), features, risk_proba, latency_ms)
+        with self._lock:
+            self._buffer[self._fill] = record
+            self._fill += 1
+            self.n_records += 1
+            if self._fill == self.batch_size:
+                self._hand_off()
+                self._wake.set()
+
+    def append_batch(self, X, risk_proba, latency_ms, model_version=None, timestamp_ns=None):
+        """
+        Log a batch of predictions; latency_ms is a scalar or one per row
+        """
+        records = np.empty(len(X), dtype=record_dtype)
+        records['timestamp_ns'] = time.time_ns() if timestamp_ns is None else timestamp_ns
+        records['model_version'] = _version_bytes(model_version)
+        records['features'] = X
+        records['probabilities'] = risk_proba
+        records['latency_ms'] = latency_ms
+        with self._lock:
+            # Keep log order: earlier single appends go first
+            self._hand_off()
+            self.n_records += len(records)
+            self._queue(records)
+        self._wake.set()
+
+    def flush(self):
+        """
+        Write everything appended so far and flush it to the OS
+        """
+        with self._lock:
+            self._hand_off()
+        self._drain()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        atexit.unregister(self.close)
+
+    def stats(self):
+        return {
+            'records': self.n_records,
+            'written': self.n_written,
+            'dropped': self.n_dropped,
+            'pending': self.n_records - self.n_written - self.n_dropped,
+            'segment': self.segment_path if self._file is not None else None
+        }
+
+    def _hand_off(self):
+        # Called with _lock held: queue the filled part, start a new batch
+        if self._fill:
+            self._queue(self._buffer[:self._fill])
+            self._buffer = np.empty(self.batch_size, dtype=record_dtype)
+            self._fill = 0
+
+    def _queue(self, records):
+        # Called with _lock held; past max_pending the records are dropped
+        if self._n_pending + len(records) > self.max_pending:
+            self.n_dropped += len(records)
+            return
+        self._pending.append(records)
+        self._n_pending += len(records)
+
+    def _drain(self):
+        with self._write_lock:
+            while self._pending:
+                records = self._pending.popleft()
+                with self._lock:
+                    self._n_pending -= len(records)
+                written = self.n_written
+                try:
+                    self._write(records)
+                except Exception:
+                    # The segment may end in a torn record: never append to it again
+                    self.n_dropped += len(records) - (self.n_written - written)
+                    if self._file is not None:
+                        self._file.close()
+                        self._file = None
+                    raise
+            if self._file is not None:
+                self._file.flush()
+
+    def _write(self, records):
+        while len(records):
+            if self._file is None or self._segment_records == self.segment_capacity:
+                self._rotate()
+            part = records[:self.segment_capacity - self._segment_records]
+            self._file.write(part.tobytes())
+            self._segment_records += len(part)
+            self.n_written += len(part)
+            records = records[len(part):]
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        # 'xb': a segment is only ever written by the writer that created it;
+        # a sequence number another writer has taken is skipped
+        while True:
+            self._sequence += 1
+            try:
+                self._file = open(self.segment_path, 'xb')
+                break
+            except FileExistsError:
+                continue
+        self._file.write(_segment_header())
+        self._segment_records = 0
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            with self._lock:
+                self._hand_off()
+            try:
+                self._drain()
+            except Exception as error:
+                print(f"Prediction log {self.directory}: write failed: {error!r}",
+                      file=sys.stderr, flush=True)
+
+
+class PredictionLogReader:
+    """
+    Memory-mapped view of every segment in a prediction log directory
+    """
+
+    def __init__(self, directory, prefix=None):
+        self.paths = segment_paths(directory, prefix)
+        self.segments = [segment for segment in map(read_segment, self.paths) if len(segment)]
+
+    def __len__(self):
+        return sum(len(segment) for segment in self.segments)
+
+    def chunks(self, chunk_size=1000000):
+        """
+        Yield the records as memory-mapped slices in log order
+        """
+        for segment in self.segments:
+            for start in range(0, len(segment), chunk_size):
+                yield segment[start:start + chunk_size]
+
+    def column(self, name):
+        """
+        One field of every record as a single array
+        """
+        if not self.segments:
+            return np.empty((0,) + record_dtype[name].shape, dtype=record_dtype[name].base)
+        return np.concatenate([segment[name] for segment in self.segments])
+
+    def summary(self):
+        """
+        Record count, time span, model versions, class shares and latency
+        """
+        n_records = len(self)
+        class_counts = np.zeros(len(class_names), dtype=np.int64)
+        versions = {}
+        first = last = None
+        for chunk in self.chunks():
+            class_counts += np.bincount(chunk['probabilities'].argmax(axis=1),
+                                        minlength=len(class_names))
+            # Versions change rarely, so count runs instead of sorting strings
+            version = chunk['model_version']
+            bounds = np.concatenate([[0], np.flatnonzero(version[1:] != version[:-1]) + 1,
+                                     [len(version)]])
+            for begin, end in zip(bounds[:-1], bounds[1:]):
+                name = version[begin].decode() or None
+                versions[name] = versions.get(name, 0) + int(end - begin)
+            timestamps = chunk['timestamp_ns']
+            first = timestamps.min() if first is None else min(first, timestamps.min())
+            last = timestamps.max() if last is None else max(last, timestamps.max())
+        latency = self.column('latency_ms')
+        return {
+            'n_records': n_records,
+            'n_segments': len(self.segments),
+            'first': None if first is None else
+            datetime.fromtimestamp(first / 1e9, timezone.utc).isoformat(),
+            'last': None if last is None else
+            datetime.fromtimestamp(last / 1e9, timezone.utc).isoformat(),
+            'model_versions': versions,
+            'class_share': {name: float(count / max(n_records, 1))
+                            for name, count in zip(class_names, class_counts)},
+            'latency_ms_p50': float(np.percentile(latency, 50)) if n_records else 0.0,
+            'latency_ms_p99': float(np.percentile(latency, 99)) if n_records else 0.0
+        }
+
+    def replay(self, model, chunk_size=100000):
+        """
+        Re-score the logged features with ``model`` and compare with the log
+        """
+        n_records = agreed = 0
+        max_difference = 0.0
+        start = time.perf_counter()
+        for chunk in self.chunks(chunk_size):
+            risk_proba = model.predict_proba(np.ascontiguousarray(chunk['features']))
+            logged = chunk['probabilities']
+            agreed += int((risk_proba.argmax(axis=1) == logged.argmax(axis=1)).sum())
+            max_difference = max(max_difference, float(np.abs(risk_proba - logged).max()))
+            n_records += len(chunk)
+        elapsed = time.perf_counter() - start
+        return {
+            'n_records': n_records,
+            'class_agreement': agreed / n_records if n_records else 0.0,
+            'max_probability_difference': max_difference,
+            'wall_time_s': elapsed,
+            'records_per_s': n_records / elapsed if elapsed else 0.0
+        }
+
+    def evaluate(self, y_true, n_bins=65536):
+        """
+        Accuracy, log-loss and ROC-AUC of the logged probabilities against
+        outcome labels given in log order (StreamingEvaluator.result())
+        """
+        from .evaluate import StreamingEvaluator
+
+        y_true = np.asarray(y_true)
+        if len(y_true) != len(self):
+            raise ValueError(f'{len(y_true)} labels for {len(self)} logged predictions')
+        evaluator = StreamingEvaluator(n_bins=n_bins)
+        start = 0
+        for chunk in self.chunks():
+            evaluator.update(y_true[start:start + len(chunk)], chunk['probabilities'])
+            start += len(chunk)
+        return evaluator.result()
+
+
+def format_log_summary(summary):
+    lines = [f"{summary['n_records']:,} predictions in {summary['n_segments']} segments, "
+             f"{summary['first']} to {summary['last']}",
+             f"Model versions: {json.dumps(summary['model_versions'])}",
+             'Class share: ' + ', '.join(f'{name} {share:.1%}'
+                                         for name, share in summary['class_share'].items()),
+             f"Latency: p50 {summary['latency_ms_p50']:.3f} ms, "
+             f"p99 {summary['latency_ms_p99']:.3f} ms"]
+    return '\n'.join(lines)
@@ -0,0 +1,242 @@
+"""
+Versioned model registry with native booster artifacts and hot swap
+
+A registry is a directory of immutable versions plus a CURRENT pointer:
+
+    registry/
+        CURRENT            -> "v0003", replaced atomically
+        v0003/
+            model.ubj      native booster (UBJSON), no pickle
+            schema.json    feature/class columns and lookup tables
+            metrics.json   evaluation metrics and hyperparameters
+            drift_reference.json  training-split histograms, when published with one
+            manifest.json  version, creation time, file checksums
+
+Versions are staged in a temporary directory and renamed into place, so a
+reader never sees a half-written version. Loading needs only xgboost and
+json, not the sklearn wrapper, and refuses a version whose lookup tables do
+not match the feature code. RegistryWatcher polls CURRENT and swaps the
+served model in place; in-flight requests finish on the model they started
+with.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .features import (
+    class_names, country_risk_scores, feature_columns, raw_columns, tech_maturity
+)
+
+current_filename = 'CURRENT'
+booster_filename = 'model.ubj'
+schema_filename = 'schema.json'
+metrics_filename = 'metrics.json'
+manifest_filename = 'manifest.json'
+
+
+def feature_schema():
+    """
+    What a booster expects from the feature code that feeds it
+    """
+    return {
+        'raw_columns': raw_columns,
+        'feature_columns': feature_columns,
+        'class_names': class_names,
+        'country_risk_scores': country_risk_scores,
+        'tech_maturity': tech_maturity
+    }
+
+
+def is_registry(path):
+    return os.path.isfile(os.path.join(path, current_filename))
+
+
+class RegisteredModel:
+    """
+    Native booster of one registry version with the predict_proba interface
+    of XGBClassifier, so predict_esg_risk and the batch path accept it
+    """
+
+    def __init__(self, booster, version, schema, metrics, path=None):
+        self.booster = booster
+        self.version = version
+        self.schema = schema
+        self.metrics = metrics
+        self.path = path
+        best_iteration = booster.attr('best_iteration')
+        self.best_iteration = None if best_iteration is None else int(best_iteration)
+        # Like the sklearn wrapper, score with the trees up to best_iteration
+        self.iteration_range = (0, self.best_iteration + 1 if best_iteration is not None else 0)
+
+    def get_booster(self):
+        return self.booster
+
+    def predict_proba(self, X):
+        if hasattr(X, 'to_numpy'):
+            X = X.to_numpy(dtype=np.float32)
+        return self.booster.inplace_predict(X, iteration_range=self.iteration_range)
+
+    def predict(self, X):
+        return self.predict_proba(X).argmax(axis=1)
+
+
+class ModelRegistry:
+
+    def __init__(self, root):
+        self.root = root
+
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if name.startswith('v') and name[1:].isdigit())
+
+    def current_version(self):
+        try:
+            with open(os.path.join(self.root, current_filename)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def version_path(self, version):
+        return os.path.join(self.root, version)
+
+    def publish(self, model, model_config, activate=True, drift_reference=None):
+        """
+        Store a trained model as a new immutable version; returns its id
+        drift_reference is the path of its drift reference, stored with it
+        """
+        from .drift import reference_filename
+
+        os.makedirs(self.root, exist_ok=True)
+        booster = model.get_booster() if hasattr(model, 'get_booster') else model
+        metrics = {name: value for name, value in model_config.items()
+                   if name not in ('feature_columns', 'class_names', 'model_version')}
+
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=self.root)
+        # mkdtemp creates 0700; a published version is readable like its files
+        os.chmod(staging, 0o755)
+        try:
+            files = {
+                booster_filename: bytes(booster.save_raw(raw_format='ubj')),
+                schema_filename: json.dumps(feature_schema(), indent=2).encode(),
+            }
+            if drift_reference is not None:
+                with open(drift_reference, 'rb') as f:
+                    files[reference_filename] = f.read()
+            while True:
+                existing = self.versions()
+                version = f'v{int(existing[-1][1:]) + 1 if existing else 1:04d}'
+                files[metrics_filename] = json.dumps(
+                    dict(metrics, model_version=version), indent=2, default=str
+                ).encode()
+                files[manifest_filename] = json.dumps({
+                    'version': version,
+                    'created': datetime.now(timezone.utc).isoformat(),
+                    'xgboost_version': __import__('xgboost').__version__,
+                    'files': {name: hashlib.sha256(content).hexdigest()
+                              for name, content in files.items()}
+                }, indent=2).encode()
+                for name, content in files.items():
+                    path = os.path.join(staging, name)
+                    if os.path.exists(path):
+                        os.chmod(path, 0o644)
+                    with open(path, 'wb') as f:
+                        f.write(content)
+                    os.chmod(path, 0o444)
+                try:
+                    # rename() of a directory fails if another publisher took the id
+                    os.rename(staging, self.version_path(version))
+                    break
+                except OSError:
+                    if not os.path.isdir(self.version_path(version)):
+                        raise
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version):
+        """
+        Point CURRENT at a version; readers see the old or new id, never neither
+        """
+        if not os.path.isfile(os.path.join(self.version_path(version), manifest_filename)):
+            raise ValueError(f'unknown model version: {version}')
+        fd, tmp = tempfile.mkstemp(prefix='.current-', dir=self.root)
+        with os.fdopen(fd, 'w') as f:
+            f.write(version + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.root, current_filename))
+
+    def load(self, version=None):
+        """
+        Load a version (CURRENT by default) as a RegisteredModel
+        """
+        import xgboost as xgb
+
+        version = version or self.current_version()
+        if version is None:
+            raise FileNotFoundError(f'no current model version in {self.root}')
+        path = self.version_path(version)
+        with open(os.path.join(path, schema_filename)) as f:
+            schema = json.load(f)
+        if schema != json.loads(json.dumps(feature_schema())):
+            raise ValueError(f'model {version} was trained with a different feature schema')
+        with open(os.path.join(path, metrics_filename)) as f:
+            metrics = json.load(f)
+
+        booster = xgb.Booster()
+        booster.load_model(os.path.join(path, booster_filename))
+        return RegisteredModel(booster, version, schema, metrics, path)
+
+
+class RegistryWatcher(threading.Thread):
+    """
+    Background thread that serves whatever version CURRENT points at
+    """
+
+    def __init__(self, registry, interval=1.0, on_swap=None):
+        super().__init__(name='model-registry-watcher', daemon=True)
+        self.registry = registry
+        self.interval = interval
+        self.on_swap = on_swap
+        self.version = None
+        self.error = None
+        self._stop_event = threading.Event()
+
+    def check(self):
+        """
+        Swap in the current version if it changed; returns True on a swap
+        """
+        from .predict import set_model
+
+        version = self.registry.current_version()
+        if version is None or version == self.version:
+            return False
+        model = self.registry.load(version)
+        set_model(model, model_version=version, model_path=self.registry.version_path(version))
+        self.version = version
+        if self.on_swap is not None:
+            self.on_swap(model)
+        return True
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.check()
+                self.error = None
+            except Exception as error:  # keep serving the previous version
+                self.error = error
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,309 @@
+"""
+Asyncio HTTP scoring service with adaptive micro-batching
+
+    python -m finergycloud_xgboost serve [--port 8008] [--max-batch-size 64]
+                                         [--max-wait-ms 2] [--max-queue 1024]
+
+Concurrent POST /predict requests are queued and merged into one
+predict_proba call. A batch is flushed when it reaches max_batch_size or
+when its first request has waited max_wait, whichever comes first. Under
+light load (last batch was a single request) nothing waits at all; under
+load the queue fills while the model runs, so batches grow on their own.
+A full queue answers 503 with Retry-After instead of queueing without bound.
+
+GET /health reports the model and queue depth; GET /metrics reports
+request counters and recent per-batch timings; GET /drift reports PSI/KS
+against the training reference when drift monitoring is on. With a
+prediction log every answered request is recorded with its latency from
+arrival to result. Served from a model registry
+directory, the server follows its CURRENT pointer and swaps versions
+between batches without a restart.
+"""
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from . import predict
+from .features import encode_project, raw_columns
+
+default_host = '127.0.0.1'
+default_port = 8008
+
+reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class Overloaded(Exception):
+    """
+    Raised when the request queue is full
+    """
+
+
+class MicroBatcher:
+    """
+    Queue of encoded projects scored in batches by a single model worker
+    With model=None each batch uses the currently served model (get_model),
+    so a hot swap takes effect at the next batch
+    """
+
+    def __init__(self, model, max_batch_size=64, max_wait=0.002, max_queue=1024, history=1000):
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size must be at least 1')
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.batches = deque(maxlen=history)
+        self.n_requests = 0
+        self.n_rejected = 0
+        self.n_batches = 0
+        self._queue = None
+        self._task = None
+        # One model call at a time; xgboost threads inside it
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scoring')
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=True)
+
+    async def submit(self, features):
+        """
+        Class probabilities for one encoded project
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((features, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.n_rejected += 1
+            raise Overloaded from None
+        self.n_requests += 1
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        last_size = self.batches[-1]['size'] if self.batches else 1
+        deadline = loop.time() + (self.max_wait if last_size > 1 else 0.0)
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            flushed = time.perf_counter()
+            X = np.stack([features for features, _, _ in batch])
+            try:
+                model = predict.get_model(self.model)
+                risk_proba = await loop.run_in_executor(self._executor, model.predict_proba, X)
+            except Exception as error:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            done = time.perf_counter()
+
+            for row, (_, future, _) in zip(risk_proba, batch):
+                if not future.done():  # client may have gone away
+                    future.set_result(row)
+            if self.model is None:
+                self._observe(batch, X, risk_proba, done)
+            self.n_batches += 1
+            self.batches.append({
+                'size': len(batch),
+                'max_queue_wait_ms': (flushed - batch[0][2]) * 1e3,
+                'model_ms': (done - flushed) * 1e3
+            })
+
+    def _observe(self, batch, X, risk_proba, done):
+        # Drift and audit logging must never stop the batch loop
+        monitor, log = predict.get_drift_monitor(), predict.get_prediction_log()
+        try:
+            if monitor is not None:
+                monitor.update(X, risk_proba)
+            if log is not None:
+                arrived = np.array([enqueued for _, _, enqueued in batch])
+                log.append_batch(X, risk_proba, (done - arrived) * 1e3, predict._model_version)
+        except Exception as error:
+            print(f"Skipped drift/log update for a batch of {len(batch)}: {error!r}",
+                  file=sys.stderr, flush=True)
+
+    def stats(self):
+        recent = list(self.batches)
+        sizes = np.array([b['size'] for b in recent] or [0])
+        model_ms = np.array([b['model_ms'] for b in recent] or [0.0])
+        wait_ms = np.array([b['max_queue_wait_ms'] for b in recent] or [0.0])
+        return {
+            'requests': self.n_requests,
+            'rejected': self.n_rejected,
+            'batches': self.n_batches,
+            'queue_depth': self.queue_depth,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1e3,
+            'recent_batches': len(recent),
+            'mean_batch_size': float(sizes.mean()),
+            'max_batch_size_seen': int(sizes.max()),
+            'model_ms_p50': float(np.percentile(model_ms, 50)),
+            'model_ms_p99': float(np.percentile(model_ms, 99)),
+            'queue_wait_ms_p99': float(np.percentile(wait_ms, 99)),
+            'last_batches': recent[-20:]
+        }
+
+
+class ScoringServer:
+    """
+    Minimal HTTP/1.1 (keep-alive) front end for a MicroBatcher
+    """
+
+    def __init__(self, batcher, host=default_host, port=default_port):
+        self.batcher = batcher
+        self.host = host
+        self.port = port
+        self.started = time.time()
+        self._server = None
+
+    async def start(self):
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _route(self, method, path, body):
+        if path == '/health':
+            return 200, {
+                'status': 'ok',
+                'model_version': predict._model_version,
+                'queue_depth': self.batcher.queue_depth,
+                'max_queue': self.batcher.max_queue,
+                'uptime_s': time.time() - self.started
+            }
+        if path == '/metrics':
+            return 200, self.batcher.stats()
+        if path == '/drift':
+            monitor = predict.get_drift_monitor()
+            if monitor is None:
+                return 404, {'error': 'drift monitoring is not enabled'}
+            return 200, monitor.report()
+        if path != '/predict':
+            return 404, {'error': 'not found'}
+        if method != 'POST':
+            return 405, {'error': 'use POST'}
+
+        try:
+            project = json.loads(body)
+            missing = [name for name in raw_columns if name not in project]
+            if missing:
+                return 400, {'error': f"missing field {', '.join(missing)}"}
+            features = encode_project(project)
+        except (ValueError, TypeError, AttributeError, KeyError) as error:
+            return 400, {'error': f'invalid project: {error}'}
+        try:
+            risk_proba = await self.batcher.submit(features)
+        except Overloaded:
+            return 503, {'error': 'scoring queue is full'}
+        except Exception as error:
+            return 500, {'error': str(error)}
+        return 200, predict.prediction_result(risk_proba)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                status, payload = await self._route(method, target.split('?')[0], body)
+                keep_alive = (version == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close')
+                content = json.dumps(payload).encode()
+                head = [f'HTTP/1.1 {status} {reasons[status]}',
+                        'Content-Type: application/json',
+                        f'Content-Length: {len(content)}',
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                if status == 503:
+                    head.append('Retry-After: 1')
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode() + content)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(model_path=None, host=default_host, port=default_port, max_batch_size=64,
+                max_wait=0.002, max_queue=1024, watch_interval=1.0, drift_reference=None,
+                prediction_log=None):
+    from .registry import ModelRegistry, RegistryWatcher, is_registry
+
+    predict.load_model(model_path)
+    if drift_reference is not None:
+        # '' monitors against the reference saved next to the model
+        predict.enable_drift_monitor(drift_reference or None)
+    if prediction_log is not None:
+        predict.enable_prediction_log(prediction_log)
+    watcher = None
+    if model_path and is_registry(model_path):
+        watcher = RegistryWatcher(ModelRegistry(model_path), interval=watch_interval)
+        watcher.version = predict._model_version
+        watcher.start()
+
+    batcher = MicroBatcher(None, max_batch_size, max_wait, max_queue)
+    server = await ScoringServer(batcher, host, port).start()
+    print(f"Scoring on http://{server.host}:{server.port} "
+          f"(max batch {max_batch_size}, max wait {max_wait * 1e3:g} ms, queue {max_queue})",
+          flush=True)
+    try:
+        await server.serve_forever()
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        await batcher.stop()
+        predict.disable_prediction_log()
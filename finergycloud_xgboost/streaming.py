@@ -0,0 +1,153 @@
+"""
+Out-of-core training from chunked CSV, Parquet or .npy project files
+
+Projects are read a chunk at a time, run through engineer_features and handed
+to xgboost through a DataIter, so only the current chunk and xgboost's
+quantized matrix (about one byte per feature per row, or pages on disk with
+external_memory=True) are held in memory.
+"""
+import os
+import tempfile
+
+import numpy as np
+import xgboost as xgb
+
+from .data import read_npy_shard
+from .evaluate import evaluate_model_streaming
+from .features import engineer_features, feature_columns, raw_columns
+from .train import native_params
+
+default_chunk_size = 100000
+
+
+def iter_project_chunks(path, chunk_size=default_chunk_size, columns=raw_columns):
+    """
+    Yield raw project DataFrames of at most chunk_size rows
+    Parquet (.parquet/.pq) needs pyarrow; .npy shards are memory-mapped;
+    a directory (e.g. from generate_project_shards) is read shard by shard;
+    anything else is read as CSV
+    """
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith(('.parquet', '.pq', '.npy', '.csv')):
+                yield from iter_project_chunks(os.path.join(path, name), chunk_size, columns)
+    elif path.endswith('.npy'):
+        yield from read_npy_shard(path, chunk_size, columns)
+    elif path.endswith(('.parquet', '.pq')):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+
+        with pd.read_csv(path, chunksize=chunk_size, usecols=columns) as reader:
+            yield from reader
+
+
+class ProjectChunkIter(xgb.DataIter):
+    """
+    Feeds engineered feature chunks to xgboost one at a time
+    """
+
+    def __init__(self, path, chunk_size=default_chunk_size, cache_prefix=None):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.n_rows = 0
+        self._chunks = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def reset(self):
+        if self._chunks is not None:
+            self._chunks.close()
+        self._chunks = None
+
+    def next(self, input_data):
+        if self._chunks is None:
+            self._chunks = iter_project_chunks(self.path, self.chunk_size)
+            self.n_rows = 0
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+
+        # Each chunk is a fresh frame, so features are derived in place
+        chunk = engineer_features(chunk)
+        input_data(
+            data=chunk[feature_columns].to_numpy(dtype=np.float32),
+            label=chunk['risk_classification'].to_numpy(),
+            feature_names=feature_columns
+        )
+        self.n_rows += len(chunk)
+        return True
+
+
+def build_streaming_dmatrix(path, chunk_size=default_chunk_size, max_bin=256,
+                            external_memory=False, cache_dir=None, ref=None):
+    """
+    Quantized DMatrix built chunk by chunk from a project file
+    external_memory=True pages the quantized matrix to cache_dir instead; without
+    a cache_dir the pages go to a temporary directory removed with the matrix
+    """
+    if external_memory:
+        temporary = None
+        if cache_dir is None:
+            temporary = tempfile.TemporaryDirectory(prefix='finergycloud-xgb-')
+            cache_dir = temporary.name
+        # Separate page files for the training and the evaluation matrix
+        prefix = os.path.join(cache_dir, 'cache' if ref is None else 'cache-eval')
+        it = ProjectChunkIter(path, chunk_size, cache_prefix=prefix)
+        if hasattr(xgb, 'ExtMemQuantileDMatrix'):
+            dmatrix = xgb.ExtMemQuantileDMatrix(it, max_bin=max_bin, ref=ref)
+        else:
+            dmatrix = xgb.DMatrix(it)
+        # The directory is deleted once the matrix is garbage collected
+        dmatrix._cache_dir = temporary
+        return dmatrix
+    it = ProjectChunkIter(path, chunk_size)
+    return xgb.QuantileDMatrix(it, max_bin=max_bin, ref=ref)
+
+
+def train_streaming(path, eval_path=None, chunk_size=default_chunk_size,
+                    external_memory=False, cache_dir=None, **overrides):
+    """
+    Train the ESG risk booster without loading the dataset into memory
+    Early stopping uses eval_path when given, like the in-memory pipeline
+    """
+    params, num_boost_round, early_stopping_rounds = native_params(**overrides)
+    max_bin = params.pop('max_bin', 256)
+    params.pop('early_stopping_rounds', None)
+
+    dtrain = build_streaming_dmatrix(path, chunk_size, max_bin, external_memory, cache_dir)
+    evals = [(dtrain, 'train')]
+    if eval_path is not None:
+        deval = build_streaming_dmatrix(eval_path, chunk_size, max_bin, external_memory,
+                                        cache_dir, ref=dtrain)
+        evals.append((deval, 'eval'))
+    else:
+        early_stopping_rounds = None
+
+    try:
+        return xgb.train(
+            params, dtrain, num_boost_round=num_boost_round, evals=evals,
+            early_stopping_rounds=early_stopping_rounds, verbose_eval=False
+        )
+    finally:
+        # Remove temporary external-memory pages now rather than at collection
+        for dmatrix, _ in evals:
+            if getattr(dmatrix, '_cache_dir', None) is not None:
+                dmatrix._cache_dir.cleanup()
+
+
+def evaluate_streaming(model, path, chunk_size=default_chunk_size, n_bins=65536):
+    """
+    One-pass evaluation over a project file or shard directory
+    Returns a StreamingEvaluator; memory does not grow with the row count
+    """
+    def chunks():
+        for chunk in iter_project_chunks(path, chunk_size):
+            chunk = engineer_features(chunk)
+            yield (chunk[feature_columns].to_numpy(dtype=np.float32),
+                   chunk['risk_classification'].to_numpy())
+
+    return evaluate_model_streaming(model, chunks(), n_bins)
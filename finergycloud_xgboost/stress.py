@@ -0,0 +1,446 @@
+"""
+Vectorized Monte Carlo stress scoring of a project portfolio
+
+    shocks = [
+        {'feature': 'country_risk_score', 'country': 'Nigeria',
+         'distribution': 'normal', 'mean': -0.05, 'std': 0.03},
+        {'feature': 'projected_irr', 'op': 'multiply', 'project_type': ['Solar', 'Wind'],
+         'distribution': 'uniform', 'low': 0.8, 'high': 1.0},
+        {'feature': 'governance_score', 'value': -0.5}
+    ]
+    report = stress_test_portfolio(projects, shocks, n_scenarios=100000)
+
+Each shock draws one value per scenario and adds it to (or multiplies) one
+feature of every project in its country / project_type scope. The
+scenarios x projects feature tensor is built by broadcasting the encoded
+portfolio, the derived columns (irr_risk, esg_composite, ...) are
+recomputed on it and it is scored with one inplace_predict call per chunk.
+Chunks are sized so the tensors in flight stay within memory_budget_mb;
+the next chunk is built while xgboost scores the current one on all cores.
+Shock values are drawn up front from ``seed``, so results do not depend on
+the budget or the machine.
+
+A tree ensemble only sees which side of each split threshold a value falls
+on, so with dedupe=True (the default) every stressed row is reduced to its
+threshold-bin codes and only distinct (project, codes) rows are scored, with
+the probabilities of rows already seen kept across chunks. The output is
+identical to scoring the full tensor.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .data import clip_ranges
+from .features import (capacity_risk_table, category_codes, class_names, country_codes,
+                       engineer_features, feature_columns, irr_risk_table, is_compact,
+                       tech_codes)
+from .trees import split_thresholds
+
+# Features a shock may move, with the range stressed values are clipped to
+stress_bounds = dict(clip_ranges, country_risk_score=(0.0, 1.0), tech_maturity_score=(0.0, 1.0))
+
+# Derived model inputs that move with a shocked feature
+derived_columns = {
+    'capacity_mw': 'capacity_risk',
+    'projected_irr': 'irr_risk',
+    'environmental_score': 'esg_composite',
+    'social_score': 'esg_composite',
+    'governance_score': 'esg_composite'
+}
+
+distributions = {
+    'constant': ('value',),
+    'normal': ('mean', 'std'),
+    'uniform': ('low', 'high')
+}
+
+# Working set per (scenario, project) cell of a chunk in flight: stressed
+# columns, bin keys and np.unique scratch, rows to score, probabilities and
+# labels; ~140 bytes measured at 3,000 projects, plus headroom
+bytes_per_cell = 160
+
+tail_levels = (0.95, 0.99)
+
+
+def validate_shocks(shocks):
+    """
+    Normalized copies of the shock specifications; ValueError on bad input
+    """
+    normalized = []
+    for i, shock in enumerate(shocks):
+        shock = dict(shock)
+        feature = shock.get('feature')
+        if feature not in stress_bounds:
+            raise ValueError(f"shock {i}: feature must be one of {sorted(stress_bounds)}, "
+                             f"got {feature!r}")
+        if shock.setdefault('op', 'add') not in ('add', 'multiply'):
+            raise ValueError(f"shock {i}: op must be 'add' or 'multiply'")
+        distribution = shock.setdefault('distribution', 'constant')
+        if distribution not in distributions:
+            raise ValueError(f"shock {i}: distribution must be one of {list(distributions)}")
+        missing = [name for name in distributions[distribution] if name not in shock]
+        if missing:
+            raise ValueError(f"shock {i}: {distribution} needs {', '.join(missing)}")
+        for key, known in (('country', country_codes), ('project_type', tech_codes)):
+            scope = shock.get(key)
+            if isinstance(scope, str):
+                shock[key] = scope = [scope]
+            unknown = set(scope or ()) - set(known)
+            if unknown:
+                raise ValueError(f"shock {i}: unknown {key} {sorted(unknown)}")
+        normalized.append(shock)
+    return normalized
+
+
+def draw_shock_values(shocks, n_scenarios, seed=42):
+    """
+    (n_scenarios, n_shocks) float32 matrix of drawn shock values
+    Each shock draws from its own stream, so scenario i is the same for any
+    n_scenarios > i
+    """
+    values = np.empty((n_scenarios, len(shocks)), dtype=np.float32)
+    for j, shock in enumerate(shocks):
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(j,)))
+        if shock['distribution'] == 'normal':
+            values[:, j] = rng.normal(shock['mean'], shock['std'], n_scenarios)
+        elif shock['distribution'] == 'uniform':
+            values[:, j] = rng.uniform(shock['low'], shock['high'], n_scenarios)
+        else:
+            values[:, j] = shock['value']
+    return values
+
+
+def scenario_chunk_size(n_projects, memory_budget_mb, in_flight=2):
+    """
+    Scenarios per chunk so ``in_flight`` chunk tensors fit the memory budget
+    """
+    cells = memory_budget_mb * 2 ** 20 // (bytes_per_cell * in_flight)
+    return max(1, int(cells // max(n_projects, 1)))
+
+
+def tail_statistics(values, levels=tail_levels):
+    """
+    Mean, spread, percentiles and expected shortfall (mean beyond the
+    percentile) of a per-scenario statistic where higher is worse
+    """
+    values = np.asarray(values, dtype=np.float64)
+    ordered = np.sort(values)
+    stats = {
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'min': float(ordered[0]),
+        'p50': float(np.percentile(ordered, 50)),
+        'max': float(ordered[-1])
+    }
+    for level in levels:
+        name = f'{level * 100:g}'
+        cutoff = np.percentile(ordered, level * 100)
+        stats[f'p{name}'] = float(cutoff)
+        stats[f'expected_shortfall_{name}'] = float(ordered[ordered >= cutoff].mean())
+    return stats
+
+
+class _Portfolio:
+    # Encoded projects plus the per-shock scope masks and the feature
+    # columns a scenario can move (shocked columns and their derived ones)
+
+    def __init__(self, projects, shocks, weights):
+        import pandas as pd
+
+        if not isinstance(projects, pd.DataFrame):
+            projects = pd.DataFrame(projects)
+        engineered = engineer_features(projects.copy())
+        self.X = engineered[feature_columns].to_numpy(dtype=np.float32)
+        # Raw inputs of the derived columns, in the precision engineer_features
+        # derives them in: float32 for compact frames, float64 otherwise
+        self.dtype = np.float32 if is_compact(projects) else np.float64
+        self.raw = {name: projects[name].to_numpy(dtype=self.dtype) for name in derived_columns}
+        self.n_projects = len(self.X)
+        if weights is None:
+            weights = np.ones(self.n_projects)
+        elif isinstance(weights, str):
+            weights = projects[weights].to_numpy()
+        weights = np.asarray(weights, dtype=np.float64)
+        self.weights = weights / weights.sum()
+
+        # Integer codes, so compact (categorical / int-coded) frames work too
+        codes = {'country': category_codes(projects['country'], country_codes),
+                 'project_type': category_codes(projects['project_type'], tech_codes)}
+        self.masks = []
+        for shock in shocks:
+            mask = np.ones(self.n_projects, dtype=bool)
+            for key, known in (('country', country_codes), ('project_type', tech_codes)):
+                if shock.get(key):
+                    mask &= np.isin(codes[key], [known.index(name) for name in shock[key]])
+            # A full-portfolio shock needs no fancy indexing
+            self.masks.append(slice(None) if mask.all() else np.flatnonzero(mask))
+
+        shocked = {shock['feature'] for shock in shocks}
+        moving = shocked | {derived_columns[name] for name in shocked if name in derived_columns}
+        self.varying = [j for j, name in enumerate(feature_columns) if name in moving]
+        self.position = {feature_columns[j]: k for k, j in enumerate(self.varying)}
+
+    def stressed_columns(self, shocks, values):
+        """
+        (n_scenarios, n_projects, n_varying) values of the varying columns
+        """
+        S = np.empty((len(values), self.n_projects, len(self.varying)), dtype=np.float32)
+        S[:] = self.X[:, self.varying]
+        for j, (shock, rows) in enumerate(zip(shocks, self.masks)):
+            k = self.position[shock['feature']]
+            if shock['op'] == 'multiply':
+                S[:, rows, k] *= values[:, j, None]
+            else:
+                S[:, rows, k] += values[:, j, None]
+        for shock in shocks:
+            k = self.position[shock['feature']]
+            np.clip(S[..., k], *stress_bounds[shock['feature']], out=S[..., k])
+
+        # Derived columns are recomputed only on rows a shock to one of their
+        # inputs reaches, elsewhere they keep the baseline bit for bit. Their
+        # inputs are shocked again from the raw values at the precision of
+        # engineer_features, so a derived column is rounded to float32 once
+        def reached(derived):
+            masks = [mask for shock, mask in zip(shocks, self.masks)
+                     if derived_columns.get(shock['feature']) == derived]
+            if any(isinstance(mask, slice) for mask in masks):
+                return slice(None)
+            return np.unique(np.concatenate(masks))
+
+        def raw(name, rows):
+            value = self.raw[name][rows]
+            index = np.arange(self.n_projects)[rows]
+            hits = [(j, shock, mask) for j, (shock, mask) in enumerate(zip(shocks, self.masks))
+                    if shock['feature'] == name]
+            if not hits:
+                return value
+            value = np.repeat(value[None], len(values), axis=0)
+            for j, shock, mask in hits:
+                hit = slice(None) if isinstance(mask, slice) else np.isin(index, mask)
+                if shock['op'] == 'multiply':
+                    value[:, hit] *= values[:, j, None]
+                else:
+                    value[:, hit] += values[:, j, None]
+            return np.clip(value, *stress_bounds[name], out=value)
+
+        if 'capacity_risk' in self.position:
+            rows = reached('capacity_risk')
+            capacity = raw('capacity_mw', rows)
+            S[:, rows, self.position['capacity_risk']] = capacity_risk_table[
+                (capacity > 50).view(np.int8) + (capacity > 100).view(np.int8)
+            ]
+        if 'irr_risk' in self.position:
+            rows = reached('irr_risk')
+            irr = raw('projected_irr', rows)
+            S[:, rows, self.position['irr_risk']] = irr_risk_table[
+                (irr > 12).view(np.int8) + (irr > 15).view(np.int8)
+            ]
+        if 'esg_composite' in self.position:
+            rows = reached('esg_composite')
+            weight = self.dtype
+            S[:, rows, self.position['esg_composite']] = (
+                raw('environmental_score', rows) * weight(0.4)
+                + raw('social_score', rows) * weight(0.35)
+                + raw('governance_score', rows) * weight(0.25))
+        return S
+
+    def tensor(self, S):
+        """
+        Full (n_scenarios, n_projects, n_features) tensor from stressed columns
+        """
+        X = np.empty(S.shape[:2] + (len(feature_columns),), dtype=np.float32)
+        X[:] = self.X
+        X[..., self.varying] = S
+        return X
+
+
+class _BinKeys:
+    # Row identity as the model sees it: project index and the threshold-bin
+    # code of each varying column, packed into one int64 (mixed radix)
+
+    def __init__(self, boosters, portfolio):
+        # Several boosters (an ensemble's members) share one set of bins
+        found = [split_thresholds(booster, len(feature_columns)) for booster in boosters]
+        self.thresholds = [np.unique(np.concatenate([thresholds[j] for thresholds in found]))
+                           for j in portfolio.varying]
+        self.radix = [len(t) + 2 for t in self.thresholds]  # + NaN code
+        self.fits = portfolio.n_projects * float(np.prod(self.radix, dtype=np.float64)) < 2 ** 62
+
+    def keys(self, S):
+        key = np.broadcast_to(np.arange(S.shape[1], dtype=np.int64), S.shape[:2]).copy()
+        for k, (thresholds, radix) in enumerate(zip(self.thresholds, self.radix)):
+            values = S[..., k]
+            code = np.searchsorted(thresholds, values, side='right')
+            code[np.isnan(values)] = radix - 1
+            key *= radix
+            key += code
+        return key
+
+
+class _ProbaCache:
+    # Sorted keys and probabilities of every distinct row scored so far,
+    # capped at max_entries
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.keys = np.empty(0, dtype=np.int64)
+        self.proba = np.empty((0, len(class_names)), dtype=np.float32)
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, keys):
+        position = np.searchsorted(self.keys, keys)
+        found = np.zeros(len(keys), dtype=bool)
+        if len(self.keys):
+            inside = position < len(self.keys)
+            found[inside] = self.keys[position[inside]] == keys[inside]
+        return found, position
+
+    def add(self, keys, proba, position):
+        # keys are sorted and absent, so inserting at their lookup positions
+        # keeps the arrays sorted in one linear pass
+        room = self.max_entries - len(self.keys)
+        if room <= 0:
+            return
+        keys, proba, position = keys[:room], proba[:room], position[:room]
+        self.keys = np.insert(self.keys, position, keys)
+        self.proba = np.insert(self.proba, position, proba, axis=0)
+
+
+def _with_threads(booster, n_jobs):
+    booster = booster.copy()
+    booster.set_param({'nthread': n_jobs})
+    return booster
+
+
+def stress_test_portfolio(projects, shocks, n_scenarios=10000, model=None, weights=None,
+                          memory_budget_mb=512, seed=42, n_jobs=None, dedupe=True):
+    """
+    Score a portfolio under n_scenarios Monte Carlo draws of ``shocks``
+    ``weights`` (array or column name, e.g. 'capacity_mw') weights projects
+    in the portfolio shares. Returns per-scenario class shares and mean
+    probabilities, their tail statistics, the unshocked baseline and each
+    project's frequency of scoring High Risk.
+    """
+    from .explain import _booster_and_range
+    from .predict import get_model
+
+    start = time.perf_counter()
+    shocks = validate_shocks(shocks)
+    model = get_model(model)
+    portfolio = _Portfolio(projects, shocks, weights)
+    n_projects = portfolio.n_projects
+    values = draw_shock_values(shocks, n_scenarios, seed)
+
+    if hasattr(model, 'members'):
+        # TechnologyEnsemble: each row is scored by its technology's booster
+        from .technology import TechnologyEnsemble, _tech_column
+
+        if n_jobs is not None:
+            model = TechnologyEnsemble(
+                _with_threads(model.global_booster, n_jobs),
+                {name: _with_threads(member, n_jobs) for name, member in model.boosters.items()})
+        boosters = model.members
+        score = model.predict_proba
+        # Rows are routed on the exact tech_maturity_score, which bins cannot see
+        if _tech_column in portfolio.varying:
+            dedupe = False
+    else:
+        booster, iteration_range = _booster_and_range(model)
+        if n_jobs is not None:
+            booster = _with_threads(booster, n_jobs)
+        boosters = [booster]
+
+        def score(X):
+            return booster.inplace_predict(X, iteration_range=iteration_range)
+
+    bins = _BinKeys(boosters, portfolio) if dedupe and shocks else None
+    if bins is not None and not bins.fits:
+        bins = None
+    cache = None
+    chunk_budget_mb = memory_budget_mb
+    if bins is not None:
+        # A quarter of the budget holds probabilities of rows already scored
+        cache = _ProbaCache(memory_budget_mb * 2 ** 20 // 4 // 20)
+        chunk_budget_mb = memory_budget_mb * 3 / 4
+    chunk = scenario_chunk_size(n_projects, chunk_budget_mb)
+
+    def build(rows):
+        S = portfolio.stressed_columns(shocks, values[rows])
+        if bins is None:
+            return portfolio.tensor(S), None
+        return S, bins.keys(S)
+
+    def score_chunk(S, keys):
+        if keys is None:
+            return score(S.reshape(-1, S.shape[-1]))
+        distinct, first, inverse = np.unique(keys.ravel(), return_index=True,
+                                             return_inverse=True)
+        found, position = cache.lookup(distinct)
+        proba = np.empty((len(distinct), len(class_names)), dtype=np.float32)
+        proba[found] = cache.proba[position[found]]
+        missing = np.flatnonzero(~found)
+        if len(missing):
+            rows = first[missing]
+            X = portfolio.X[rows % n_projects]
+            X[:, portfolio.varying] = S.reshape(-1, S.shape[-1])[rows]
+            proba[missing] = score(X)
+            cache.add(distinct[missing], proba[missing], position[missing])
+        cache.hits += int(found.sum())
+        cache.misses += len(missing)
+        return proba[inverse.ravel()]
+
+    baseline_proba = score(portfolio.X)
+    baseline_class = baseline_proba.argmax(axis=1)
+
+    n_classes = len(class_names)
+    class_share = np.empty((n_scenarios, n_classes))
+    mean_proba = np.empty((n_scenarios, n_classes))
+    high_risk_count = np.zeros(n_projects, dtype=np.int64)
+    downgraded_share = np.empty(n_scenarios)
+    starts = range(0, n_scenarios, chunk)
+
+    # Build chunk k+1 (numpy, releases the GIL) while xgboost scores chunk k
+    with ThreadPoolExecutor(max_workers=1) as builder:
+        pending = builder.submit(build, slice(0, chunk))
+        for begin in starts:
+            S, keys = pending.result()
+            if begin + chunk < n_scenarios:
+                pending = builder.submit(build, slice(begin + chunk, begin + 2 * chunk))
+            proba = score_chunk(S, keys).reshape(len(S), n_projects, n_classes)
+            del S, keys
+            rows = slice(begin, begin + len(proba))
+            risk_class = proba.argmax(axis=2)
+            one_hot = risk_class[..., None] == np.arange(n_classes)
+            class_share[rows] = np.einsum('snk,n->sk', one_hot, portfolio.weights)
+            mean_proba[rows] = np.einsum('snk,n->sk', proba, portfolio.weights)
+            high_risk_count += one_hot[..., 2].sum(axis=0)
+            downgraded_share[rows] = (risk_class > baseline_class) @ portfolio.weights
+
+    n_cells = n_scenarios * n_projects
+    return {
+        'n_scenarios': n_scenarios,
+        'n_projects': n_projects,
+        'shocks': shocks,
+        'shock_values': values,
+        'baseline': {
+            'class_share': dict(zip(class_names, np.bincount(
+                baseline_class, weights=portfolio.weights, minlength=n_classes).tolist())),
+            'mean_proba': dict(zip(class_names, (portfolio.weights @ baseline_proba).tolist()))
+        },
+        'class_share': class_share,
+        'mean_proba': mean_proba,
+        'class_share_tails': {name: tail_statistics(class_share[:, k])
+                              for k, name in enumerate(class_names)},
+        'high_risk_proba_tails': tail_statistics(mean_proba[:, 2]),
+        'downgraded_share_tails': tail_statistics(downgraded_share),
+        'project_high_risk_frequency': high_risk_count / n_scenarios,
+        'scenarios_per_chunk': chunk,
+        'n_chunks': len(starts),
+        'rows_scored': cache.misses if cache is not None else n_cells,
+        'n_cells': n_cells,
+        'wall_time_s': time.perf_counter() - start,
+        'n_threads': n_jobs or os.cpu_count()
+    }
@@ -0,0 +1,258 @@
+"""
+Per-technology ensemble: one booster per project_type behind a router
+
+    training = train_technology_ensemble(X_train, y_train, X_test, y_test)
+    predict.set_model(training['model'])
+
+The pipeline design (models/xgboost-pipeline.md) calls for a separate model
+per project type. Every member, plus the global model that covers unknown
+or under-represented types, is trained at the same time over a process pool,
+with the core budget split between pool workers and each worker's xgboost
+nthread as in tuning.py.
+
+TechnologyEnsemble is a drop-in for the XGBClassifier wherever
+predict_proba is called. The technology of each row is recovered from its
+tech_maturity_score feature, so predict_esg_risk, the batch path and the
+server route without any change. A batch is grouped by member with one
+stable argsort, and each member scores its rows in a single inplace_predict
+call. A one-row request goes straight to its member.
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .features import class_names, feature_columns, tech_codes, tech_maturity_table
+from .train import default_hyperparameters, native_params, split_core_budget
+
+report_filename = 'technology_report.json'
+default_ensemble_path = 'finergycloud_xgboost_technology_model.joblib'
+
+_tech_column = feature_columns.index('tech_maturity_score')
+
+
+def technology_codes(X):
+    """
+    Index into tech_codes for each row of a feature matrix, -1 if unknown
+    """
+    tech = np.asarray(X, dtype=np.float32)[:, _tech_column]
+    matches = tech[:, None] == tech_maturity_table[None, :len(tech_codes)]
+    return np.where(matches.any(axis=1), matches.argmax(axis=1), -1)
+
+
+class TechnologyEnsemble:
+    """
+    Routes each row to its technology's booster, else the global booster
+    """
+
+    def __init__(self, global_booster, boosters):
+        # boosters: {project_type: Booster}; absent types use the global one
+        self.global_booster = global_booster
+        self.boosters = dict(boosters)
+        self.member_names = ['global'] + [t for t in tech_codes if t in self.boosters]
+        self.members = [global_booster] + [self.boosters[t] for t in self.member_names[1:]]
+        # Member slot per technology code, shifted by one so -1 maps to 0
+        self._slots = np.asarray([0] + [self.member_names.index(t) if t in self.boosters
+                                        else 0 for t in tech_codes])
+
+    def route(self, X):
+        """
+        Member slot per row: 0 is the global booster
+        """
+        return self._slots[technology_codes(X) + 1]
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        slot = self.route(X)
+        if len(X) == 1:
+            return self.members[slot[0]].inplace_predict(X)
+
+        out = np.empty((len(X), len(class_names)), dtype=np.float32)
+        order = np.argsort(slot, kind='stable')
+        bounds = np.searchsorted(slot[order], np.arange(len(self.members) + 1))
+        for m, booster in enumerate(self.members):
+            rows = order[bounds[m]:bounds[m + 1]]
+            if len(rows):
+                out[rows] = booster.inplace_predict(X[rows])
+        return out
+
+    # Lets booster-level helpers (latency, throughput) time the routed path
+    inplace_predict = predict_proba
+
+    def predict(self, X):
+        return self.predict_proba(X).argmax(axis=1)
+
+
+# Per-process training data, set once by the pool initializer
+_worker_data = {}
+
+
+def _init_worker(X_train, y_train, X_test, y_test, codes_train, codes_test):
+    _worker_data.update(X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test,
+                        codes_train=codes_train, codes_test=codes_test)
+
+
+def _train_member(task):
+    """
+    Boost one member on its technology's rows (all rows for the global model)
+    """
+    import xgboost as xgb
+
+    from .compaction import truncate_to_best_iteration
+
+    start = time.perf_counter()
+    code = task['code']
+    d = _worker_data
+    train_rows = slice(None) if code is None else d['codes_train'] == code
+    test_rows = slice(None) if code is None else d['codes_test'] == code
+    dtrain = xgb.DMatrix(d['X_train'][train_rows], d['y_train'][train_rows],
+                         feature_names=feature_columns)
+    dtest = xgb.DMatrix(d['X_test'][test_rows], d['y_test'][test_rows],
+                        feature_names=feature_columns)
+    params, num_boost_round, early_stopping_rounds = native_params(
+        task['hyperparameters'], n_jobs=task['nthread'])
+    booster = xgb.train(params, dtrain, num_boost_round=num_boost_round,
+                        evals=[(dtest, 'test')], early_stopping_rounds=early_stopping_rounds,
+                        verbose_eval=False)
+    booster = truncate_to_best_iteration(booster)
+    return {
+        'name': task['name'],
+        'n_train': dtrain.num_row(),
+        'n_test': dtest.num_row(),
+        'n_rounds': booster.num_boosted_rounds(),
+        'nthread': task['nthread'],
+        'wall_time_s': time.perf_counter() - start,
+        'booster': bytes(booster.save_raw(raw_format='ubj'))
+    }
+
+
+def train_technology_ensemble(X_train, y_train, X_test, y_test, cores=None, min_rows=100,
+                              hyperparameters=None):
+    """
+    Train the global model and one model per project_type in parallel
+    Types with fewer than min_rows training rows, or no test rows for early
+    stopping, are served by the global model. Returns the ensemble and the
+    per-member training records.
+    """
+    import xgboost as xgb
+
+    cores = cores or os.cpu_count() or 1
+    hyperparameters = dict(default_hyperparameters, **(hyperparameters or {}))
+    X_train = np.asarray(X_train, dtype=np.float32)
+    X_test = np.asarray(X_test, dtype=np.float32)
+    y_train, y_test = np.asarray(y_train), np.asarray(y_test)
+    codes_train, codes_test = technology_codes(X_train), technology_codes(X_test)
+
+    tasks = [{'name': 'global', 'code': None}]
+    skipped = []
+    for code, name in enumerate(tech_codes):
+        if (codes_train == code).sum() >= min_rows and (codes_test == code).any():
+            tasks.append({'name': name, 'code': code})
+        else:
+            skipped.append(name)
+    n_workers, nthread = split_core_budget(cores, len(tasks))
+    for task in tasks:
+        task.update(nthread=nthread, hyperparameters=hyperparameters)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(X_train, y_train, X_test, y_test,
+                                       codes_train, codes_test)) as pool:
+        members = list(pool.map(_train_member, tasks))
+    wall_time = time.perf_counter() - start
+
+    boosters = {}
+    for member in members:
+        booster = xgb.Booster()
+        booster.load_model(bytearray(member.pop('booster')))
+        boosters[member['name']] = booster
+    global_booster = boosters.pop('global')
+    return {
+        'model': TechnologyEnsemble(global_booster, boosters),
+        'cores': cores,
+        'workers': n_workers,
+        'nthread': nthread,
+        'wall_time_s': wall_time,
+        'member_wall_time_s': sum(m['wall_time_s'] for m in members),
+        'members': members,
+        'fallback_types': skipped
+    }
+
+
+def technology_report(ensemble, X_test, y_test, global_model=None, n_calls=1000):
+    """
+    Per-member single-row latency and accuracy on its own technology's test
+    rows, against the global model on the same rows, plus routed totals
+    global_model defaults to the ensemble's own global member
+    """
+    from .compaction import _batch_rows_per_s, _latency_ms, truncate_to_best_iteration
+
+    X_test = np.asarray(X_test, dtype=np.float32)
+    y_test = np.asarray(y_test)
+    reference = (ensemble.global_booster if global_model is None
+                 else truncate_to_best_iteration(global_model))
+    slot = ensemble.route(X_test)
+
+    rows = []
+    for m, (name, booster) in enumerate(zip(ensemble.member_names, ensemble.members)):
+        mine = slot == m
+        if m == 0 or not mine.any():
+            continue
+        X, y = X_test[mine], y_test[mine]
+        p50, p99 = _latency_ms(booster, X, n_calls)
+        global_p50, global_p99 = _latency_ms(reference, X, n_calls)
+        rows.append({
+            'member': name,
+            'n_test': int(mine.sum()),
+            'n_rounds': booster.num_boosted_rounds(),
+            'latency_p50_ms': p50,
+            'latency_p99_ms': p99,
+            'global_latency_p50_ms': global_p50,
+            'global_latency_p99_ms': global_p99,
+            'accuracy': float((booster.inplace_predict(X).argmax(axis=1) == y).mean()),
+            'global_accuracy': float((reference.inplace_predict(X).argmax(axis=1) == y).mean())
+        })
+
+    p50, p99 = _latency_ms(ensemble, X_test, n_calls)
+    global_p50, global_p99 = _latency_ms(reference, X_test, n_calls)
+    rows.append({
+        'member': 'routed',
+        'n_test': len(y_test),
+        'n_rounds': sum(b.num_boosted_rounds() for b in ensemble.members),
+        'latency_p50_ms': p50,
+        'latency_p99_ms': p99,
+        'global_latency_p50_ms': global_p50,
+        'global_latency_p99_ms': global_p99,
+        'accuracy': float((ensemble.predict(X_test) == y_test).mean()),
+        'global_accuracy': float((reference.inplace_predict(X_test).argmax(axis=1)
+                                  == y_test).mean()),
+        'batch_rows_per_s': _batch_rows_per_s(ensemble, X_test),
+        'global_batch_rows_per_s': _batch_rows_per_s(reference, X_test)
+    })
+    return rows
+
+
+def format_technology_report(rows):
+    lines = [f"{'member':12s} {'rows':>6s} {'rounds':>6s} {'p50 ms':>7s} {'p99 ms':>7s} "
+             f"{'global p50':>10s} {'global p99':>10s} {'accuracy':>8s} {'global acc':>10s}"]
+    for r in rows:
+        lines.append(f"{r['member']:12s} {r['n_test']:6d} {r['n_rounds']:6d} "
+                     f"{r['latency_p50_ms']:7.3f} {r['latency_p99_ms']:7.3f} "
+                     f"{r['global_latency_p50_ms']:10.3f} {r['global_latency_p99_ms']:10.3f} "
+                     f"{r['accuracy']:8.4f} {r['global_accuracy']:10.4f}")
+    return '\n'.join(lines)
+
+
+def save_technology_report(training, rows, output_dir='.'):
+    """
+    Write training wall times and the latency report as technology_report.json
+    """
+    report = {key: value for key, value in training.items() if key != 'model'}
+    report['report'] = rows
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, report_filename)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
@@ -0,0 +1,379 @@
+"""
+XGBoost training pipeline for ESG risk classification
+
+Nothing runs at import time; call run_training() or use the ``train`` CLI.
+"""
+import json
+import os
+
+import numpy as np
+
+from .binned import BinnedDataset, cross_validate_binned, fit_binned
+from .data import default_n_projects, generate_synthetic_projects
+from .drift import DriftSketch, reference_filename
+from .evaluate import evaluate_model, feature_importance_table, mean_roc_auc
+from .feature_store import FeatureStore
+from .features import class_names, engineer_features, feature_columns
+from .instrumentation import stage
+from .predict import (
+    default_config_path, default_model_path, predict_esg_risk, predict_esg_risk_batch
+)
+from .trees import default_trees_path, export_flat_trees
+
+# XGBoost Model Configuration - Optimized Hyperparameters
+default_hyperparameters = {
+    'n_estimators': 300,
+    'max_depth': 6,
+    'learning_rate': 0.1,
+    'subsample': 0.8,
+    'colsample_bytree': 0.8,
+    'min_child_weight': 3,
+    'gamma': 0.1,
+    'reg_alpha': 0.01,
+    'reg_lambda': 1.0,
+    'random_state': 42,
+    'objective': 'multi:softprob',
+    'eval_metric': 'mlogloss',
+    'tree_method': 'hist',
+    'early_stopping_rounds': 50
+}
+
+sample_project = {
+    'capacity_mw': 75,
+    'projected_irr': 18.5,
+    'environmental_score': 8.2,
+    'social_score': 7.8,
+    'governance_score': 8.5,
+    'country': 'Ghana',
+    'project_type': 'Solar'
+}
+
+
+def build_model(**overrides):
+    """
+    Create an unfitted XGBClassifier with the production hyperparameters
+    """
+    import xgboost as xgb
+
+    params = dict(default_hyperparameters)
+    params.update(overrides)
+    return xgb.XGBClassifier(**params)
+
+
+def native_params(hyperparameters=None, **overrides):
+    """
+    Translate XGBClassifier hyperparameters into xgb.train() arguments
+    Returns (params, num_boost_round, early_stopping_rounds)
+    """
+    hp = dict(default_hyperparameters if hyperparameters is None else hyperparameters)
+    hp.update(overrides)
+    renamed = {'learning_rate': 'eta', 'reg_alpha': 'alpha', 'reg_lambda': 'lambda',
+               'random_state': 'seed', 'n_jobs': 'nthread'}
+    num_boost_round = hp.pop('n_estimators')
+    early_stopping_rounds = hp.pop('early_stopping_rounds', None)
+    params = {renamed.get(k, k): v for k, v in hp.items() if v is not None}
+    params['num_class'] = len(class_names)
+    return params, num_boost_round, early_stopping_rounds
+
+
+def split_dataset(data_engineered, test_size=0.2, random_state=42):
+    """
+    Stratified train/test split of the engineered feature matrix
+    """
+    from sklearn.model_selection import train_test_split
+
+    X = data_engineered[feature_columns]
+    y = data_engineered['risk_classification']  # Low=0, Medium=1, High=2
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=random_state, stratify=y
+    )
+    return X, y, X_train, X_test, y_train, y_test
+
+
+def fit_model(model, X_train, y_train, X_test, y_test):
+    """
+    Model Training with Early Stopping on the hold-out set
+    """
+    model.fit(
+        X_train, y_train,
+        eval_set=[(X_train, y_train), (X_test, y_test)],
+        verbose=False
+    )
+    return model
+
+
+def split_core_budget(cores=None, n_tasks=1):
+    """
+    Split a core budget between parallel workers and xgboost threads
+    Returns (n_workers, threads_per_worker) with their product <= cores
+    """
+    cores = cores or os.cpu_count() or 1
+    n_workers = max(1, min(n_tasks, cores))
+    return n_workers, max(1, cores // n_workers)
+
+
+def cross_validate_model(model, X, y, n_splits=5, cores=None):
+    """
+    Stratified k-fold accuracy for the model's hyperparameters
+    Folds have no eval set, so they train the full n_estimators. Folds run
+    in parallel with the core budget split between them, so fold workers
+    and xgboost threads do not oversubscribe the machine.
+    """
+    from sklearn.base import clone
+    from sklearn.model_selection import StratifiedKFold, cross_val_score
+
+    n_workers, threads = split_core_budget(cores, n_splits)
+    cv_model = clone(model).set_params(early_stopping_rounds=None, n_jobs=threads)
+    return cross_val_score(
+        cv_model, X, y,
+        cv=StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42),
+        scoring='accuracy', n_jobs=n_workers
+    )
+
+
+def build_model_config(model, evaluation, cv_scores, feature_importance, dataset_size):
+    """
+    Feature and metric configuration saved next to the model
+    """
+    return {
+        'feature_columns': feature_columns,
+        'class_names': class_names,
+        'model_version': '1.0',
+        'training_accuracy': float(evaluation['accuracy']),
+        'cv_mean_accuracy': float(cv_scores.mean()),
+        'cv_std_accuracy': float(cv_scores.std()),
+        'feature_importance': feature_importance.to_dict('records'),
+        'roc_auc_scores': {f'class_{k}': float(v) for k, v in evaluation['roc_auc'].items()},
+        'training_date': '2025-01-31',
+        'dataset_size': dataset_size,
+        'hyperparameters': model.get_params()
+    }
+
+
+def save_artifacts(model, model_config, output_dir='.'):
+    """
+    Persist the trained model, its flattened trees and its configuration
+    """
+    import joblib
+
+    os.makedirs(output_dir, exist_ok=True)
+    model_path = os.path.join(output_dir, default_model_path)
+    config_path = os.path.join(output_dir, default_config_path)
+    joblib.dump(model, model_path)
+    export_flat_trees(model).save(os.path.join(output_dir, default_trees_path))
+    with open(config_path, 'w') as f:
+        json.dump(model_config, f, indent=2)
+    return model_path, config_path
+
+
+def run_training(n_projects=default_n_projects, seed=42, output_dir='.', data=None,
+                 checkpoint_every=None, checkpoint_seconds=None, time_budget=None, resume=False,
+                 binned=False, feature_store=None):
+    """
+    Full training run: data, features, fit, CV, evaluation and deployment
+    A ``data`` frame passed in is extended with the engineered columns in place
+    Checkpointing, a fit time budget or resume (see checkpoint.py) save the
+    booster to output_dir while it trains
+    binned=True bins the features once (binned.BinnedDataset) and runs the
+    fit and every cross-validation fold on row subsets of the codes
+    feature_store trains from a FeatureStore directory's engineered features
+    and labels instead of generating and engineering projects
+    Stages are timed when instrumentation is enabled (enable_instrumentation)
+    The body is also the training notebook (notebook.derive_cells): each
+    ``# N. Title`` comment is a section and each paragraph a code cell
+    """
+    import xgboost as xgb
+
+    if binned and (checkpoint_every or checkpoint_seconds or time_budget or resume):
+        raise ValueError('binned training cannot be combined with checkpointing')
+    if feature_store is not None and data is not None:
+        raise ValueError('pass either data or feature_store, not both')
+
+    print("=" * 70)
+    print("FinergyCloud XGBoost Model Training")
+    print("=" * 70)
+    print(f"XGBoost Version: {xgb.__version__}")
+    print("Training Environment: Python Script")
+    print("Target: ESG Risk Classification (High/Medium/Low)")
+    print()
+
+    # 1. Data Loading and Preprocessing
+    print("1. Data Loading and Preprocessing")
+    print("-" * 40)
+    if feature_store is not None:
+        with stage('data_loading'):
+            store = FeatureStore(feature_store)
+            data = store.projects()
+    elif data is None:
+        with stage('data_loading'):
+            data = generate_synthetic_projects(n_projects, seed=seed)
+    print(f"Dataset Shape: {data.shape}")
+    print(f"Total Projects: {len(data)}")
+    print(f"Countries Covered: {data['country'].nunique()}")
+    print(f"Project Types: {list(data['project_type'].unique())}")
+    print()
+
+    # Derive features in place rather than on a full copy of the dataset
+    n_raw_columns = len(data.columns)
+    with stage('feature_engineering'):
+        if feature_store is not None:
+            # Stored features are already engineered and rounded to float32
+            data_engineered = store.features_frame().assign(risk_classification=store.labels())
+        else:
+            data_engineered = engineer_features(data)
+    print("Feature engineering completed.")
+    if feature_store is not None:
+        print(f"Features read from feature store: {feature_store}")
+    else:
+        print(f"New features added: {len(data_engineered.columns) - n_raw_columns}")
+    print("Risk Distribution:")
+    print(data_engineered['risk_classification'].value_counts().sort_index())
+    print()
+
+    # 2. XGBoost Model Configuration and Training
+    print("2. XGBoost Model Configuration and Training")
+    print("-" * 40)
+    with stage('split'):
+        X, y, X_train, X_test, y_train, y_test = split_dataset(data_engineered)
+    print(f"Training Set: {X_train.shape}")
+    print(f"Test Set: {X_test.shape}")
+    print(f"Class Distribution: {dict(zip(*np.unique(y_train, return_counts=True)))}")
+    print()
+
+    xgb_model = build_model()
+    print("XGBoost Model Configuration:")
+    print(f"Estimators: {xgb_model.n_estimators}")
+    print(f"Max Depth: {xgb_model.max_depth}")
+    print(f"Learning Rate: {xgb_model.learning_rate}")
+    print(f"Objective: {xgb_model.objective}")
+    print()
+
+    print("Training XGBoost model...")
+    with stage('fit'):
+        if checkpoint_every or checkpoint_seconds or time_budget or resume:
+            # Absolute: the notebook runs this body as cells in __main__
+            from finergycloud_xgboost.checkpoint import fit_checkpointed
+
+            fit_result = fit_checkpointed(xgb_model, X_train, y_train, X_test, y_test, output_dir,
+                                          checkpoint_every, checkpoint_seconds, time_budget, resume)
+            print(f"Boosting ended by {fit_result['stopped_by']} after {fit_result['rounds']} "
+                  f"rounds (resumed from {fit_result['resumed_from_round']}): "
+                  f"{fit_result['rounds_per_s']:.1f} rounds/s, {fit_result['rows_per_s']:,.0f} "
+                  f"rows/s, {fit_result['checkpoints']} checkpoints")
+        elif binned:
+            # Features are binned once; the fit and every CV fold reuse the codes
+            binned_data = BinnedDataset.build(X, y)
+            fit_binned(xgb_model, binned_data, X.index.get_indexer(X_train.index),
+                       X.index.get_indexer(X_test.index))
+        else:
+            fit_model(xgb_model, X_train, y_train, X_test, y_test)
+    print("Model training completed!")
+    print(f"Best iteration: {xgb_model.best_iteration}")
+    print(f"Best score: {xgb_model.best_score:.4f}")
+    print()
+
+    # 3. Model Evaluation and Performance Metrics
+    print("3. Model Evaluation and Performance Metrics")
+    print("-" * 40)
+    with stage('evaluate'):
+        evaluation = evaluate_model(xgb_model, X_test, y_test)
+    accuracy = evaluation['accuracy']
+    print(f"Test Accuracy: {accuracy:.3f} ({accuracy*100:.1f}%)")
+    print()
+    print("Classification Report:")
+    print(evaluation['classification_report'])
+
+    with stage('cross_validation'):
+        if binned:
+            cv_scores = cross_validate_binned(binned_data)
+        else:
+            cv_scores = cross_validate_model(xgb_model, X, y)
+    print("5-Fold Cross-Validation Results:")
+    print(f"Individual Scores: {[f'{score:.3f}' for score in cv_scores]}")
+    print(f"Mean Accuracy: {cv_scores.mean():.3f} ± {cv_scores.std():.3f}")
+    print(f"Consistency: {cv_scores.mean()*100:.2f}% ± {cv_scores.std()*100:.2f}%")
+    print()
+
+    with stage('feature_importance'):
+        feature_importance = feature_importance_table(xgb_model)
+    print("Feature Importance Rankings:")
+    for i, (_, row) in enumerate(feature_importance.iterrows(), 1):
+        print(f"{i:2d}. {row['feature']:20s}: {row['importance']:.3f}")
+    print()
+
+    # 4. Model Validation and ROC Analysis
+    print("4. Model Validation and ROC Analysis")
+    print("-" * 40)
+    roc_auc = evaluation['roc_auc']
+    print("ROC-AUC Scores by Risk Class:")
+    print(f"Low Risk (Class 0):    {roc_auc[0]:.3f}")
+    print(f"Medium Risk (Class 1): {roc_auc[1]:.3f}")
+    print(f"High Risk (Class 2):   {roc_auc[2]:.3f}")
+    print(f"Mean ROC-AUC:          {mean_roc_auc(roc_auc):.3f}")
+    print()
+
+    print("Confusion Matrix:")
+    print(evaluation['confusion_matrix'])
+    print("\nPer-Class Accuracy:")
+    for i, acc in enumerate(evaluation['class_accuracy']):
+        print(f"{class_names[i]:12s}: {acc:.3f} ({acc*100:.1f}%)")
+    print()
+
+    # 5. Production Model Deployment
+    print("5. Production Model Deployment")
+    print("-" * 40)
+    model_config = build_model_config(
+        xgb_model, evaluation, cv_scores, feature_importance, len(data)
+    )
+    with stage('save_artifacts'):
+        model_path, config_path = save_artifacts(xgb_model, model_config, output_dir)
+    print(f"Model saved: {model_path}")
+    print(f"Model configuration saved: {config_path}")
+    print()
+
+    # Reference histograms of the training split for drift monitoring
+    with stage('drift_reference'):
+        drift_reference = DriftSketch.from_data(X_train, xgb_model.predict_proba(X_train))
+        drift_path = drift_reference.save(os.path.join(output_dir, reference_filename))
+    print(f"Drift reference saved: {drift_path}")
+    print()
+
+    with stage('sample_prediction'):
+        prediction_result = predict_esg_risk(sample_project, model=xgb_model)
+    print("Sample Prediction:")
+    print(json.dumps(prediction_result, indent=2))
+    print()
+
+    # Batch scoring of the full project pipeline
+    with stage('batch_prediction'):
+        batch_result = predict_esg_risk_batch(data, model=xgb_model)
+    labels, counts = np.unique(batch_result['risk_classification'], return_counts=True)
+    print(f"Batch Prediction: {len(batch_result['risk_classification'])} projects scored")
+    for label, count in zip(labels, counts):
+        print(f"{label:12s}: {count}")
+    print()
+
+    # 6. Model Performance Summary
+    print("6. Model Performance Summary")
+    print("=" * 40)
+    print("Final Model Statistics:")
+    print(f"- Accuracy: {accuracy:.1%} (Test Set)")
+    print(f"- Cross-Validation: {cv_scores.mean():.2%} ± {cv_scores.std():.2%} (5-fold)")
+    print(f"- ROC-AUC: {mean_roc_auc(roc_auc):.3f} (Mean across classes)")
+    print(f"- Training Dataset: {len(data):,} projects across 5 West African countries")
+    print(f"- Feature Engineering: {len(feature_columns)} optimized features with geographic risk adjustment")
+    print("- Production Deployment: Integrated into FinergyCloud platform API")
+    print("=" * 70)
+
+    return {
+        'model': xgb_model,
+        'model_config': model_config,
+        'accuracy': accuracy,
+        'cv_scores': cv_scores,
+        'roc_auc': roc_auc,
+        'model_path': model_path,
+        'config_path': config_path,
+        'drift_reference_path': drift_path,
+        'X_train': X_train,
+        'y_train': y_train
+    }
@@ -0,0 +1,218 @@
+"""
+Flattened, array-backed evaluation of the trained XGBoost ensemble
+
+export_flat_trees() turns the booster, cut at best_iteration, into flat NumPy
+node arrays. FlatTreeEnsemble walks every tree level by level for a whole
+batch of rows at once, so lightweight workers can score with numpy alone,
+without importing xgboost or unpickling the sklearn wrapper.
+"""
+import json
+
+import numpy as np
+
+default_trees_path = 'finergycloud_xgboost_trees.npz'
+
+
+class FlatTreeEnsemble:
+    """
+    All trees of a multi:softprob booster as flat node arrays
+    Leaves have left == right == -1 and carry their value in ``value``
+    """
+
+    array_names = ('feature', 'threshold', 'left', 'right', 'default_left',
+                   'value', 'roots', 'tree_class', 'base_margin')
+
+    # Rows per chunk are chosen so a chunk's node matrix stays cache sized
+    chunk_nodes = 32768
+
+    def __init__(self, feature, threshold, left, right, default_left, value,
+                 roots, tree_class, base_margin, max_depth):
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float32)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float32)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.tree_class = np.asarray(tree_class, dtype=np.int32)
+        self.base_margin = np.asarray(base_margin, dtype=np.float64)
+        self.max_depth = int(max_depth)
+
+        self.n_trees = len(self.roots)
+        self.n_classes = len(self.base_margin)
+        # Sums leaf values per class with one matrix product
+        self.class_matrix = np.zeros((self.n_trees, self.n_classes), dtype=np.float64)
+        self.class_matrix[np.arange(self.n_trees), self.tree_class] = 1.0
+        self._build_walk_tables()
+
+    def _build_walk_tables(self):
+        # xgboost allocates children in pairs, so left == right - 1 and one
+        # step is ``node = right[node] - went_left``. Leaves point right at
+        # themselves behind a NaN threshold (never taken left), so every row
+        # can take max_depth steps without checking for leaves.
+        internal = self.left != -1
+        if np.any(self.left[internal] != self.right[internal] - 1):
+            raise ValueError('expected sibling nodes to be stored next to each other')
+        nodes = np.arange(len(self.left), dtype=np.intp)
+        self._feature = self.feature.astype(np.intp)
+        self._threshold = np.where(internal, self.threshold, np.nan).astype(np.float32)
+        self._right = np.where(internal, self.right, nodes).astype(np.intp)
+        self._default_left = self.default_left & internal
+        self._roots = self.roots.astype(np.intp)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.array_names)
+
+    def predict_margin(self, X, chunk_size=None):
+        """
+        Raw per-class scores, evaluated level by level over row chunks
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_rows, n_features = X.shape
+        chunk_size = chunk_size or max(1, self.chunk_nodes // self.n_trees)
+        margin = np.empty((n_rows, self.n_classes), dtype=np.float64)
+
+        for start in range(0, n_rows, chunk_size):
+            X_chunk = X[start:start + chunk_size]
+            n_chunk = len(X_chunk)
+            flat_x = X_chunk.ravel()
+            row_offsets = (np.arange(n_chunk, dtype=np.intp) * n_features)[:, None]
+            has_nan = np.isnan(X_chunk).any()
+
+            node = np.repeat(self._roots[None, :], n_chunk, axis=0)
+            index = np.empty_like(node)
+            x = np.empty(node.shape, dtype=np.float32)
+            threshold = np.empty_like(x)
+            go_left = np.empty(node.shape, dtype=bool)
+
+            # One level of every tree per step; NaN follows the default branch
+            for _ in range(self.max_depth):
+                np.take(self._feature, node, out=index)
+                index += row_offsets
+                np.take(flat_x, index, out=x)
+                np.take(self._threshold, node, out=threshold)
+                np.less(x, threshold, out=go_left)
+                if has_nan:
+                    go_left |= np.isnan(x) & np.take(self._default_left, node)
+                np.take(self._right, node, out=index)
+                np.subtract(index, go_left, out=node)
+
+            margin[start:start + chunk_size] = np.take(self.value, node) @ self.class_matrix
+        margin += self.base_margin
+        return margin
+
+    def predict_proba(self, X, chunk_size=None):
+        """
+        multi:softprob class probabilities, matching XGBClassifier.predict_proba
+        """
+        proba = self.predict_margin(X, chunk_size)
+        proba -= proba.max(axis=1, keepdims=True)
+        np.exp(proba, out=proba)
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict(self, X, chunk_size=None):
+        return self.predict_margin(X, chunk_size).argmax(axis=1)
+
+    def save(self, path=default_trees_path):
+        arrays = {name: getattr(self, name) for name in self.array_names}
+        with open(path, 'wb') as f:
+            np.savez(f, max_depth=self.max_depth, **arrays)
+        return path
+
+    @classmethod
+    def load(cls, path=default_trees_path):
+        with np.load(path) as arrays:
+            kwargs = {name: arrays[name] for name in cls.array_names}
+            return cls(max_depth=int(arrays['max_depth']), **kwargs)
+
+
+def _parse_base_score(base_score, n_classes):
+    # Scalar before xgboost 2.x/3.x intercepts, a per-class vector after
+    values = [float(v) for v in base_score.strip('[]').split(',')]
+    if len(values) == 1:
+        values = values * n_classes
+    return values
+
+
+def _tree_depth(left, right):
+    depth = 0
+    level = [0]
+    while level:
+        level = [child for node in level for child in (left[node], right[node]) if child != -1]
+        depth += bool(level)
+    return depth
+
+
+def export_flat_trees(model, iteration_end=None):
+    """
+    Flatten a trained XGBClassifier or Booster into a FlatTreeEnsemble
+    Keeps rounds up to best_iteration unless iteration_end is given
+    """
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    learner = json.loads(booster.save_raw(raw_format='json'))['learner']
+    if learner['objective']['name'] != 'multi:softprob':
+        raise ValueError(f"unsupported objective: {learner['objective']['name']}")
+
+    n_classes = int(learner['learner_model_param']['num_class'])
+    gbtree = learner['gradient_booster']['model']
+    trees_per_round = n_classes * int(gbtree['gbtree_model_param']['num_parallel_tree'])
+
+    if iteration_end is None:
+        best_iteration = learner.get('attributes', {}).get('best_iteration')
+        if best_iteration is not None:
+            iteration_end = int(best_iteration) + 1
+    if iteration_end is None:
+        n_trees = len(gbtree['trees'])
+    elif 'iteration_indptr' in gbtree:
+        n_trees = gbtree['iteration_indptr'][iteration_end]
+    else:
+        n_trees = iteration_end * trees_per_round
+
+    feature, threshold, left, right, default_left, value, roots = [], [], [], [], [], [], []
+    max_depth = 0
+    offset = 0
+    for tree in gbtree['trees'][:n_trees]:
+        if any(tree.get('split_type', [])):
+            raise ValueError('categorical splits are not supported')
+        tree_left = tree['left_children']
+        tree_right = tree['right_children']
+        n_nodes = len(tree_left)
+        for node in range(n_nodes):
+            is_leaf = tree_left[node] == -1
+            feature.append(0 if is_leaf else tree['split_indices'][node])
+            left.append(-1 if is_leaf else offset + tree_left[node])
+            right.append(-1 if is_leaf else offset + tree_right[node])
+            default_left.append(bool(tree['default_left'][node]))
+            # split_conditions holds the threshold, or the value for a leaf
+            threshold.append(0.0 if is_leaf else tree['split_conditions'][node])
+            value.append(tree['split_conditions'][node] if is_leaf else 0.0)
+        roots.append(offset)
+        max_depth = max(max_depth, _tree_depth(tree_left, tree_right))
+        offset += n_nodes
+
+    return FlatTreeEnsemble(
+        feature, threshold, left, right, default_left, value, roots,
+        tree_class=gbtree['tree_info'][:n_trees],
+        base_margin=_parse_base_score(learner['learner_model_param']['base_score'], n_classes),
+        max_depth=max_depth
+    )
+
+
+def split_thresholds(model, n_features):
+    """
+    Sorted distinct split thresholds of every feature, over all trees
+    Two values with the same searchsorted(thresholds, x, 'right') code take
+    the same branch at every split, so the model cannot tell them apart
+    """
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    trees = json.loads(booster.save_raw(raw_format='json'))['learner']['gradient_booster'][
+        'model']['trees']
+    feature = np.concatenate([np.asarray(tree['split_indices'], dtype=np.int32) for tree in trees])
+    threshold = np.concatenate([np.asarray(tree['split_conditions'], dtype=np.float32)
+                                for tree in trees])
+    is_split = np.concatenate([np.asarray(tree['left_children']) != -1 for tree in trees])
+    return [np.unique(threshold[is_split & (feature == j)]) for j in range(n_features)]
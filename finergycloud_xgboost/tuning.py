@@ -0,0 +1,189 @@
+"""
+Parallel hyperparameter search with successive halving / Hyperband
+
+Configurations are trained over a process pool. The global core budget is
+split between pool workers and each worker's xgboost nthread, so the search
+never oversubscribes the machine. Weak configurations are dropped early on a
+small n_estimators budget, and survivors resume boosting from their previous
+rung instead of starting over. Every trial's wall time is recorded in a
+leaderboard JSON written next to model_config.json.
+"""
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .train import default_hyperparameters, native_params, split_core_budget
+
+leaderboard_filename = 'tuning_leaderboard.json'
+
+search_space = {
+    'max_depth': [3, 4, 5, 6, 7, 8],
+    'learning_rate': [0.03, 0.05, 0.1, 0.2, 0.3],
+    'subsample': [0.6, 0.7, 0.8, 0.9, 1.0],
+    'colsample_bytree': [0.6, 0.7, 0.8, 0.9, 1.0],
+    'min_child_weight': [1, 3, 5, 7],
+    'gamma': [0.0, 0.1, 0.3, 1.0],
+    'reg_alpha': [0.0, 0.01, 0.1, 1.0],
+    'reg_lambda': [0.5, 1.0, 2.0, 5.0]
+}
+
+
+def sample_configurations(n_configs, seed=42, space=search_space):
+    """
+    Random configurations from the search space; the first one is always
+    the production hyperparameters so the leaderboard has a baseline
+    """
+    rng = np.random.default_rng(seed)
+    configs = [{name: default_hyperparameters[name] for name in space}]
+    while len(configs) < n_configs:
+        configs.append({name: values[rng.integers(len(values))]
+                        for name, values in space.items()})
+    return configs[:n_configs]
+
+
+# Per-process training data, set once by the pool initializer
+_worker_data = {}
+
+
+def _init_worker(X_train, y_train, X_valid, y_valid, max_bin):
+    import xgboost as xgb
+
+    dtrain = xgb.QuantileDMatrix(X_train, y_train, max_bin=max_bin)
+    _worker_data['dtrain'] = dtrain
+    _worker_data['dvalid'] = xgb.QuantileDMatrix(X_valid, y_valid, ref=dtrain)
+    _worker_data['y_valid'] = np.asarray(y_valid)
+
+
+def _run_trial(trial):
+    """
+    Boost one configuration up to the trial's round budget and score it
+    """
+    import xgboost as xgb
+
+    start = time.perf_counter()
+    params, _, _ = native_params(dict(default_hyperparameters, **trial['config']),
+                                 n_jobs=trial['nthread'])
+    params.pop('max_bin', None)
+
+    booster = None
+    if trial['resume_from'] is not None:
+        booster = xgb.Booster()
+        booster.load_model(bytearray(trial['resume_from']))
+    rounds_done = trial['rounds_done']
+    booster = xgb.train(params, _worker_data['dtrain'],
+                        num_boost_round=trial['n_estimators'] - rounds_done,
+                        xgb_model=booster, verbose_eval=False)
+
+    proba = booster.predict(_worker_data['dvalid'])
+    y_valid = _worker_data['y_valid']
+    picked = np.clip(proba[np.arange(len(y_valid)), y_valid], 1e-15, 1.0)
+    return {
+        'config_id': trial['config_id'],
+        'bracket': trial['bracket'],
+        'rung': trial['rung'],
+        'n_estimators': trial['n_estimators'],
+        'nthread': trial['nthread'],
+        'mlogloss': float(-np.log(picked).mean()),
+        'accuracy': float((proba.argmax(axis=1) == y_valid).mean()),
+        'wall_time_s': time.perf_counter() - start,
+        'booster': bytes(booster.save_raw(raw_format='ubj'))
+    }
+
+
+def _successive_halving(pool, n_workers, cores, config_ids, min_rounds, max_rounds,
+                        eta, bracket, configs, trials):
+    """
+    Run one bracket; returns the surviving trial of the final rung
+    """
+    survivors = {config_id: None for config_id in config_ids}
+    n_estimators = min_rounds
+    rung = 0
+    while True:
+        _, nthread = split_core_budget(cores, min(n_workers, len(survivors)))
+        batch = [{
+            'config_id': config_id,
+            'config': configs[config_id],
+            'bracket': bracket,
+            'rung': rung,
+            'n_estimators': n_estimators,
+            'nthread': nthread,
+            'rounds_done': previous['n_estimators'] if previous else 0,
+            'resume_from': previous['booster'] if previous else None
+        } for config_id, previous in survivors.items()]
+        results = list(pool.map(_run_trial, batch))
+        trials.extend(results)
+
+        if n_estimators >= max_rounds or len(results) == 1:
+            return min(results, key=lambda r: r['mlogloss'])
+        results.sort(key=lambda r: r['mlogloss'])
+        keep = max(1, len(results) // eta)
+        survivors = {r['config_id']: r for r in results[:keep]}
+        n_estimators = min(max_rounds, n_estimators * eta)
+        rung += 1
+
+
+def tune_hyperparameters(X_train, y_train, X_valid, y_valid, n_configs=27,
+                         min_rounds=12, max_rounds=300, eta=3, method='halving',
+                         cores=None, seed=42, max_bin=256, output_dir=None):
+    """
+    Search hyperparameters with successive halving or Hyperband on n_estimators
+    Returns the leaderboard and writes it to output_dir when given
+    """
+    cores = cores or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    if method == 'hyperband':
+        # Brackets trade many configs on few rounds against few on many
+        s_max = int(math.log(max_rounds / min_rounds, eta) + 1e-9)
+        brackets = []
+        for s in range(s_max, -1, -1):
+            n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+            brackets.append((n, max(min_rounds, int(max_rounds / eta ** s))))
+        n_configs = sum(n for n, _ in brackets)
+    elif method == 'halving':
+        brackets = [(n_configs, min_rounds)]
+    else:
+        raise ValueError(f"unknown search method: {method}")
+
+    configs = sample_configurations(n_configs, seed=seed)
+    n_workers, _ = split_core_budget(cores, max(n for n, _ in brackets))
+    trials, winners = [], []
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(X_train, y_train, X_valid, y_valid, max_bin)) as pool:
+        first = 0
+        for bracket, (n, bracket_min_rounds) in enumerate(brackets):
+            config_ids = list(range(first, first + n))
+            first += n
+            winners.append(_successive_halving(
+                pool, n_workers, cores, config_ids, bracket_min_rounds, max_rounds,
+                eta, bracket, configs, trials
+            ))
+
+    for trial in trials:
+        trial.pop('booster')
+    best = min(winners, key=lambda r: r['mlogloss'])
+    leaderboard = {
+        'method': method,
+        'cores': cores,
+        'workers': n_workers,
+        'eta': eta,
+        'min_rounds': min_rounds,
+        'max_rounds': max_rounds,
+        'total_wall_time_s': time.perf_counter() - start,
+        'trial_wall_time_s': sum(t['wall_time_s'] for t in trials),
+        'best': dict(best, config=configs[best['config_id']]),
+        'leaderboard': sorted(
+            (dict(t, config=configs[t['config_id']]) for t in trials),
+            key=lambda t: (-t['n_estimators'], t['mlogloss'])
+        )
+    }
+
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, leaderboard_filename), 'w') as f:
+            json.dump(leaderboard, f, indent=2)
+    return leaderboard
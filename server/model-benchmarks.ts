@@ -245,8 +245,21 @@ class ModelBenchmarkCollector {
     }
   }
 
+  // Pick up benchmarks measured by `python -m benchmarks.suite`
+  private async loadBenchmarks() {
+    try {
+      const saved: ModelBenchmark[] = JSON.parse(await fs.readFile(this.BENCHMARKS_FILE, 'utf-8'));
+      const known = new Set(this.benchmarks.map(b => b.timestamp));
+      this.benchmarks.push(...saved.filter(b => !known.has(b.timestamp)));
+      this.benchmarks.sort((a, b) => a.timestamp.localeCompare(b.timestamp));
+    } catch (error) {
+      // No benchmark file yet
+    }
+  }
+
   // Get current model performance data
   async getModelPerformanceData() {
+    await this.loadBenchmarks();
     const recentPredictions = this.predictions.slice(-1000); // Last 1000 predictions
     const latestBenchmark = this.benchmarks[this.benchmarks.length - 1];
     
@@ -7,357 +7,41 @@ Developer: Onuorah Joshua Nwani
 Model Accuracy: 94.2%
 Training Dataset: 2,847 West African renewable energy projects
 Cross-Validation: 5-fold with 94.52% ± 0.61% consistency
-"""
-
-# Import Required Libraries
-import pandas as pd
-import numpy as np
-import xgboost as xgb
-from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, precision_recall_curve
-import matplotlib.pyplot as plt
-import seaborn as sns
-import warnings
-import joblib
-import json
-warnings.filterwarnings('ignore')
-
-print("="*70)
-print("FinergyCloud XGBoost Model Training")
-print("="*70)
-print(f"XGBoost Version: {xgb.__version__}")
-print("Training Environment: Python Script")
-print("Target: ESG Risk Classification (High/Medium/Low)")
-print()
-
-# 1. Data Loading and Preprocessing
-print("1. Data Loading and Preprocessing")
-print("-" * 40)
-
-# Generate Synthetic Training Dataset for Demo
-# In production, this would load from: pd.read_csv('esg_renewable_projects_west_africa.csv')
-np.random.seed(42)
-n_projects = 2847
-
-# Generate realistic project data
-countries = ['Nigeria', 'Ghana', 'Kenya', 'Senegal', 'Mali']
-project_types = ['Solar', 'Wind', 'Hydro', 'Biomass', 'Geothermal']
-country_weights = [0.31, 0.26, 0.24, 0.11, 0.08]
-tech_weights = [0.40, 0.25, 0.20, 0.10, 0.05]
-
-data = pd.DataFrame({
-    'project_id': [f'PRJ-{i:04d}' for i in range(n_projects)],
-    'country': np.random.choice(countries, n_projects, p=country_weights),
-    'project_type': np.random.choice(project_types, n_projects, p=tech_weights),
-    'capacity_mw': np.random.lognormal(3.5, 0.8, n_projects),
-    'projected_irr': np.random.normal(15.2, 3.1, n_projects),
-    'environmental_score': np.random.beta(2, 1, n_projects) * 10,
-    'social_score': np.random.beta(1.8, 1.2, n_projects) * 10,
-    'governance_score': np.random.beta(1.9, 1.1, n_projects) * 10
-})
-
-# Ensure realistic ranges
-data['capacity_mw'] = np.clip(data['capacity_mw'], 5, 200)
-data['projected_irr'] = np.clip(data['projected_irr'], 8, 25)
-data['environmental_score'] = np.clip(data['environmental_score'], 4, 10)
-data['social_score'] = np.clip(data['social_score'], 4, 10)
-data['governance_score'] = np.clip(data['governance_score'], 4, 10)
-
-print(f"Dataset Shape: {data.shape}")
-print(f"Total Projects: {len(data)}")
-print(f"Countries Covered: {data['country'].nunique()}")
-print(f"Project Types: {list(data['project_type'].unique())}")
-print()
-
-# Feature Engineering Pipeline
-def engineer_features(df):
-    """
-    Advanced feature engineering for ESG risk assessment
-    """
-    # Geographic risk adjustment
-    country_risk_scores = {
-        'Nigeria': 0.72, 'Ghana': 0.85, 'Kenya': 0.78, 
-        'Senegal': 0.81, 'Mali': 0.65
-    }
-    df['country_risk_score'] = df['country'].map(country_risk_scores)
-    
-    # Technology maturity scoring
-    tech_maturity = {
-        'Solar': 0.92, 'Wind': 0.88, 'Hydro': 0.85,
-        'Biomass': 0.75, 'Geothermal': 0.70
-    }
-    df['tech_maturity_score'] = df['project_type'].map(tech_maturity)
-    
-    # Capacity-based risk adjustment
-    df['capacity_risk'] = np.where(df['capacity_mw'] > 100, 0.8, 
-                          np.where(df['capacity_mw'] > 50, 0.9, 1.0))
-    
-    # Financial viability indicators
-    df['irr_risk'] = np.where(df['projected_irr'] > 15, 0.9,
-                     np.where(df['projected_irr'] > 12, 0.8, 0.6))
-    
-    # ESG composite scoring
-    df['esg_composite'] = (df['environmental_score'] * 0.4 + 
-                          df['social_score'] * 0.35 + 
-                          df['governance_score'] * 0.25)
-    
-    # Generate risk classification based on composite factors
-    risk_score = (df['esg_composite'] * 0.4 + 
-                  df['projected_irr'] * 0.3 + 
-                  df['country_risk_score'] * 10 * 0.2 + 
-                  df['tech_maturity_score'] * 10 * 0.1)
-    
-    df['risk_classification'] = np.where(risk_score > 8.5, 0,  # Low Risk
-                               np.where(risk_score > 7.0, 1, 2))  # Medium/High Risk
-    
-    return df
-
-# Apply feature engineering
-data_engineered = engineer_features(data.copy())
-print("Feature engineering completed.")
-print(f"New features added: {len(data_engineered.columns) - len(data.columns)}")
-print(f"Risk Distribution:")
-print(data_engineered['risk_classification'].value_counts().sort_index())
-print()
-
-# 2. XGBoost Model Configuration and Training
-print("2. XGBoost Model Configuration and Training")
-print("-" * 40)
-
-# Prepare features and target
-feature_columns = [
-    'capacity_mw', 'projected_irr', 'environmental_score', 'social_score', 
-    'governance_score', 'country_risk_score', 'tech_maturity_score',
-    'capacity_risk', 'irr_risk', 'esg_composite'
-]
-
-X = data_engineered[feature_columns]
-y = data_engineered['risk_classification']  # Low=0, Medium=1, High=2
-
-# Split data
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
-
-print(f"Training Set: {X_train.shape}")
-print(f"Test Set: {X_test.shape}")
-print(f"Class Distribution: {dict(zip(*np.unique(y_train, return_counts=True)))}")
-print()
-
-# XGBoost Model Configuration - Optimized Hyperparameters
-xgb_model = xgb.XGBClassifier(
-    n_estimators=300,
-    max_depth=6,
-    learning_rate=0.1,
-    subsample=0.8,
-    colsample_bytree=0.8,
-    min_child_weight=3,
-    gamma=0.1,
-    reg_alpha=0.01,
-    reg_lambda=1.0,
-    random_state=42,
-    objective='multi:softprob',
-    eval_metric='mlogloss',
-    tree_method='hist'
-)
-
-print("XGBoost Model Configuration:")
-print(f"Estimators: {xgb_model.n_estimators}")
-print(f"Max Depth: {xgb_model.max_depth}")
-print(f"Learning Rate: {xgb_model.learning_rate}")
-print(f"Objective: {xgb_model.objective}")
-print()
-
-# Model Training with Early Stopping
-print("Training XGBoost model...")
-xgb_model.fit(
-    X_train, y_train,
-    eval_set=[(X_train, y_train), (X_test, y_test)],
-    eval_metric='mlogloss',
-    early_stopping_rounds=50,
-    verbose=False
-)
-
-print("Model training completed!")
-print(f"Best iteration: {xgb_model.best_iteration}")
-print(f"Best score: {xgb_model.best_score:.4f}")
-print()
-
-# 3. Model Evaluation and Performance Metrics
-print("3. Model Evaluation and Performance Metrics")
-print("-" * 40)
-
-# Predictions and Performance
-y_pred = xgb_model.predict(X_test)
-y_pred_proba = xgb_model.predict_proba(X_test)
-
-# Calculate accuracy
-accuracy = (y_pred == y_test).mean()
-print(f"Test Accuracy: {accuracy:.3f} ({accuracy*100:.1f}%)")
-print()
 
-# Detailed classification report
-class_names = ['Low Risk', 'Medium Risk', 'High Risk']
-print("Classification Report:")
-print(classification_report(y_test, y_pred, target_names=class_names))
-
-# Cross-Validation Performance
-cv_scores = cross_val_score(
-    xgb_model, X, y, cv=StratifiedKFold(n_splits=5, shuffle=True, random_state=42),
-    scoring='accuracy', n_jobs=-1
-)
-
-print("5-Fold Cross-Validation Results:")
-print(f"Individual Scores: {[f'{score:.3f}' for score in cv_scores]}")
-print(f"Mean Accuracy: {cv_scores.mean():.3f} ± {cv_scores.std():.3f}")
-print(f"Consistency: {cv_scores.mean()*100:.2f}% ± {cv_scores.std()*100:.2f}%")
-print()
-
-# Feature Importance Analysis
-feature_importance = pd.DataFrame({
-    'feature': feature_columns,
-    'importance': xgb_model.feature_importances_
-}).sort_values('importance', ascending=False)
-
-print("Feature Importance Rankings:")
-for i, (_, row) in enumerate(feature_importance.iterrows(), 1):
-    print(f"{i:2d}. {row['feature']:20s}: {row['importance']:.3f}")
-print()
-
-# 4. Model Validation and ROC Analysis
-print("4. Model Validation and ROC Analysis")
-print("-" * 40)
-
-# ROC Analysis for Multi-class
-from sklearn.metrics import roc_curve, auc
-from sklearn.preprocessing import label_binarize
-
-# Binarize labels for multi-class ROC
-y_test_bin = label_binarize(y_test, classes=[0, 1, 2])
-n_classes = y_test_bin.shape[1]
-
-# Calculate ROC curve for each class
-fpr = dict()
-tpr = dict()
-roc_auc = dict()
-
-for i in range(n_classes):
-    fpr[i], tpr[i], _ = roc_curve(y_test_bin[:, i], y_pred_proba[:, i])
-    roc_auc[i] = auc(fpr[i], tpr[i])
-
-print("ROC-AUC Scores by Risk Class:")
-print(f"Low Risk (Class 0):    {roc_auc[0]:.3f}")
-print(f"Medium Risk (Class 1): {roc_auc[1]:.3f}")
-print(f"High Risk (Class 2):   {roc_auc[2]:.3f}")
-print(f"Mean ROC-AUC:          {np.mean(list(roc_auc.values())):.3f}")
-print()
-
-# Confusion Matrix Analysis
-cm = confusion_matrix(y_test, y_pred)
-print("Confusion Matrix:")
-print(cm)
-
-# Calculate per-class accuracy
-class_accuracy = cm.diagonal() / cm.sum(axis=1)
-print("\nPer-Class Accuracy:")
-for i, acc in enumerate(class_accuracy):
-    print(f"{class_names[i]:12s}: {acc:.3f} ({acc*100:.1f}%)")
-print()
-
-# 5. Production Model Deployment
-print("5. Production Model Deployment")
-print("-" * 40)
-
-# Save trained model
-model_filename = 'finergycloud_xgboost_model.joblib'
-joblib.dump(xgb_model, model_filename)
-print(f"Model saved: {model_filename}")
-
-# Save feature configuration
-model_config = {
-    'feature_columns': feature_columns,
-    'class_names': class_names,
-    'model_version': '1.0',
-    'training_accuracy': float(accuracy),
-    'cv_mean_accuracy': float(cv_scores.mean()),
-    'cv_std_accuracy': float(cv_scores.std()),
-    'feature_importance': feature_importance.to_dict('records'),
-    'roc_auc_scores': {f'class_{k}': float(v) for k, v in roc_auc.items()},
-    'training_date': '2025-01-31',
-    'dataset_size': len(data),
-    'hyperparameters': xgb_model.get_params()
-}
-
-with open('model_config.json', 'w') as f:
-    json.dump(model_config, f, indent=2)
-
-print("Model configuration saved: model_config.json")
-print()
-
-# Production Prediction Function
-def predict_esg_risk(project_data):
-    """
-    Production-ready ESG risk prediction function
-    Used in FinergyCloud platform API
-    """
-    # Feature engineering for new project
-    processed_data = engineer_features(pd.DataFrame([project_data]))
-    features = processed_data[feature_columns]
-    
-    # Make prediction
-    risk_proba = xgb_model.predict_proba(features)[0]
-    risk_class = xgb_model.predict(features)[0]
-    
-    return {
-        'risk_classification': class_names[risk_class],
-        'confidence_score': float(max(risk_proba)),
-        'risk_probabilities': {
-            'low_risk': float(risk_proba[0]),
-            'medium_risk': float(risk_proba[1]),
-            'high_risk': float(risk_proba[2])
-        }
-    }
-
-# Test production function
-sample_project = {
-    'capacity_mw': 75,
-    'projected_irr': 18.5,
-    'environmental_score': 8.2,
-    'social_score': 7.8,
-    'governance_score': 8.5,
-    'country': 'Ghana',
-    'project_type': 'Solar'
-}
+The pipeline lives in the finergycloud_xgboost package. Importing this
+module no longer trains anything; run it as a script for a full training run.
+"""
 
-prediction_result = predict_esg_risk(sample_project)
-print("Sample Prediction:")
-print(json.dumps(prediction_result, indent=2))
-print()
+from finergycloud_xgboost.features import class_names, engineer_features, feature_columns
+from finergycloud_xgboost.predict import predict_esg_risk, predict_esg_risk_batch
+from finergycloud_xgboost.train import run_training
+
+# Re-exported for callers that imported these names from the original script
+__all__ = ['class_names', 'engineer_features', 'feature_columns', 'predict_esg_risk',
+           'predict_esg_risk_batch', 'run_training', 'main']
+
+
+def main():
+    import warnings
+    warnings.filterwarnings('ignore')
+
+    results = run_training()
+
+    print()
+    print("Model Innovation:")
+    print("- Geographic risk scoring specific to West African markets")
+    print("- Technology maturity weighting for renewable energy types")
+    print("- Multi-factor ESG composite scoring with regulatory compliance")
+    print("- Real-time prediction API with <200ms response time")
+    print()
+    print("TechNation Evidence:")
+    print("This script demonstrates exceptional technical innovation in AI-powered")
+    print("ESG assessment, with production deployment achieving 94.2% accuracy for")
+    print("renewable energy investment risk classification in emerging markets.")
+    print("=" * 70)
+    print("XGBoost Model Training Complete!")
+    print(f"Final Accuracy: {results['accuracy']:.1%}")
 
-# 6. Model Performance Summary
-print("6. Model Performance Summary")
-print("=" * 40)
-print("Final Model Statistics:")
-print(f"- Accuracy: {accuracy:.1%} (Test Set)")
-print(f"- Cross-Validation: {cv_scores.mean():.2%} ± {cv_scores.std():.2%} (5-fold)")
-print(f"- ROC-AUC: {np.mean(list(roc_auc.values())):.3f} (Mean across classes)")
-print(f"- Training Dataset: {len(data):,} projects across 5 West African countries")
-print(f"- Feature Engineering: {len(feature_columns)} optimized features with geographic risk adjustment")
-print("- Production Deployment: Integrated into FinergyCloud platform API")
-print()
-print("Model Innovation:")
-print("- Geographic risk scoring specific to West African markets")
-print("- Technology maturity weighting for renewable energy types")
-print("- Multi-factor ESG composite scoring with regulatory compliance")
-print("- Real-time prediction API with <200ms response time")
-print()
-print("TechNation Evidence:")
-print("This script demonstrates exceptional technical innovation in AI-powered")
-print("ESG assessment, with production deployment achieving 94.2% accuracy for")
-print("renewable energy investment risk classification in emerging markets.")
-print("=" * 70)
 
 if __name__ == "__main__":
-    print("XGBoost Model Training Complete!")
-    print(f"Final Accuracy: {accuracy:.1%}")
+    main()